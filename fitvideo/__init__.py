@@ -0,0 +1,29 @@
+"""FIT-AI 운동 영상 분석 패키지
+
+무거운 의존성(mediapipe, cv2, boto3)은 실제로 사용하는 시점에만 로드되므로
+패키지 import 자체에는 부작용이 없다. SQS 워커는 ``python -m fitvideo.worker`` 로 실행한다.
+"""
+import importlib
+
+# 공개 이름 -> 정의된 모듈 (접근 시점에 import)
+_EXPORTS = {
+    "parse_filename": "fitvideo.utils",
+    "ts_to_yyyymmdd": "fitvideo.utils",
+    "SquatRepCounter": "fitvideo.squat",
+    "calculate_angle": "fitvideo.squat",
+    "get_best_leg_angle": "fitvideo.squat",
+    "analyze_squat": "fitvideo.analysis",
+    "analyze_squat_with_overlay": "fitvideo.analysis",
+    "normalize_video": "fitvideo.video",
+    "create_overlay_video": "fitvideo.video",
+    "process_video_message": "fitvideo.worker",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'fitvideo' has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name), name)
@@ -0,0 +1,273 @@
+"""스쿼트 분석 (디코딩 + Pose + 반복 판정)"""
+import os
+
+from . import config
+from .filters import LandmarkSmoother
+from .pose import create_pose, landmarks_to_array
+from .pose_backends import MediaPipeBackend, infer_frames, open_pose_backend
+from .frames import open_frame_reader
+from .squat import SquatRepCounter, get_best_leg_angle
+from .video import create_overlay_video
+
+ANALYSIS_SIZE = (240, 180)  # 포즈 추론용 축소 프레임 크기 (width, height)
+# 기존 분석과 같은 임계값 (감지율 유지) - 낮은 임계값에서 섞이는 잡음은 랜드마크 필터(LandmarkSmoother)가 처리
+MIN_DETECTION_CONFIDENCE = 0.3
+MIN_TRACKING_CONFIDENCE = 0.3
+
+
+def create_analysis_pose():
+    """분석용 Pose - FIT_POSE_CASCADE=1 이면 complexity 캐스케이드 사용"""
+    if config.POSE_CASCADE:
+        from .cascade import CascadePose
+        return CascadePose(config.POSE_CASCADE_HEAVY_COMPLEXITY, MIN_DETECTION_CONFIDENCE, MIN_TRACKING_CONFIDENCE)
+    return create_pose(
+        model_complexity=1,  # 속도 향상을 위해 1로 낮춤
+        min_detection_confidence=MIN_DETECTION_CONFIDENCE,
+        min_tracking_confidence=MIN_TRACKING_CONFIDENCE,
+        smooth_landmarks=False  # 스무딩은 LandmarkSmoother 가 담당 (이중 필터링 방지)
+    )
+
+
+def create_analysis_backend(pose=None, enhance=None):
+    """분석용 Pose 백엔드 - mediapipe 는 create_analysis_pose(), 그 외는 FIT_POSE_BACKEND 설정
+
+    enhance(기본 FIT_LOWLIGHT_ENHANCE) 면 저조도 보정을 붙이며, 보정 상태가 동영상별이므로 동영상 1개에만 쓴다.
+    """
+    if pose is not None or config.POSE_BACKEND == "mediapipe":
+        backend = MediaPipeBackend(pose or create_analysis_pose())
+    else:
+        backend = open_pose_backend(min_detection_confidence=MIN_DETECTION_CONFIDENCE)
+    if config.LOWLIGHT_ENHANCE if enhance is None else enhance:
+        from .enhance import EnhancedBackend
+        backend = EnhancedBackend(backend)
+    return backend
+
+
+class SquatFrameAnalyzer:
+    """프레임 단위 스쿼트 분석기 (Pose → 랜드마크 필터 → 반복 판정)
+
+    파일 분석(analyze_squat)과 실시간 스트리밍(fitvideo.stream)이 같은 임계값/판정을 쓰도록
+    한 곳에 모아둔다. process() 는 1회가 완료된 프레임에서 rep 결과(dict)를 반환한다.
+    Pose 백엔드로 추론한 랜드마크를 넘길 때는 update() 만 쓰며, 이 경우 pose 는 만들지 않는다.
+    """
+
+    def __init__(self, fps, pose=None, verbose=True):
+        self.fps = fps
+        self._pose = pose
+        # 낮은 임계값 대신 시계열 필터로 랜드마크 잡음 제거
+        self.smoother = LandmarkSmoother(fps=fps)
+        self.counter = SquatRepCounter(verbose=verbose)
+        self.verbose = verbose
+        self.frame_analysis = []
+
+        # 포즈 감지 성공/실패 통계
+        self.pose_detected_frames = 0
+        self.pose_failed_frames = 0
+
+    @property
+    def pose(self):
+        if self._pose is None:
+            self._pose = create_analysis_pose()
+        return self._pose
+
+    @property
+    def finished(self):
+        return self.counter.finished
+
+    def process(self, frame_count, image):
+        """RGB 분석 프레임 1장 처리"""
+        # 전처리 없이 바로 포즈 감지 (속도 대폭 향상)
+        results = self.pose.process(image)
+        landmarks = None
+        if results.pose_landmarks:
+            landmarks = landmarks_to_array(results.pose_landmarks.landmark)
+        return self.update(frame_count, landmarks)
+
+    def update(self, frame_count, landmarks):
+        """(33, 4) 랜드마크 배열 (미감지 시 None) 1프레임 반영"""
+        self.frame_analysis.append({
+            "frame": frame_count,
+            "has_pose": landmarks is not None,
+            "stage": self.counter.stage,
+            "knee_angle": None
+        })
+        log = self.verbose and frame_count % 50 == 0  # 로그 빈도 줄임 (50프레임마다)
+
+        if landmarks is None:
+            self.pose_failed_frames += 1
+            if log:
+                print(f"❌ 프레임 {frame_count}: 포즈 감지 실패 (누적: {self.pose_failed_frames})")
+            return None
+
+        self.pose_detected_frames += 1
+        if log:
+            print(f"✅ 프레임 {frame_count}: 포즈 감지 성공 (누적: {self.pose_detected_frames})")
+
+        landmarks = self.smoother(landmarks, frame_count)
+
+        # 양쪽 다리 중 더 안정적인 각도 선택
+        knee_angle, hip = get_best_leg_angle(landmarks)
+
+        self.frame_analysis[-1]["knee_angle"] = knee_angle
+
+        # 디버깅: 각도 변화 모니터링 (50프레임마다)
+        if log:
+            print(f"🔍 프레임 {frame_count}: 무릎 각도 = {knee_angle:.1f}°, 단계 = {self.counter.stage}")
+
+        return self.counter.update(frame_count, knee_angle, hip)
+
+    def result(self):
+        """판정 결과 + fps/end_frame/프레임별 분석 기록"""
+        result = self.counter.summary()
+        result["fps"] = self.fps
+        result["end_frame"] = self.counter.end_frame
+        result["frame_analysis"] = self.frame_analysis
+        return result
+
+    def print_summary(self):
+        # 분석 결과 요약
+        total_frames = len(self.frame_analysis)
+        detected_frames = sum(1 for f in self.frame_analysis if f["has_pose"])
+        detection_rate = (detected_frames / total_frames) * 100 if total_frames > 0 else 0
+
+        print(f"📊 분석 결과 요약:")
+        print(f"   총 프레임: {total_frames}")
+        print(f"   포즈 감지: {detected_frames} ({detection_rate:.1f}%)")
+        print(f"   포즈 감지 성공: {self.pose_detected_frames}")
+        print(f"   포즈 감지 실패: {self.pose_failed_frames}")
+        print(f"   스쿼트 횟수: {self.counter.counter}")
+        print(f"   최소 각도: {self.counter.min_knee_angle}°")
+
+        # 포즈 감지율이 너무 낮으면 경고
+        if detection_rate < 50:
+            print(f"⚠️ 경고: 포즈 감지율이 낮습니다 ({detection_rate:.1f}%)")
+
+    def close(self):
+        if self._pose is not None:
+            self._pose.close()
+
+
+def analyze_squat(video_path, target_fps=None, pose=None, backend=None, size=None, pipeline=None):
+    """스쿼트 분석 - 판정 결과(dict) 반환 (오버레이 렌더링 없음)
+
+    target_fps 를 주면 normalize_video 와 같은 프레임만 골라 분석하므로, 정규화 전에
+    분석해도 rep 의 프레임 번호가 정규화된 동영상 기준이 된다. pose(mediapipe 호환 추론기)
+    또는 backend(PoseBackend) 를 주면 그것을 사용한다 (backend 는 닫지 않음).
+    size 를 주면 ANALYSIS_SIZE 대신 그 크기로 축소해 추론한다.
+    pipeline(기본 FIT_SHM_PIPELINE) 이면 디코딩/추론을 별도 프로세스에서 수행한다 (pose/backend 를 줄 때 제외).
+    """
+    size = size or ANALYSIS_SIZE
+    pipeline = config.SHM_PIPELINE if pipeline is None else pipeline
+    own_backend = backend is None and not (pipeline and pose is None)
+    if own_backend:
+        backend = create_analysis_backend(pose)
+    if backend is None:
+        # 디코딩 / Pose 추론 프로세스 분리 (프레임은 공유 메모리, 슬롯 번호와 랜드마크만 전달)
+        from .shm_pipeline import SharedFramePipeline
+        reader = frames = SharedFramePipeline(video_path, size=size, rgb=True, target_fps=target_fps,
+                                              backend_factory=create_analysis_backend)
+    else:
+        # 디코더가 축소 + RGB 변환까지 수행 (ffmpeg 파이프 또는 백그라운드 스레드, 추론과 병행)
+        reader = open_frame_reader(video_path, size=size, rgb=True, target_fps=target_fps)
+        frames = infer_frames(reader, backend)
+    analyzer = SquatFrameAnalyzer(fps=target_fps or reader.fps)
+
+    # 동영상 정보 출력
+    print(f"📹 분석할 동영상: {reader.width}x{reader.height} @ {reader.fps}fps")
+    print(f"⚡ 속도 최적화 적용: {size[0]}x{size[1]} 프레임, 전처리 제거, 임계값 {MIN_DETECTION_CONFIDENCE} + 랜드마크 필터")
+
+    try:
+        for frame_count, _, landmarks in frames:
+            analyzer.update(frame_count, landmarks)
+            if analyzer.finished:
+                break
+    finally:
+        reader.close()
+        if own_backend:
+            backend.close()
+    analyzer.print_summary()
+    return analyzer.result()
+
+
+def analyze_squat_many(video_paths, target_fps=None, backend=None):
+    """여러 동영상 분석 - 상태 없는 배치 백엔드면 동영상들의 프레임을 한 배치에 섞어 추론
+
+    mediapipe 처럼 동영상별 추적 상태가 있는 백엔드는 동영상마다 analyze_squat 을 차례로 호출한다.
+    프레임을 섞는 경우 저조도 보정(동영상별 상태)은 적용하지 않는다.
+    반환: video_paths 순서의 판정 결과 목록
+    """
+    if backend is None and config.POSE_BACKEND == "mediapipe":
+        return [analyze_squat(path, target_fps) for path in video_paths]
+    if backend is not None and not backend.stateless:
+        raise ValueError("상태가 있는 Pose 백엔드는 여러 동영상에 공유할 수 없습니다")
+
+    own_backend = backend is None
+    if own_backend:
+        backend = create_analysis_backend(enhance=False)
+    readers = [open_frame_reader(path, size=ANALYSIS_SIZE, rgb=True, target_fps=target_fps) for path in video_paths]
+    analyzers = [SquatFrameAnalyzer(fps=target_fps or reader.fps, verbose=False) for reader in readers]
+    streams = {i: iter(reader) for i, reader in enumerate(readers)}
+    batch_size = max(1, backend.batch_size)
+
+    try:
+        while streams:
+            # 아직 끝나지 않은 동영상들에서 돌아가며 프레임을 모아 한 배치 구성 (리더 버퍼는 재사용되므로 복사)
+            batch = []
+            while streams and len(batch) < batch_size:
+                for i in list(streams):
+                    frame = next(streams[i], None)
+                    if frame is None:
+                        del streams[i]
+                        continue
+                    batch.append((i, frame[0], frame[1].copy()))
+                    if len(batch) >= batch_size:
+                        break
+
+            for (i, frame_count, _), landmarks in zip(batch, backend.infer([image for _, _, image in batch])):
+                analyzer = analyzers[i]
+                if analyzer.finished:
+                    continue
+                analyzer.update(frame_count, landmarks)
+                if analyzer.finished and i in streams:
+                    streams.pop(i).close()
+    finally:
+        for reader in readers:
+            reader.close()
+        if own_backend:
+            backend.close()
+
+    for path, analyzer in zip(video_paths, analyzers):
+        print(f"📹 {path}")
+        analyzer.print_summary()
+    return [analyzer.result() for analyzer in analyzers]
+
+
+def get_active_frames(result, tail_sec=None):
+    """세트 종료 프레임 + 여유 구간 → 처리할 앞부분 프레임 수 (종료 미감지 시 None = 끝까지)"""
+    if result.get("end_frame") is None:
+        return None
+    if tail_sec is None:
+        tail_sec = config.ACTIVE_TAIL_SEC
+    return result["end_frame"] + 1 + int(round(tail_sec * result["fps"]))
+
+
+def analyze_squat_with_overlay(video_path, tail_sec=None, backend=None, output_path=None):
+    """스쿼트 분석 및 오버레이 비디오 생성 - 세트 종료 이후 구간은 렌더링하지 않음
+
+    backend 는 분석/오버레이에 함께 쓰이므로 상태 없는 배치 백엔드(onnx, openvino)여야 한다.
+    output_path 를 주지 않으면 원본 옆 *_analyzed.mp4 에 저장한다 (확장자 대소문자 무관).
+    """
+    if output_path is None:
+        output_path = os.path.splitext(video_path)[0] + "_analyzed.mp4"
+    if config.SEGMENT_WORKERS > 1 and backend is None:
+        # 구간 병렬 분석/렌더링 (FIT_SEGMENT_WORKERS)
+        from .segments import analyze_squat_segmented, create_overlay_video_segmented
+        result = analyze_squat_segmented(video_path)
+        create_overlay_video_segmented(video_path, result, output_path, max_frames=get_active_frames(result, tail_sec))
+        return result, output_path
+
+    result = analyze_squat(video_path, backend=backend)
+    create_overlay_video(video_path, result, output_path, max_frames=get_active_frames(result, tail_sec),
+                         backend=backend)
+
+    return result, output_path
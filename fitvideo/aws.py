@@ -0,0 +1,175 @@
+"""SQS/S3 접근 - boto3 클라이언트는 최초 사용 시 생성해 재사용"""
+import json
+import os
+import threading
+
+from . import config, transfer
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(service):
+    """서비스별 boto3 클라이언트 (프로세스 내 모든 스레드가 공유 - boto3 클라이언트는 스레드 안전)"""
+    with _clients_lock:
+        client = _clients.get(service)
+        if client is None:
+            import boto3
+            from botocore.config import Config
+            kwargs = {
+                "region_name": config.REGION_NAME,
+                "config": Config(max_pool_connections=config.S3_MAX_POOL_CONNECTIONS, retries={"mode": "adaptive"}),
+            }
+            if service == "s3" and config.S3_ENDPOINT_URL:
+                kwargs["endpoint_url"] = config.S3_ENDPOINT_URL
+            client = boto3.client(service, **kwargs)
+            _clients[service] = client
+        return client
+
+
+def get_sqs():
+    return get_client("sqs")
+
+
+def get_s3():
+    return get_client("s3")
+
+
+# =========================
+# SQS
+# =========================
+def get_message(queue_url=None, wait_seconds=10):
+    """메시지 1건 수신 - 작업 큐가 아닌 큐(queue_url)에서 받은 메시지에는 QueueUrl 을 붙여 둔다"""
+    response = get_sqs().receive_message(
+        QueueUrl=queue_url or config.QUEUE_URL,
+        MaxNumberOfMessages=1,
+        WaitTimeSeconds=wait_seconds,
+        VisibilityTimeout=30,
+        AttributeNames=["SentTimestamp"]
+    )
+    msg = response.get("Messages", [None])[0]
+    if msg is not None and queue_url:
+        msg["QueueUrl"] = queue_url
+    return msg
+
+
+def get_messages(max_messages=10, wait_seconds=10, visibility_timeout=30):
+    """메시지 여러 개 수신 (스케줄러용, 큐 도착 시각 SentTimestamp 포함)"""
+    response = get_sqs().receive_message(
+        QueueUrl=config.QUEUE_URL,
+        MaxNumberOfMessages=max_messages,
+        WaitTimeSeconds=wait_seconds,
+        VisibilityTimeout=visibility_timeout,
+        AttributeNames=["SentTimestamp"]
+    )
+    return response.get("Messages", [])
+
+
+def delete_message(receipt_handle, queue_url=None):
+    get_sqs().delete_message(QueueUrl=queue_url or config.QUEUE_URL, ReceiptHandle=receipt_handle)
+
+
+def release_message(receipt_handle):
+    """받아 둔 메시지를 처리하지 않고 바로 다른 워커가 받을 수 있게 돌려줌"""
+    get_sqs().change_message_visibility(
+        QueueUrl=config.QUEUE_URL, ReceiptHandle=receipt_handle, VisibilityTimeout=0
+    )
+
+
+def send_message(body, delay_seconds=0, queue_url=None):
+    """큐에 메시지 추가 (기본은 작업 큐, 지연 렌더링은 DEFERRED_QUEUE_URL)"""
+    get_sqs().send_message(QueueUrl=queue_url or config.QUEUE_URL, MessageBody=json.dumps(body),
+                           DelaySeconds=delay_seconds)
+
+
+def defer_message(receipt_handle, delay_seconds, queue_url=None):
+    """메시지를 지우지 않고 delay_seconds 뒤에 다시 받도록 미룸"""
+    get_sqs().change_message_visibility(
+        QueueUrl=queue_url or config.QUEUE_URL, ReceiptHandle=receipt_handle, VisibilityTimeout=delay_seconds
+    )
+
+
+def send_to_dead_letter(msg, reason):
+    """재시도 한도를 넘긴 메시지를 dead-letter 큐로 이동 (설정된 경우)"""
+    if not config.DEAD_LETTER_QUEUE_URL:
+        print(f"☠️ dead-letter 큐 미설정 → 메시지 폐기: {reason}")
+        return False
+    get_sqs().send_message(
+        QueueUrl=config.DEAD_LETTER_QUEUE_URL,
+        MessageBody=msg["Body"],
+        MessageAttributes={"reason": {"DataType": "String", "StringValue": reason[:1000] or "unknown"}}
+    )
+    print(f"☠️ dead-letter 큐로 이동: {reason}")
+    return True
+
+
+def get_queue_depth():
+    """큐에 대기 중인 메시지 수 (ApproximateNumberOfMessages)"""
+    response = get_sqs().get_queue_attributes(
+        QueueUrl=config.QUEUE_URL,
+        AttributeNames=['ApproximateNumberOfMessages']
+    )
+    return int(response['Attributes']['ApproximateNumberOfMessages'])
+
+
+# =========================
+# S3
+# =========================
+def download_video(object_key, local_path=None):
+    """S3 동영상 다운로드 - local_path 를 주지 않으면 DOWNLOAD_DIR/파일명"""
+    if local_path is None:
+        local_path = os.path.join(config.DOWNLOAD_DIR, object_key.split("/")[-1])
+    stats = transfer.download_file(config.BUCKET_NAME, object_key, local_path)
+    print(f"📥 다운로드 완료: {local_path} ({stats})")
+    return local_path
+
+
+def get_object_size(object_key):
+    """S3 객체 크기 (bytes) - 작업 비용 추정용"""
+    return get_s3().head_object(Bucket=config.BUCKET_NAME, Key=object_key)["ContentLength"]
+
+
+def get_object_head(object_key):
+    """HEAD 1번으로 (ETag, 크기 bytes) - 중복 판별과 작업 공간 예약에 함께 사용"""
+    resp = get_s3().head_object(Bucket=config.BUCKET_NAME, Key=object_key)
+    return resp["ETag"].strip('"'), resp["ContentLength"]
+
+
+def get_presigned_url(object_key, expires_in=300):
+    """다운로드 없이 ffprobe 등으로 읽을 수 있는 임시 URL"""
+    return get_s3().generate_presigned_url(
+        "get_object", Params={"Bucket": config.BUCKET_NAME, "Key": object_key}, ExpiresIn=expires_in
+    )
+
+
+def get_object_etag(object_key):
+    """S3 객체 ETag - 다운로드 없이 같은 내용인지 판별하는 용도"""
+    resp = get_s3().head_object(Bucket=config.BUCKET_NAME, Key=object_key)
+    return resp["ETag"].strip('"')
+
+
+def get_next_set_no(user_id: int, user_name: str, yyyymmdd: str, exercise: str) -> int:
+    prefix = f"{config.ROOT_PREFIX}/{user_id}_{user_name}/{yyyymmdd}/{exercise}/"
+    continuation_token = None
+    total = 0
+
+    while True:
+        kwargs = {"Bucket": config.BUCKET_NAME, "Prefix": prefix}
+        if continuation_token:
+            kwargs["ContinuationToken"] = continuation_token
+
+        resp = get_s3().list_objects_v2(**kwargs)
+        contents = resp.get("Contents", [])
+        # 분석된 mp4만 카운트 (setX_*.mp4)
+        for obj in contents:
+            key = obj["Key"]
+            if key.lower().endswith(".mp4") and "/set" in key:
+                total += 1
+
+        if resp.get("IsTruncated"):
+            continuation_token = resp.get("NextContinuationToken")
+        else:
+            break
+
+    # 기존 개수 + 1이 다음 set 번호
+    return total + 1
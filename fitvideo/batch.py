@@ -0,0 +1,190 @@
+"""로컬 디렉터리 / S3 prefix 의 동영상을 병렬로 일괄 분석하는 CLI
+
+    python -m fitvideo.batch /data/videos --output /data/results --workers 4
+    python -m fitvideo.batch s3://thefit-bucket/uploads/ --output s3://thefit-bucket/rescore/
+
+동영상마다 {이름}.json (메타데이터 + 분석 결과)과 {이름}_analyzed.mp4 를 출력 위치에 쓴다.
+이름은 입력 위치 기준 상대 경로이므로 S3 prefix 아래 하위 경로가 출력에도 그대로 유지된다.
+결과 JSON 은 항상 마지막에 기록되므로, JSON 이 이미 있는 동영상은 완료로 보고 건너뛴다
+(중단된 백필을 같은 명령으로 다시 실행하면 남은 것만 처리).
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .resources import apply_resource_limits
+from .utils import parse_filename, parse_s3_uri
+
+VIDEO_EXTENSIONS = (".mp4",)
+
+
+def list_videos(source):
+    """분석 대상 목록 - 로컬 경로 또는 S3 키"""
+    s3_location = parse_s3_uri(source)
+    if s3_location is None:
+        return sorted(
+            os.path.join(source, name) for name in os.listdir(source)
+            if name.lower().endswith(VIDEO_EXTENSIONS) and not name.lower().endswith("_analyzed.mp4")
+        )
+
+    from .aws import get_s3
+    bucket, prefix = s3_location
+    paginator = get_s3().get_paginator("list_objects_v2")
+    keys = []
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            key = obj["Key"]
+            if key.lower().endswith(VIDEO_EXTENSIONS) and not key.lower().endswith("_analyzed.mp4"):
+                keys.append(key)
+    return sorted(keys)
+
+
+def _stem(item, source):
+    """출력 이름 - 입력 위치 기준 상대 경로에서 확장자를 뺀 것
+
+    S3 prefix 아래 하위 경로가 다른 같은 파일명(a/x.mp4, b/x.mp4)이 같은 출력에 겹치지 않도록
+    하위 경로를 그대로 출력 위치에 유지한다.
+    """
+    s3_location = parse_s3_uri(source)
+    if s3_location is None:
+        relative = os.path.relpath(item, source).replace(os.sep, "/")
+    else:
+        prefix = s3_location[1]
+        root = prefix if not prefix or prefix.endswith("/") else prefix + "/"
+        # prefix 가 폴더가 아니라 파일명 앞부분이면 (uploads/2025 → uploads/20250101.mp4) 그 폴더 기준
+        relative = item[len(root):] if item.startswith(root) else item[prefix.rfind("/") + 1:]
+    return os.path.splitext(relative)[0]
+
+
+def _output_exists(output, name):
+    s3_location = parse_s3_uri(output)
+    if s3_location is None:
+        return os.path.exists(os.path.join(output, name))
+
+    from botocore.exceptions import ClientError
+    from .aws import get_s3
+    bucket, prefix = s3_location
+    try:
+        get_s3().head_object(Bucket=bucket, Key=prefix.rstrip("/") + "/" + name if prefix else name)
+        return True
+    except ClientError as e:
+        # 없는 경우만 미완료로 보고, 권한/설정 오류는 전체를 다시 분석하지 않도록 그대로 올림
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+
+
+def _write_output(output, name, local_path, content_type):
+    s3_location = parse_s3_uri(output)
+    if s3_location is None:
+        path = os.path.join(output, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(local_path, path)
+        return
+
+    from .transfer import upload_file
+    bucket, prefix = s3_location
+    key = prefix.rstrip("/") + "/" + name if prefix else name
+    upload_file(local_path, bucket, key, extra_args={"ContentType": content_type})
+
+
+def analyze_one(source, item, output, render_overlay=True, history_dir=None):
+    """동영상 1개 분석 후 결과 기록 (워커 프로세스에서 실행)"""
+    from .analysis import analyze_squat, analyze_squat_with_overlay
+
+    stem = _stem(item, source)
+    local_stem = os.path.basename(stem)
+    user_id, user_name, load_kg, timestamp = parse_filename(item.split("/")[-1])
+    started = time.time()
+
+    with tempfile.TemporaryDirectory(prefix="fitbatch_") as work_dir:
+        s3_location = parse_s3_uri(source)
+        if s3_location is None:
+            # 심볼릭 링크는 같은 경로에 쓰면 원본이 덮어써지므로 하드 링크 (다른 파일시스템이면 복사),
+            # 출력은 항상 작업 디렉터리의 다른 파일에 씀
+            video_path = os.path.join(work_dir, os.path.basename(item))
+            try:
+                os.link(item, video_path)
+            except OSError:
+                shutil.copyfile(item, video_path)
+        else:
+            from .transfer import download_file
+            video_path = os.path.join(work_dir, item.split("/")[-1])
+            download_file(s3_location[0], item, video_path)
+
+        if render_overlay:
+            result, analyzed_path = analyze_squat_with_overlay(
+                video_path, output_path=os.path.join(work_dir, f"{local_stem}_analyzed.mp4"))
+            _write_output(output, f"{stem}_analyzed.mp4", analyzed_path, "video/mp4")
+        else:
+            result = analyze_squat(video_path)
+
+        record = {
+            "source": item,
+            "user_id": user_id,
+            "user_name": user_name,
+            "load_kg": load_kg,
+            "timestamp": timestamp,
+            "elapsed_sec": round(time.time() - started, 2),
+            "result": result,
+        }
+        json_path = os.path.join(work_dir, f"{local_stem}.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        if history_dir and user_id is not None:
+            from .history import append_result
+            append_result(user_id, timestamp, "squat", load_kg, result, root=history_dir)
+
+        # 결과 JSON 을 마지막에 기록 → 재실행 시 완료 여부 판단 기준
+        _write_output(output, f"{stem}.json", json_path, "application/json")
+
+    return item, result["total_count"], result["score"]
+
+
+def run_batch(source, output, workers=None, render_overlay=True, force=False, history_dir=None):
+    """source 의 동영상을 병렬 분석 - (성공 수, 실패 수, 건너뜀 수) 반환"""
+    if parse_s3_uri(output) is None:
+        os.makedirs(output, exist_ok=True)
+
+    items = list_videos(source)
+    pending = [item for item in items if force or not _output_exists(output, f"{_stem(item, source)}.json")]
+    skipped = len(items) - len(pending)
+    print(f"📂 대상 {len(items)}개 | 처리 {len(pending)}개 | 완료되어 건너뜀 {skipped}개")
+
+    succeeded = failed = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=apply_resource_limits) as executor:
+        futures = {executor.submit(analyze_one, source, item, output, render_overlay, history_dir): item for item in pending}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                _, total_count, score = future.result()
+                succeeded += 1
+                print(f"✅ [{succeeded + failed}/{len(pending)}] {item}: {total_count}회, {score}점")
+            except Exception as e:
+                failed += 1
+                print(f"❌ [{succeeded + failed}/{len(pending)}] {item}: {e}")
+
+    print(f"📊 일괄 분석 완료: 성공 {succeeded}, 실패 {failed}, 건너뜀 {skipped}")
+    return succeeded, failed, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="동영상 일괄 스쿼트 분석")
+    parser.add_argument("source", help="로컬 디렉터리 또는 s3://bucket/prefix")
+    parser.add_argument("--output", required=True, help="결과를 쓸 로컬 디렉터리 또는 s3://bucket/prefix")
+    parser.add_argument("--workers", type=int, default=None, help="병렬 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--no-overlay", action="store_true", help="오버레이 동영상 생성 생략 (JSON 만 기록)")
+    parser.add_argument("--force", action="store_true", help="이미 결과가 있는 동영상도 다시 분석")
+    parser.add_argument("--history", default=None, help="결과를 추가할 로컬 이력 저장소 위치 (fitvideo.history)")
+    args = parser.parse_args(argv)
+
+    _, failed, _ = run_batch(args.source, args.output, args.workers, not args.no_overlay, args.force, args.history)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
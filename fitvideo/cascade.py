@@ -0,0 +1,140 @@
+"""Pose 모델 복잡도 캐스케이드
+
+가벼운 모델(model_complexity=0)을 모든 프레임에 돌리고, 다음 프레임에서만 무거운 모델(1 또는 2)로
+다시 추론해 결과를 교체한다.
+- 포즈 미감지 또는 다리 랜드마크(엉덩이/무릎/발목) visibility 가 낮은 프레임
+- 판정 경계 근처: 단계 전환(155°), 분석 시작(165°) 각도 부근
+- 스쿼트 최저점 부근: 내려가는 중 현재까지 최저 각도와 가까운 프레임 (min_knee_angle 결정 구간)
+
+mediapipe Pose 와 같은 process()/close() 를 제공하므로 SquatFrameAnalyzer 의 pose 로 그대로 쓴다.
+
+    python -m fitvideo.cascade a.mp4 b.mp4    (단일 모델 대비 처리 속도/판정 일치율 벤치마크)
+"""
+import argparse
+import time
+
+from .pose import PoseLandmark, create_pose, landmarks_to_array
+from .squat import get_best_leg_angle
+
+LEG_LANDMARKS = [
+    PoseLandmark.LEFT_HIP, PoseLandmark.RIGHT_HIP,
+    PoseLandmark.LEFT_KNEE, PoseLandmark.RIGHT_KNEE,
+    PoseLandmark.LEFT_ANKLE, PoseLandmark.RIGHT_ANKLE,
+]
+
+MIN_LEG_VISIBILITY = 0.6   # 다리 랜드마크 평균 visibility 가 이보다 낮으면 재추론
+DECISION_ANGLES = (155, 165)  # SquatRepCounter 의 단계 전환 / 분석 시작 각도
+DECISION_BAND = 8          # 판정 각도 ± 이 범위면 재추론
+BOTTOM_BAND = 10           # 하강 중 최저 각도 + 이 범위 이내면 재추론
+
+
+class CascadePose:
+    """complexity 0 → 필요 시 heavy 모델로 재추론하는 Pose 대체 객체"""
+
+    def __init__(self, heavy_complexity=1, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+        # 스무딩은 LandmarkSmoother 가 담당하므로 내부 스무딩을 끔 (무거운 모델은 띄엄띄엄 호출되기도 함)
+        self.light = create_pose(0, min_detection_confidence, min_tracking_confidence, smooth_landmarks=False)
+        self.heavy = create_pose(heavy_complexity, min_detection_confidence, min_tracking_confidence,
+                                 smooth_landmarks=False)
+        self.light_frames = 0
+        self.heavy_frames = 0
+        self._descent_min = None
+
+    def _needs_heavy(self, results):
+        if not results.pose_landmarks:
+            return True
+        landmarks = landmarks_to_array(results.pose_landmarks.landmark)
+        if landmarks[LEG_LANDMARKS, 3].mean() < MIN_LEG_VISIBILITY:
+            return True
+
+        knee_angle, _ = get_best_leg_angle(landmarks)
+        if any(abs(knee_angle - angle) < DECISION_BAND for angle in DECISION_ANGLES):
+            return True
+
+        # 하강 구간 최저점 추적 (올라오면 초기화)
+        if knee_angle >= DECISION_ANGLES[0]:
+            self._descent_min = None
+            return False
+        self._descent_min = knee_angle if self._descent_min is None else min(self._descent_min, knee_angle)
+        return knee_angle <= self._descent_min + BOTTOM_BAND
+
+    def process(self, image):
+        results = self.light.process(image)
+        self.light_frames += 1
+        if self._needs_heavy(results):
+            heavy_results = self.heavy.process(image)
+            self.heavy_frames += 1
+            if heavy_results.pose_landmarks:
+                return heavy_results
+        return results
+
+    @property
+    def heavy_ratio(self):
+        return self.heavy_frames / self.light_frames if self.light_frames else 0.0
+
+    def close(self):
+        self.light.close()
+        self.heavy.close()
+
+
+# =========================
+# 벤치마크
+# =========================
+def _label_agreement(reference, candidate):
+    """rep 순서대로 라벨 비교 → 일치 비율 (기준 rep 수 기준, rep 수 차이는 불일치로 계산)"""
+    ref_labels = [rep["label"] for rep in reference["rep_results"]]
+    cand_labels = [rep["label"] for rep in candidate["rep_results"]]
+    total = max(len(ref_labels), len(cand_labels))
+    if total == 0:
+        return 1.0
+    return sum(a == b for a, b in zip(ref_labels, cand_labels)) / total
+
+
+def benchmark(video_paths, heavy_complexity=1):
+    """단일 모델(complexity=heavy_complexity) 대비 캐스케이드의 처리 시간/판정 일치율 비교"""
+    from .analysis import MIN_DETECTION_CONFIDENCE, MIN_TRACKING_CONFIDENCE, analyze_squat
+
+    rows = []
+    for video_path in video_paths:
+        baseline_pose = create_pose(heavy_complexity, MIN_DETECTION_CONFIDENCE, MIN_TRACKING_CONFIDENCE,
+                                    smooth_landmarks=False)
+        started = time.perf_counter()
+        baseline = analyze_squat(video_path, pose=baseline_pose)
+        baseline_sec = time.perf_counter() - started
+
+        cascade_pose = CascadePose(heavy_complexity, MIN_DETECTION_CONFIDENCE, MIN_TRACKING_CONFIDENCE)
+        started = time.perf_counter()
+        cascade = analyze_squat(video_path, pose=cascade_pose)
+        cascade_sec = time.perf_counter() - started
+
+        frames = len(baseline["frame_analysis"])
+        rows.append({
+            "video": video_path,
+            "frames": frames,
+            "baseline_fps": frames / baseline_sec if baseline_sec else 0.0,
+            "cascade_fps": len(cascade["frame_analysis"]) / cascade_sec if cascade_sec else 0.0,
+            "heavy_ratio": cascade_pose.heavy_ratio,
+            "count_match": baseline["total_count"] == cascade["total_count"],
+            "label_agreement": _label_agreement(baseline, cascade),
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pose 캐스케이드 벤치마크 (처리 속도 / 판정 일치율)")
+    parser.add_argument("videos", nargs="+")
+    parser.add_argument("--heavy", type=int, default=1, choices=(1, 2), help="무거운 모델 complexity")
+    args = parser.parse_args(argv)
+
+    rows = benchmark(args.videos, args.heavy)
+    print(f"{'video':<40} {'frames':>6} {'base fps':>9} {'cascade fps':>12} {'speedup':>8} {'heavy%':>7} {'count':>6} {'labels':>7}")
+    for row in rows:
+        speedup = row["cascade_fps"] / row["baseline_fps"] if row["baseline_fps"] else 0.0
+        print(f"{row['video'][-40:]:<40} {row['frames']:>6} {row['baseline_fps']:>9.1f} {row['cascade_fps']:>12.1f} "
+              f"{speedup:>7.2f}x {row['heavy_ratio'] * 100:>6.1f}% {'O' if row['count_match'] else 'X':>6} "
+              f"{row['label_agreement'] * 100:>6.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,182 @@
+"""워커/CLI 공통 설정 (환경변수로 덮어쓰기 가능)"""
+import os
+
+# =========================
+# AWS 설정
+# =========================
+QUEUE_URL = os.environ.get("FIT_QUEUE_URL", "https://sqs.ap-northeast-2.amazonaws.com/302263062071/fitvideo_analysis")
+BUCKET_NAME = os.environ.get("FIT_BUCKET_NAME", "thefit-bucket")
+REGION_NAME = os.environ.get("FIT_REGION_NAME", "ap-northeast-2")
+
+# =========================
+# 서버 주소
+# =========================
+BASE_URL = os.environ.get("FIT_BASE_URL", "http://13.209.67.129:8000")
+
+# 다운로드/중간 파일 저장 위치
+DOWNLOAD_DIR = os.environ.get("FIT_DOWNLOAD_DIR", "/content")
+
+ROOT_PREFIX = "fitvideoresult"
+# exercise_id -> 폴더명 매핑
+EXERCISE_MAP = {
+    1: "deadlift",
+    2: "squat",
+    3: "bench_press",
+}
+
+# 세트 종료(마지막 스쿼트 후 이동) 이후에도 남겨둘 구간 (초)
+ACTIVE_TAIL_SEC = float(os.environ.get("FIT_ACTIVE_TAIL_SEC", "1.0"))
+
+# =========================
+# 작업 장부 (중복 처리 방지 / 재시도)
+# =========================
+# sqlite:///경로 (기본, 같은 머신의 워커끼리 공유) 또는 dynamodb://테이블명 (여러 머신 공유)
+LEDGER_URL = os.environ.get("FIT_LEDGER_URL", "sqlite:///" + os.path.join(DOWNLOAD_DIR, "fitvideo_jobs.sqlite3"))
+MAX_ATTEMPTS = int(os.environ.get("FIT_MAX_ATTEMPTS", "3"))
+# processing 상태가 이 시간 이상 갱신되지 않으면 워커가 죽은 것으로 보고 재시도 허용
+LEDGER_LEASE_SEC = int(os.environ.get("FIT_LEDGER_LEASE_SEC", "1800"))
+# 재시도 한도를 넘긴 메시지를 보낼 SQS 큐 (비어 있으면 로그만 남기고 삭제)
+DEAD_LETTER_QUEUE_URL = os.environ.get("FIT_DEAD_LETTER_QUEUE_URL", "")
+
+# 분석용 프레임 리더: auto (ffmpeg 있으면 ffmpeg), ffmpeg, opencv
+FRAME_READER = os.environ.get("FIT_FRAME_READER", "auto")
+
+# =========================
+# S3 전송 (멀티파트 병렬 전송)
+# =========================
+# MinIO 등 S3 호환 저장소로 테스트할 때 지정 (예: http://localhost:9000)
+S3_ENDPOINT_URL = os.environ.get("FIT_S3_ENDPOINT_URL") or None
+S3_MULTIPART_THRESHOLD = int(os.environ.get("FIT_S3_MULTIPART_THRESHOLD", str(8 * 1024 * 1024)))
+S3_MULTIPART_CHUNKSIZE = int(os.environ.get("FIT_S3_MULTIPART_CHUNKSIZE", str(8 * 1024 * 1024)))
+S3_MAX_CONCURRENCY = int(os.environ.get("FIT_S3_MAX_CONCURRENCY", "10"))
+# 여러 스레드가 같은 클라이언트를 공유하므로 연결 풀은 동시 전송 수보다 넉넉하게
+S3_MAX_POOL_CONNECTIONS = int(os.environ.get("FIT_S3_MAX_POOL_CONNECTIONS", "50"))
+
+# 분석 이력(컬럼 파일) 저장 위치
+HISTORY_DIR = os.environ.get("FIT_HISTORY_DIR", os.path.join(DOWNLOAD_DIR, "history"))
+
+# Pose 모델 캐스케이드: 1 이면 complexity 0 을 모든 프레임에, 무거운 모델은 필요한 프레임에만 사용
+POSE_CASCADE = os.environ.get("FIT_POSE_CASCADE", "0") == "1"
+POSE_CASCADE_HEAVY_COMPLEXITY = int(os.environ.get("FIT_POSE_CASCADE_HEAVY_COMPLEXITY", "1"))
+
+# Pose 추론 백엔드: mediapipe (기본), onnx, openvino (배치 추론, FIT_POSE_MODEL 필요)
+POSE_BACKEND = os.environ.get("FIT_POSE_BACKEND", "mediapipe")
+POSE_MODEL = os.environ.get("FIT_POSE_MODEL", "")
+# 모델 출력 형식: blazepose (33점) 또는 movenet (17점)
+POSE_MODEL_LAYOUT = os.environ.get("FIT_POSE_MODEL_LAYOUT", "blazepose")
+POSE_BATCH_SIZE = int(os.environ.get("FIT_POSE_BATCH_SIZE", "8"))
+
+# =========================
+# 작업 프로파일링 (느린 작업 사후 분석)
+# =========================
+# sample (스택 샘플링, 오버헤드 적음) 또는 cprofile, 비어 있으면 끔
+PROFILE_MODE = os.environ.get("FIT_PROFILE", "")
+# 처리 시간이 이 값 이상인 작업만 프로파일 결과를 남김
+PROFILE_THRESHOLD_SEC = float(os.environ.get("FIT_PROFILE_THRESHOLD_SEC", "120"))
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get("FIT_PROFILE_SAMPLE_INTERVAL", "0.01"))
+PROFILE_DIR = os.environ.get("FIT_PROFILE_DIR", os.path.join(DOWNLOAD_DIR, "profiles"))
+# 지정하면 S3 {prefix}/{원본 object_key}/ 아래에도 업로드
+PROFILE_S3_PREFIX = os.environ.get("FIT_PROFILE_S3_PREFIX", "")
+
+# =========================
+# 작업 스케줄러 (짧은 작업 우선 + 사용자별 공정성)
+# =========================
+SCHEDULER_ENABLED = os.environ.get("FIT_SCHEDULER", "0") == "1"
+# 미리 받아 둘 최대 메시지 수 (많을수록 재정렬 여지가 크지만 다른 워커 몫을 붙잡아 둠)
+SCHEDULER_PREFETCH = int(os.environ.get("FIT_SCHEDULER_PREFETCH", "10"))
+# 받아 둔 메시지가 처리 전에 다시 보이지 않도록 하는 가시성 타임아웃 (초)
+SCHEDULER_VISIBILITY_SEC = int(os.environ.get("FIT_SCHEDULER_VISIBILITY_SEC", "900"))
+# 1 이면 presigned URL 을 ffprobe 해 길이 측정, 아니면 크기로 추정
+SCHEDULER_PROBE = os.environ.get("FIT_SCHEDULER_PROBE", "0") == "1"
+SCHEDULER_BYTES_PER_SEC = float(os.environ.get("FIT_SCHEDULER_BYTES_PER_SEC", str(2 * 1024 * 1024)))
+# 대기 1초당 깎아 주는 비용(초) - 긴 작업이 계속 밀리지 않도록
+SCHEDULER_AGING = float(os.environ.get("FIT_SCHEDULER_AGING", "0.1"))
+SCHEDULER_REPORT_EVERY = int(os.environ.get("FIT_SCHEDULER_REPORT_EVERY", "10"))
+
+# =========================
+# 워커 supervisor (큐 깊이 기반 자동 확장)
+# =========================
+# 워커가 작업별 처리 시간을 기록할 파일 (supervisor 가 워커마다 지정)
+WORKER_STATS_PATH = os.environ.get("FIT_WORKER_STATS", "")
+SUPERVISOR_MIN_WORKERS = int(os.environ.get("FIT_SUPERVISOR_MIN_WORKERS", "1"))
+SUPERVISOR_MAX_WORKERS = int(os.environ.get("FIT_SUPERVISOR_MAX_WORKERS", str(os.cpu_count() or 1)))
+SUPERVISOR_INTERVAL_SEC = float(os.environ.get("FIT_SUPERVISOR_INTERVAL_SEC", "30"))
+# 쌓인 메시지를 이 시간 안에 처리할 수 있을 만큼 워커 수를 맞춤
+SUPERVISOR_TARGET_DRAIN_SEC = float(os.environ.get("FIT_SUPERVISOR_TARGET_DRAIN_SEC", "600"))
+# 워커 1개가 쓰는 CPU 코어 수 / 메모리 (실측 RSS 가 더 크면 실측값 사용)
+SUPERVISOR_CPUS_PER_WORKER = float(os.environ.get("FIT_SUPERVISOR_CPUS_PER_WORKER", "1"))
+SUPERVISOR_WORKER_MEM_MB = int(os.environ.get("FIT_SUPERVISOR_WORKER_MEM_MB", "1500"))
+# 이 횟수만큼 연속으로 워커가 남을 때만 1개씩 줄임
+SUPERVISOR_SCALE_DOWN_TICKS = int(os.environ.get("FIT_SUPERVISOR_SCALE_DOWN_TICKS", "3"))
+
+# =========================
+# 긴 동영상 구간 병렬 처리
+# =========================
+# 2 이상이면 동영상 1개의 분석/오버레이를 이 수만큼의 프로세스로 구간 병렬 처리 (supervisor 워커 수와 곱해짐)
+SEGMENT_WORKERS = int(os.environ.get("FIT_SEGMENT_WORKERS", "1"))
+# 구간 앞에 추가로 읽어 Pose 추적/필터를 안정시키는 프레임 수
+SEGMENT_OVERLAP_FRAMES = int(os.environ.get("FIT_SEGMENT_OVERLAP_FRAMES", "30"))
+# 이보다 짧은 구간은 만들지 않음 (짧은 동영상은 나누지 않음)
+SEGMENT_MIN_FRAMES = int(os.environ.get("FIT_SEGMENT_MIN_FRAMES", "150"))
+
+# =========================
+# 작업별 임시 파일 공간 (다운로드/정규화/오버레이 중간 파일)
+# =========================
+# 메모리 예산 안의 중간 파일은 tmpfs 에 두고, 넘으면 SCRATCH_DISK_DIR 에 둠 (예산 0 이면 항상 디스크)
+SCRATCH_MEMORY_DIR = os.environ.get("FIT_SCRATCH_MEMORY_DIR", "/dev/shm")
+SCRATCH_MEMORY_BUDGET_MB = int(os.environ.get("FIT_SCRATCH_MEMORY_BUDGET_MB", "1024"))
+SCRATCH_DISK_DIR = os.environ.get("FIT_SCRATCH_DISK_DIR", DOWNLOAD_DIR)
+# tmpfs 에 최소한 이만큼은 남겨 둠 (다른 워커 프로세스와 공유)
+SCRATCH_MIN_FREE_MB = int(os.environ.get("FIT_SCRATCH_MIN_FREE_MB", "256"))
+# 정규화본/오버레이본 크기 추정 = 원본 크기 × 이 비율 (mp4v 재인코딩은 원본보다 커지기 쉬움)
+SCRATCH_REENCODE_RATIO = float(os.environ.get("FIT_SCRATCH_REENCODE_RATIO", "2.0"))
+
+# =========================
+# CPU 자원 (워커별 스레드 수 / 코어 고정)
+# =========================
+# 0 이면 각 라이브러리 기본값 (보통 코어 수만큼 → 워커 여러 개면 과다 구독)
+CV2_THREADS = int(os.environ.get("FIT_CV2_THREADS", "0"))          # OpenCV 병렬 루프 + 디코더
+POSE_THREADS = int(os.environ.get("FIT_POSE_THREADS", "0"))        # ONNX Runtime / OpenVINO 추론
+ENCODER_THREADS = int(os.environ.get("FIT_ENCODER_THREADS", "0"))  # VideoWriter(ffmpeg) 인코더
+# 이 프로세스를 고정할 CPU 목록 (예: "0-3,8-11"), 비우면 고정하지 않음
+CPU_SET = os.environ.get("FIT_CPU_SET", "")
+# supervisor 가 워커마다 겹치지 않는 코어 묶음(SUPERVISOR_CPUS_PER_WORKER 개)을 배정하고 스레드 수를 맞춤
+SUPERVISOR_PIN_CORES = os.environ.get("FIT_SUPERVISOR_PIN_CORES", "0") == "1"
+
+# =========================
+# 저조도 보정 (분석용 축소 프레임)
+# =========================
+# 1 이면 어두운/저대비 동영상 보정 + Pose 미감지 프레임 재추론
+LOWLIGHT_ENHANCE = os.environ.get("FIT_LOWLIGHT_ENHANCE", "0") == "1"
+# 휘도 평균(0~255)이 이보다 낮거나 표준편차가 이보다 낮으면 보정
+LOWLIGHT_BRIGHTNESS = float(os.environ.get("FIT_LOWLIGHT_BRIGHTNESS", "70"))
+LOWLIGHT_CONTRAST = float(os.environ.get("FIT_LOWLIGHT_CONTRAST", "30"))
+LOWLIGHT_CLAHE_CLIP = float(os.environ.get("FIT_LOWLIGHT_CLAHE_CLIP", "2.0"))
+
+# =========================
+# 큐 적체 시 저하 모드 (load shedding)
+# =========================
+# 1 이면 큐 적체 시 정규화 생략 / 저해상도 추론 / 오버레이 지연으로 전환
+DEGRADE_ENABLED = os.environ.get("FIT_DEGRADE", "0") == "1"
+# 큐 깊이 또는 최근 작업 지연(큐 도착 → 완료) p90 이 이 이상이면 저하 모드
+DEGRADE_BACKLOG = int(os.environ.get("FIT_DEGRADE_BACKLOG", "30"))
+DEGRADE_LATENCY_SEC = float(os.environ.get("FIT_DEGRADE_LATENCY_SEC", "600"))
+# 둘 다 이 이하로 내려가면 정상 모드 복귀
+RECOVER_BACKLOG = int(os.environ.get("FIT_RECOVER_BACKLOG", "5"))
+RECOVER_LATENCY_SEC = float(os.environ.get("FIT_RECOVER_LATENCY_SEC", "180"))
+DEGRADE_CHECK_SEC = float(os.environ.get("FIT_DEGRADE_CHECK_SEC", "30"))
+DEGRADE_LATENCY_WINDOW_SEC = float(os.environ.get("FIT_DEGRADE_LATENCY_WINDOW_SEC", "900"))
+# 저하 모드 Pose 추론 프레임 크기 (width x height)
+DEGRADE_ANALYSIS_SIZE = tuple(int(v) for v in os.environ.get("FIT_DEGRADE_ANALYSIS_SIZE", "160x120").split("x"))
+# 지연 렌더링 메시지를 다시 미루는 시간 (초, SQS 최대 900)
+DEGRADE_DEFER_SEC = int(os.environ.get("FIT_DEGRADE_DEFER_SEC", "300"))
+# 지연 렌더링 메시지를 넣을 별도 저우선 큐 - 작업 큐 깊이(저하/복구 판단)에 섞이지 않도록 분리.
+# 비어 있으면 오버레이를 미루지 않고 저하 모드에서도 바로 렌더링한다
+DEFERRED_QUEUE_URL = os.environ.get("FIT_DEFERRED_QUEUE_URL", "")
+
+# =========================
+# 공유 메모리 프레임 파이프라인 (디코딩 / 추론 / 인코딩 프로세스 분리)
+# =========================
+SHM_PIPELINE = os.environ.get("FIT_SHM_PIPELINE", "0") == "1"
+# 공유 메모리 프레임 슬롯 수 (디코더가 앞서 나갈 수 있는 최대 프레임 수)
+SHM_PIPELINE_SLOTS = int(os.environ.get("FIT_SHM_PIPELINE_SLOTS", "8"))
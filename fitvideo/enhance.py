@@ -0,0 +1,108 @@
+"""어두운 동영상용 저조도 보정 (분석용 축소 프레임에만, 필요할 때만)
+
+video.preprocess_frame (노이즈 제거 + CLAHE + 선명화) 은 원본 크기 프레임에 너무 느려 쓰지 않는다.
+대신 분석용 축소 프레임(RGB) 에서
+
+- 밝기/대비를 주기적으로 싸게 측정 (축소 프레임을 다시 1/2 로 건너뛰어 읽은 휘도 평균/표준편차)
+- 어둡거나 대비가 낮으면 휘도(Y) 채널에만 CLAHE 적용 (CLAHE 객체는 동영상마다 1개 재사용)
+- 밝은 동영상이라도 Pose 가 놓친 프레임은 보정본으로 한 번 더 추론하고, 재추론으로 되찾는 비율이
+  높으면 그 동영상은 계속 보정 / 낮으면 재추론을 멈춤
+- 재추론은 상태 없는 백엔드(onnx, openvino)에서만 한다. MediaPipe 처럼 추적/스무딩 상태가 있는
+  백엔드에 같은 프레임을 다시 넣으면 "다음 프레임" 으로 취급되어 이후 프레임의 추적이 틀어지므로,
+  측정으로 어둡다고 판단한 프레임을 첫 추론 전에 보정하는 것만 한다
+
+판정 상태는 동영상마다 새로 시작하므로 EnhancedBackend 는 동영상 1개에 1개씩 만든다.
+"""
+from . import config
+from .pose_backends import PoseBackend
+
+MEASURE_INTERVAL = 30   # 밝기 측정 주기 (프레임)
+RETRY_SAMPLES = 20      # 재추론 효과를 판단하기 전 최소 재추론 수
+RETRY_KEEP_RATIO = 0.5  # 재추론 복구율이 이 이상이면 모든 프레임 보정
+RETRY_STOP_RATIO = 0.1  # 재추론 복구율이 이 미만이면 재추론 중단
+
+
+class LowLightEnhancer:
+    """밝기 측정 + 휘도 CLAHE (동영상 1개 단위 상태)"""
+
+    def __init__(self, brightness=None, contrast=None, clip_limit=None):
+        self.brightness_threshold = config.LOWLIGHT_BRIGHTNESS if brightness is None else brightness
+        self.contrast_threshold = config.LOWLIGHT_CONTRAST if contrast is None else contrast
+        self.clip_limit = config.LOWLIGHT_CLAHE_CLIP if clip_limit is None else clip_limit
+        self._clahe = None
+        self._frames = 0
+        self.dark = False
+        self.brightness = None
+        self.contrast = None
+
+    def measure(self, image):
+        """MEASURE_INTERVAL 프레임마다 밝기/대비를 다시 재서 dark 갱신 → dark 반환"""
+        if self._frames % MEASURE_INTERVAL == 0:
+            import cv2
+            mean, std = cv2.meanStdDev(cv2.cvtColor(image[::2, ::2], cv2.COLOR_RGB2GRAY))
+            self.brightness, self.contrast = float(mean[0][0]), float(std[0][0])
+            self.dark = self.brightness < self.brightness_threshold or self.contrast < self.contrast_threshold
+        self._frames += 1
+        return self.dark
+
+    def enhance(self, image):
+        """RGB 프레임의 휘도 채널에만 CLAHE 적용한 새 프레임"""
+        import cv2
+        if self._clahe is None:
+            self._clahe = cv2.createCLAHE(clipLimit=self.clip_limit, tileGridSize=(4, 4))
+        ycrcb = cv2.cvtColor(image, cv2.COLOR_RGB2YCrCb)
+        ycrcb[..., 0] = self._clahe.apply(ycrcb[..., 0].copy())
+        return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2RGB)
+
+
+class EnhancedBackend(PoseBackend):
+    """Pose 백엔드 앞에 저조도 보정을 붙인 백엔드 (동영상 1개 전용)"""
+
+    def __init__(self, backend, enhancer=None):
+        self.backend = backend
+        self.batch_size = backend.batch_size
+        self.stateless = backend.stateless
+        self.enhancer = enhancer or LowLightEnhancer()
+        self.always = False     # 재추론 복구율이 높아 모든 프레임 보정
+        self.retry = backend.stateless  # Pose 미감지 프레임 재추론 여부 (상태 있는 백엔드는 재추론 안 함)
+        self.enhanced_frames = 0
+        self.retries = 0
+        self.recovered = 0
+
+    def infer(self, images):
+        enhanced = [False] * len(images)
+        inputs = list(images)
+        for i, image in enumerate(images):
+            if self.enhancer.measure(image) or self.always:
+                inputs[i] = self.enhancer.enhance(image)
+                enhanced[i] = True
+        self.enhanced_frames += sum(enhanced)
+        landmarks = self.backend.infer(inputs)
+
+        # 보정 없이 놓친 프레임만 보정본으로 다시 추론
+        missed = [i for i, lm in enumerate(landmarks) if lm is None and not enhanced[i]]
+        if self.retry and missed:
+            retried = self.backend.infer([self.enhancer.enhance(images[i]) for i in missed])
+            for i, lm in zip(missed, retried):
+                landmarks[i] = lm
+            self.retries += len(missed)
+            self.recovered += sum(lm is not None for lm in retried)
+            self._update_policy()
+        return landmarks
+
+    def _update_policy(self):
+        if self.retries < RETRY_SAMPLES:
+            return
+        ratio = self.recovered / self.retries
+        if ratio >= RETRY_KEEP_RATIO and not self.always:
+            self.always = True
+            print(f"🌙 저조도 보정 재추론 효과 큼 ({ratio * 100:.0f}%) → 모든 프레임 보정")
+        elif ratio < RETRY_STOP_RATIO:
+            self.retry = False
+
+    def close(self):
+        if self.enhanced_frames or self.retries:
+            brightness = f"{self.enhancer.brightness:.0f}" if self.enhancer.brightness is not None else "-"
+            print(f"🌙 저조도 보정: {self.enhanced_frames} 프레임 (밝기 {brightness}) | "
+                  f"재추론 {self.retries} 프레임 중 {self.recovered} 프레임 복구")
+        self.backend.close()
@@ -0,0 +1,69 @@
+"""포즈 랜드마크 시계열 필터
+
+MediaPipe 임계값을 낮춰 잡음이 섞인 랜드마크가 그대로 각도 계산에 들어가던 것을
+33개 랜드마크 전체에 대한 벡터화 One-Euro 필터로 대체한다. visibility 가 낮은
+랜드마크는 측정값을 덜 반영하고 이전 추정치를 유지한다.
+"""
+import math
+
+import numpy as np
+
+
+def _smoothing_factor(dt, cutoff):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class LandmarkSmoother:
+    """(33, 4) [x, y, z, visibility] 배열을 프레임 단위로 받아 필터링한 배열 반환
+
+    - min_cutoff: 정지 상태 차단 주파수(Hz) - 낮을수록 떨림 감소
+    - beta: 속도에 따른 차단 주파수 증가율 - 클수록 빠른 동작에서 지연 감소
+    - min_visibility: 이 값 미만인 랜드마크는 visibility 비율만큼만 측정값 반영
+    - max_gap: 포즈 미감지 프레임이 이보다 길게 이어지면 필터 상태 초기화
+    """
+
+    def __init__(self, fps=30.0, min_cutoff=1.0, beta=5.0, d_cutoff=1.0, min_visibility=0.5, max_gap=10):
+        self.fps = float(fps)
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.min_visibility = min_visibility
+        self.max_gap = max_gap
+        self.reset()
+
+    def reset(self):
+        self.x_hat = None
+        self.dx_hat = None
+        self.last_frame = None
+
+    def __call__(self, landmarks, frame_idx):
+        landmarks = np.asarray(landmarks, dtype=np.float32)
+        position = landmarks[:, :3]
+        visibility = landmarks[:, 3:4]
+
+        gap = None if self.last_frame is None else frame_idx - self.last_frame
+        if gap is None or gap <= 0 or gap > self.max_gap:
+            self.x_hat = position.copy()
+            self.dx_hat = np.zeros_like(position)
+            self.last_frame = frame_idx
+            return landmarks.copy()
+
+        dt = gap / self.fps
+        dx = (position - self.x_hat) / dt
+        alpha_d = _smoothing_factor(dt, self.d_cutoff)
+        self.dx_hat = alpha_d * dx + (1 - alpha_d) * self.dx_hat
+
+        cutoff = self.min_cutoff + self.beta * np.abs(self.dx_hat)
+        tau = 1.0 / (2 * np.pi * cutoff)
+        alpha = 1.0 / (1.0 + tau / dt)
+        # 신뢰도가 낮은 랜드마크는 측정값 반영 비율을 낮춤
+        alpha = alpha * np.clip(visibility / self.min_visibility, 0.0, 1.0)
+
+        self.x_hat = alpha * position + (1 - alpha) * self.x_hat
+        self.last_frame = frame_idx
+
+        filtered = np.empty_like(landmarks)
+        filtered[:, :3] = self.x_hat
+        filtered[:, 3:] = landmarks[:, 3:]
+        return filtered
@@ -0,0 +1,336 @@
+"""백그라운드 디코딩 프레임 소스
+
+디코더 스레드가 미리 할당한 버퍼 슬롯에 프레임을 디코딩/축소/색변환해 넣고, 소비자(Pose 추론,
+오버레이 인코딩)는 링 형태로 순환하는 슬롯을 차례로 받는다. 코덱 디코딩이 추론과 겹쳐 진행되고,
+첫 바퀴 이후에는 프레임마다 새 배열을 할당하지 않는다.
+
+    with FrameReader(path, size=(240, 180), color=cv2.COLOR_BGR2RGB) as reader:
+        for frame_idx, frame in reader:
+            ...   # frame 은 다음 프레임을 받기 전까지만 유효 (보관하려면 copy)
+"""
+import queue
+import threading
+
+_END = object()
+
+
+def get_video_info(cap, default_fps=30, default_width=720, default_height=1280):
+    """VideoCapture 에서 (fps, width, height) 조회 - 값이 없으면 기본값"""
+    import cv2
+    fps = int(cap.get(cv2.CAP_PROP_FPS)) or default_fps
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or default_width
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or default_height
+    return fps, width, height
+
+
+class _Slot:
+    __slots__ = ("raw", "resized", "converted")
+
+    def __init__(self):
+        self.raw = None        # 디코딩 원본 (BGR, 원본 해상도)
+        self.resized = None    # size 지정 시 축소 결과
+        self.converted = None  # color 지정 시 색변환 결과
+
+
+class FrameReader:
+    """동영상 프레임을 백그라운드 스레드에서 디코딩해 순서대로 반환
+
+    - size: (width, height) 로 축소 (cv2.INTER_AREA)
+    - color: cv2.cvtColor 변환 코드 (예: cv2.COLOR_BGR2RGB)
+    - target_fps: normalize_video 와 같은 규칙으로 프레임 선택 (건너뛰는 프레임은 grab 만 수행)
+    - max_frames: 반환할 최대 프레임 수
+    - start_frame: 이 번호(프레임 선택 후 번호)부터 반환 - 해당 원본 프레임으로 seek 후 디코딩
+      (seek 위치가 맞지 않으면 처음부터 grab 으로 이동)
+    - pool_size: 버퍼 슬롯 수 (디코더가 앞서 나갈 수 있는 최대 프레임 수)
+    """
+
+    def __init__(self, video_path, size=None, color=None, target_fps=None, max_frames=None, pool_size=8,
+                 start_frame=0):
+        import cv2
+        self._video_path = video_path
+        self._cap = cv2.VideoCapture(video_path)
+        self.fps, self.width, self.height = get_video_info(self._cap)
+        self.size = size
+        self.color = color
+        self.target_fps = target_fps
+        self.max_frames = max_frames
+        self.start_frame = start_frame
+        # 원본 n 번째 프레임은 floor(n*T/S) 가 증가할 때 선택되고, 그 값이 선택 후 번호가 된다
+        self._resample = target_fps is not None and target_fps < self.fps
+        self._source_start = -(-start_frame * self.fps // target_fps) if self._resample else start_frame
+        if self._source_start > 0:
+            self._seek(self._source_start)
+
+        self._slots = [_Slot() for _ in range(pool_size)]
+        self._free = queue.Queue()
+        for index in range(pool_size):
+            self._free.put(index)
+        self._ready = queue.Queue(maxsize=pool_size + 1)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._decode, name="frame-decoder", daemon=True)
+        self._started = False
+
+    def _seek(self, source_frame):
+        """원본 source_frame 번째 프레임 직전으로 이동
+
+        CAP_PROP_POS_FRAMES seek 는 mp4v/VFR 에서 근처 키프레임이나 추정 위치에 멈출 수 있으므로
+        이동 후 위치를 확인하고, 다르면 처음부터 다시 열어 grab 으로 정확히 이동한다.
+        """
+        import cv2
+        if self._cap.set(cv2.CAP_PROP_POS_FRAMES, source_frame) \
+                and int(self._cap.get(cv2.CAP_PROP_POS_FRAMES)) == source_frame:
+            return
+        print(f"⚠️ seek 위치 불일치 → 처음부터 디코딩해 {source_frame} 프레임으로 이동")
+        self._cap.release()
+        self._cap = cv2.VideoCapture(self._video_path)
+        for _ in range(source_frame):
+            if not self._cap.grab():
+                break
+
+    def _fill(self, slot):
+        """slot 의 버퍼에 현재 프레임을 채우고 소비자에게 넘길 배열 반환"""
+        import cv2
+        ok, slot.raw = self._cap.retrieve(slot.raw)
+        if not ok:
+            return None
+        frame = slot.raw
+        if self.size is not None:
+            slot.resized = cv2.resize(frame, self.size, dst=slot.resized, interpolation=cv2.INTER_AREA)
+            frame = slot.resized
+        if self.color is not None:
+            slot.converted = cv2.cvtColor(frame, self.color, dst=slot.converted)
+            frame = slot.converted
+        return frame
+
+    def _selected(self, n):
+        """원본 n 번째 프레임이 목표 FPS 에서 선택되는지 (normalize_video / ffmpeg select 와 같은 규칙)"""
+        if not self._resample or n == 0:
+            return True
+        return n * self.target_fps // self.fps > (n - 1) * self.target_fps // self.fps
+
+    def _decode(self):
+        frame_count = self._source_start
+        selected_frames = 0
+        try:
+            while not self._stop.is_set():
+                if self.max_frames is not None and selected_frames >= self.max_frames:
+                    break
+                if not self._cap.grab():
+                    break
+
+                # FPS 조정: 목표 FPS에 맞춰 프레임 선택 (선택되지 않은 프레임은 retrieve 생략)
+                selected = self._selected(frame_count)
+                frame_count += 1
+                if not selected:
+                    continue
+
+                index = self._free.get()
+                if self._stop.is_set():
+                    break
+                frame = self._fill(self._slots[index])
+                if frame is None:
+                    break
+                self._ready.put((self.start_frame + selected_frames, index, frame))
+                selected_frames += 1
+        except Exception as e:
+            self._ready.put(e)
+            return
+        finally:
+            self._cap.release()
+        self._ready.put(_END)
+
+    def __iter__(self):
+        if not self._started:
+            self._started = True
+            self._thread.start()
+        previous = None
+        try:
+            while True:
+                item = self._ready.get()
+                # 소비자가 이전 프레임을 다 썼으므로 슬롯 반환
+                if previous is not None:
+                    self._free.put(previous)
+                    previous = None
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                frame_idx, index, frame = item
+                previous = index
+                yield frame_idx, frame
+        finally:
+            # break/예외로 반복이 끝나도 디코더 스레드와 캡처를 정리
+            self.close()
+
+    def close(self):
+        self._stop.set()
+        if self._started:
+            # 디코더가 빈 슬롯/큐 대기 중이면 깨워서 종료시킴
+            self._free.put(0)
+            while self._thread.is_alive():
+                try:
+                    self._ready.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self._thread.join()
+        else:
+            self._cap.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def probe_video(video_path):
+    """ffprobe 로 첫 비디오 스트림 정보 조회 → {fps, width, height, duration, frames}
+
+    fps 는 get_video_info 와 같이 정수로 내림한다 (29.97 → 29). 회전 메타데이터가 있으면
+    디코딩 결과 기준으로 width/height 를 바꿔 반환한다.
+    """
+    import json
+    import subprocess
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_streams", "-show_format", "-of", "json", video_path],
+        check=True, capture_output=True
+    ).stdout
+    info = json.loads(out)
+    stream = info["streams"][0]
+
+    num, _, den = stream.get("avg_frame_rate", "0/1").partition("/")
+    fps = int(float(num) / float(den or 1)) if float(den or 1) else 0
+    width, height = int(stream["width"]), int(stream["height"])
+
+    rotation = stream.get("tags", {}).get("rotate")
+    for side_data in stream.get("side_data_list", []):
+        rotation = side_data.get("rotation", rotation)
+    if rotation is not None and abs(int(float(rotation))) % 180 == 90:
+        width, height = height, width
+
+    duration = float(stream.get("duration") or info.get("format", {}).get("duration") or 0)
+    frames = int(stream["nb_frames"]) if str(stream.get("nb_frames", "")).isdigit() else None
+    return {"fps": fps or 30, "width": width, "height": height, "duration": duration, "frames": frames}
+
+
+def probe_frame_count(video_path):
+    """ffprobe 로 센 프레임 수 - 컨테이너 nb_frames, 없으면 패킷 수 (ffprobe 가 없거나 실패하면 None)"""
+    import shutil
+    import subprocess
+    if shutil.which("ffprobe") is None:
+        return None
+    try:
+        frames = probe_video(video_path)["frames"]
+        if frames is None:
+            out = subprocess.run(
+                ["ffprobe", "-v", "error", "-select_streams", "v:0", "-count_packets",
+                 "-show_entries", "stream=nb_read_packets", "-of", "csv=p=0", video_path],
+                check=True, capture_output=True, text=True
+            ).stdout.strip().strip(",")
+            frames = int(out) if out.isdigit() else None
+    except Exception as e:
+        print(f"프레임 수 조회 실패: {e}")
+        return None
+    return frames
+
+
+class FFmpegFrameReader:
+    """FFmpeg 파이프로 축소/색변환된 프레임을 바로 받아오는 리더 (FrameReader 와 같은 사용법)
+
+    디코더 쪽 scale/format 필터로 원하는 크기의 rgb24(bgr24) 를 출력하므로 파이썬 쪽에서는
+    원본 해상도 픽셀을 전혀 다루지 않는다. 반환하는 프레임은 미리 할당한 버퍼 위의 numpy 뷰이며
+    pool_size 프레임 뒤에 덮어써진다.
+    """
+
+    def __init__(self, video_path, size=None, rgb=True, target_fps=None, max_frames=None, pool_size=2, threads=None):
+        import numpy as np
+        info = probe_video(video_path)
+        self.fps, self.width, self.height = info["fps"], info["width"], info["height"]
+        self.video_path = video_path
+        self.size = size or (self.width, self.height)
+        self.target_fps = target_fps
+        self.max_frames = max_frames
+        self.threads = threads
+
+        out_width, out_height = self.size
+        self._frame_bytes = out_width * out_height * 3
+        self._buffers = [bytearray(self._frame_bytes) for _ in range(pool_size)]
+        self._views = [np.frombuffer(buf, dtype=np.uint8).reshape(out_height, out_width, 3) for buf in self._buffers]
+        self._pix_fmt = "rgb24" if rgb else "bgr24"
+        self._proc = None
+
+    def _command(self):
+        filters = []
+        if self.target_fps is not None and self.target_fps < self.fps:
+            # normalize_video 와 같은 프레임 선택: n 번째 프레임은 floor(n*T/S) 가 증가할 때 선택
+            t, s = self.target_fps, self.fps
+            filters.append(f"select='gt(floor(n*{t}/{s}),floor((n-1)*{t}/{s}))'")
+        if self.size != (self.width, self.height):
+            filters.append(f"scale={self.size[0]}:{self.size[1]}:flags=area")
+        filters.append(f"format={self._pix_fmt}")
+
+        cmd = ["ffmpeg", "-v", "error", "-nostdin"]
+        if self.threads:
+            cmd += ["-threads", str(self.threads)]
+        cmd += ["-i", self.video_path, "-an", "-vf", ",".join(filters), "-vsync", "0"]
+        if self.max_frames is not None:
+            cmd += ["-frames:v", str(self.max_frames)]
+        cmd += ["-f", "rawvideo", "-pix_fmt", self._pix_fmt, "pipe:1"]
+        return cmd
+
+    def _read_into(self, buffer):
+        view = memoryview(buffer)
+        filled = 0
+        while filled < self._frame_bytes:
+            n = self._proc.stdout.readinto(view[filled:])
+            if not n:
+                return False
+            filled += n
+        return True
+
+    def __iter__(self):
+        import subprocess
+        self._proc = subprocess.Popen(self._command(), stdout=subprocess.PIPE, bufsize=self._frame_bytes * 2)
+        try:
+            frame_idx = 0
+            while True:
+                slot = frame_idx % len(self._buffers)
+                if not self._read_into(self._buffers[slot]):
+                    return
+                yield frame_idx, self._views[slot]
+                frame_idx += 1
+        finally:
+            self.close()
+
+    def close(self):
+        if self._proc is None:
+            return
+        self._proc.stdout.close()
+        if self._proc.poll() is None:
+            self._proc.terminate()
+        self._proc.wait()
+        self._proc = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_frame_reader(video_path, size=None, rgb=False, target_fps=None, max_frames=None, backend=None):
+    """설정(FIT_FRAME_READER)에 따라 FFmpegFrameReader 또는 FrameReader 생성"""
+    import shutil
+    from . import config
+    backend = backend or config.FRAME_READER
+    use_ffmpeg = backend == "ffmpeg" or (
+        backend == "auto" and shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+    )
+    if use_ffmpeg:
+        # FIT_CV2_THREADS 는 ffmpeg 디코더 스레드에도 적용 (워커 수 × 스레드 수 벤치마크와 일치)
+        return FFmpegFrameReader(video_path, size=size, rgb=rgb, target_fps=target_fps, max_frames=max_frames,
+                                 threads=config.CV2_THREADS or None)
+
+    import cv2
+    return FrameReader(video_path, size=size, color=cv2.COLOR_BGR2RGB if rgb else None,
+                       target_fps=target_fps, max_frames=max_frames)
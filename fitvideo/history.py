@@ -0,0 +1,212 @@
+"""로컬 분석 이력 저장소 - 사용자/날짜/운동별로 나눈 컬럼 파일 + 일별 집계
+
+    {root}/user={id}/daily.npz                                  일별 집계 (날짜 x 운동 1행)
+    {root}/user={id}/date={yyyymmdd}/exercise={name}/sets.npz   세트별 결과
+    {root}/user={id}/date={yyyymmdd}/exercise={name}/reps.npz   rep 별 결과
+    {root}/user={id}/date={yyyymmdd}/exercise={name}/angles/{timestamp}.npy   프레임별 무릎 각도
+
+각 .npz 는 컬럼 이름 → numpy 배열이다. 추세/이력 조회는 사용자별 daily.npz 한 파일만 읽으면 되고,
+세트/rep 상세는 해당 파티션만 읽는다. 쓰기는 사용자별 파일 잠금 + 임시 파일 교체로 원자적으로 한다.
+
+    python -m fitvideo.history 12 --exercise squat --since 20250101
+"""
+import argparse
+import fcntl
+import os
+from contextlib import contextmanager
+
+import numpy as np
+
+from . import config
+
+SET_COLUMNS = ("timestamp", "load_kg", "rep_cnt", "score", "full", "basic", "half", "fail", "video_key")
+REP_COLUMNS = ("timestamp", "rep", "label", "min_knee_angle", "frame_start", "frame_end")
+DAILY_COLUMNS = ("date", "exercise", "sets", "reps", "volume_kg", "avg_score", "best_score",
+                 "full", "basic", "half", "fail")
+
+
+def _user_dir(root, user_id):
+    return os.path.join(root, f"user={user_id}")
+
+
+def _partition_dir(root, user_id, yyyymmdd, exercise):
+    return os.path.join(_user_dir(root, user_id), f"date={yyyymmdd}", f"exercise={exercise}")
+
+
+def _load(path):
+    """컬럼 파일 → {컬럼: 배열}, 없으면 빈 dict"""
+    if not os.path.exists(path):
+        return {}
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+
+def _save(path, columns):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **columns)
+    os.replace(tmp_path, path)
+
+
+def _append_rows(path, names, rows, timestamp):
+    """컬럼 파일에 timestamp 세트의 행 추가 - 기존 행은 교체 (재분석 시 중복 방지, 새 행이 없어도 삭제)"""
+    if not rows and not os.path.exists(path):
+        return
+    table = _load(path)
+    timestamps = {timestamp}
+    existing = [
+        tuple(table[name][i].item() for name in names)
+        for i in range(len(table.get(names[0], [])))
+        if table["timestamp"][i].item() not in timestamps
+    ]
+    all_rows = existing + list(rows)
+    _save(path, {name: np.array([row[i] for row in all_rows]) for i, name in enumerate(names)})
+
+
+@contextmanager
+def _user_lock(root, user_id):
+    directory = _user_dir(root, user_id)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, ".lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _rebuild_daily(root, user_id, yyyymmdd, exercise):
+    """파티션의 sets.npz 로 daily.npz 의 (날짜, 운동) 행 재계산"""
+    sets = _load(os.path.join(_partition_dir(root, user_id, yyyymmdd, exercise), "sets.npz"))
+    daily_path = os.path.join(_user_dir(root, user_id), "daily.npz")
+    daily = _load(daily_path)
+
+    rows = [
+        tuple(daily[name][i].item() for name in DAILY_COLUMNS)
+        for i in range(len(daily.get("date", [])))
+        if not (daily["date"][i] == yyyymmdd and daily["exercise"][i] == exercise)
+    ]
+    if len(sets.get("timestamp", [])):
+        rows.append((
+            yyyymmdd,
+            exercise,
+            len(sets["timestamp"]),
+            int(sets["rep_cnt"].sum()),
+            float((sets["load_kg"] * sets["rep_cnt"]).sum()),
+            float(sets["score"].mean()),
+            int(sets["score"].max()),
+            int(sets["full"].sum()),
+            int(sets["basic"].sum()),
+            int(sets["half"].sum()),
+            int(sets["fail"].sum()),
+        ))
+    rows.sort(key=lambda row: (row[0], row[1]))
+    _save(daily_path, {name: np.array([row[i] for row in rows]) for i, name in enumerate(DAILY_COLUMNS)})
+
+
+def append_result(user_id, timestamp, exercise, load_kg, result, video_key="", root=None):
+    """분석 결과 1세트를 이력에 추가하고 해당 날짜 집계 갱신"""
+    root = root or config.HISTORY_DIR
+    yyyymmdd = timestamp[:8]
+    partition = _partition_dir(root, user_id, yyyymmdd, exercise)
+    counts = result["counts"]
+
+    set_row = (
+        timestamp, float(load_kg), int(result["total_count"]), int(result["score"]),
+        counts.get("Full Squat", 0), counts.get("Basic Squat", 0),
+        counts.get("Half Squat", 0), counts.get("Fail Squat", 0), video_key or "",
+    )
+    rep_rows = [
+        (timestamp, rep["rep"], rep["label"], rep["min_knee_angle"], rep["frame_start"], rep["frame_end"])
+        for rep in result.get("rep_results", [])
+    ]
+    # 프레임별 무릎 각도 (포즈 미감지 프레임은 NaN)
+    angles = np.array(
+        [np.nan if f["knee_angle"] is None else f["knee_angle"] for f in result.get("frame_analysis", [])],
+        dtype=np.float32
+    )
+
+    with _user_lock(root, user_id):
+        _append_rows(os.path.join(partition, "sets.npz"), SET_COLUMNS, [set_row], timestamp)
+        # rep 이 0개로 재분석돼도 이전 분석의 rep 행은 지움 (sets 의 rep_cnt 와 일치)
+        _append_rows(os.path.join(partition, "reps.npz"), REP_COLUMNS, rep_rows, timestamp)
+        os.makedirs(os.path.join(partition, "angles"), exist_ok=True)
+        np.save(os.path.join(partition, "angles", f"{timestamp}.npy"), angles)
+        _rebuild_daily(root, user_id, yyyymmdd, exercise)
+
+
+def set_video_key(user_id, timestamp, exercise, video_key, root=None):
+    """이미 기록한 세트의 분석 영상 키만 갱신 (지연 렌더링 완료 시) → 해당 세트가 있었는지"""
+    root = root or config.HISTORY_DIR
+    path = os.path.join(_partition_dir(root, user_id, timestamp[:8], exercise), "sets.npz")
+    with _user_lock(root, user_id):
+        sets = _load(path)
+        if not len(sets.get("timestamp", [])):
+            return False
+        matched = sets["timestamp"] == timestamp
+        if not matched.any():
+            return False
+        # 고정 길이 문자열 배열이므로 목록으로 바꿔 교체 (긴 키가 잘리지 않도록)
+        keys = sets["video_key"].tolist()
+        sets["video_key"] = np.array([video_key if hit else key for hit, key in zip(matched, keys)])
+        _save(path, sets)
+    return True
+
+
+# =========================
+# 조회
+# =========================
+def daily_history(user_id, exercise=None, since=None, until=None, root=None):
+    """일별 집계 행 목록 (dict) - daily.npz 한 파일만 읽음"""
+    daily = _load(os.path.join(_user_dir(root or config.HISTORY_DIR, user_id), "daily.npz"))
+    if not daily:
+        return []
+    mask = np.ones(len(daily["date"]), dtype=bool)
+    if exercise:
+        mask &= daily["exercise"] == exercise
+    if since:
+        mask &= daily["date"] >= since
+    if until:
+        mask &= daily["date"] <= until
+    return [{name: daily[name][i].item() for name in DAILY_COLUMNS} for i in np.flatnonzero(mask)]
+
+
+def list_sets(user_id, yyyymmdd, exercise, root=None):
+    """해당 날짜/운동의 세트별 결과 (dict 목록)"""
+    sets = _load(os.path.join(_partition_dir(root or config.HISTORY_DIR, user_id, yyyymmdd, exercise), "sets.npz"))
+    return [{name: sets[name][i].item() for name in SET_COLUMNS} for i in range(len(sets.get("timestamp", [])))]
+
+
+def list_reps(user_id, yyyymmdd, exercise, root=None):
+    """해당 날짜/운동의 rep 별 결과 (dict 목록)"""
+    reps = _load(os.path.join(_partition_dir(root or config.HISTORY_DIR, user_id, yyyymmdd, exercise), "reps.npz"))
+    return [{name: reps[name][i].item() for name in REP_COLUMNS} for i in range(len(reps.get("timestamp", [])))]
+
+
+def knee_angles(user_id, timestamp, exercise, root=None):
+    """세트의 프레임별 무릎 각도 배열 (포즈 미감지 프레임은 NaN)"""
+    partition = _partition_dir(root or config.HISTORY_DIR, user_id, timestamp[:8], exercise)
+    return np.load(os.path.join(partition, "angles", f"{timestamp}.npy"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="사용자별 운동 이력 (일별 집계) 조회")
+    parser.add_argument("user_id")
+    parser.add_argument("--exercise", default=None)
+    parser.add_argument("--since", default=None, help="yyyymmdd")
+    parser.add_argument("--until", default=None, help="yyyymmdd")
+    parser.add_argument("--root", default=None, help="이력 저장 위치 (기본: FIT_HISTORY_DIR)")
+    args = parser.parse_args(argv)
+
+    rows = daily_history(args.user_id, args.exercise, args.since, args.until, args.root)
+    for row in rows:
+        print(f"{row['date']} {row['exercise']:<12} 세트 {row['sets']:>2} | 횟수 {row['reps']:>3} | "
+              f"볼륨 {row['volume_kg']:.0f}kg | 평균 {row['avg_score']:.0f}점 | 최고 {row['best_score']}점")
+    if not rows:
+        print("기록 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
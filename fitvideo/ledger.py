@@ -0,0 +1,424 @@
+"""작업 장부 - S3 키 + 내용 해시(ETag) 단위로 분석 작업 상태를 영구 기록
+
+프로세스 메모리의 processed_videos 집합을 대체한다. 워커 재시작/여러 워커 사이에서
+중복 처리를 막고, 실패한 작업은 MAX_ATTEMPTS 까지만 재시도한 뒤 dead 로 표시한다.
+
+상태 전이: (없음) → processing → done
+                         └→ failed → processing (재시도) ... → dead
+서버에 등록한 운동 ID(workout_id) 도 함께 기록해 재시도 시 운동을 다시 등록하지 않는다.
+처리 중에는 LeaseKeeper 가 lease(updated_at) 를 주기적으로 갱신해, lease_sec 보다 오래 걸리는
+작업을 다른 워커가 다시 가져가지 않게 한다.
+백엔드는 LEDGER_URL 스킴으로 선택한다 (sqlite://, dynamodb://, register_backend 로 추가).
+"""
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from . import config
+
+# claim() 결과
+CLAIMED = "claimed"   # 이 워커가 처리
+DONE = "done"         # 이미 처리 완료 → 메시지만 삭제
+BUSY = "busy"         # 다른 워커가 처리 중 → 메시지 유지
+DEAD = "dead"         # 재시도 한도 초과/영구 실패 → dead-letter
+
+# 기록되는 작업 상태
+STATE_PROCESSING = "processing"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+STATE_DEAD = "dead"
+
+
+class LeaseLost(Exception):
+    """처리 중인 작업의 lease 를 다른 워커가 가져감 - 이 워커는 결과를 저장하지 않고 손을 뗀다"""
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobLedger:
+    """작업 장부 인터페이스"""
+
+    def __init__(self, max_attempts=None, lease_sec=None, worker_id=None):
+        self.max_attempts = max_attempts or config.MAX_ATTEMPTS
+        self.lease_sec = lease_sec or config.LEDGER_LEASE_SEC
+        self.worker_id = worker_id or default_worker_id()
+
+    def claim(self, object_key, content_hash):
+        """처리 권한 획득 시도 → CLAIMED / DONE / BUSY / DEAD"""
+        raise NotImplementedError
+
+    def renew(self, object_key, content_hash):
+        """이 워커가 처리 중인 작업의 lease 갱신 → 아직 이 워커 소유면 True"""
+        raise NotImplementedError
+
+    def mark_done(self, object_key, content_hash, result_key=None):
+        raise NotImplementedError
+
+    def mark_failed(self, object_key, content_hash, error):
+        """실패 기록 → 재시도 가능하면 STATE_FAILED, 한도 초과면 STATE_DEAD 반환"""
+        raise NotImplementedError
+
+    def mark_dead(self, object_key, content_hash, error):
+        """재시도해도 소용없는 실패 (파일명 오류, 입실 기록 없음 등)"""
+        raise NotImplementedError
+
+    def set_workout_id(self, object_key, content_hash, workout_id):
+        """POST /workouts 로 등록한 운동 ID 기록 (재시도 때 재사용)"""
+        raise NotImplementedError
+
+    def get(self, object_key, content_hash):
+        """작업 기록 (dict) 또는 None"""
+        raise NotImplementedError
+
+
+class SQLiteLedger(JobLedger):
+    """SQLite 파일 기반 장부 - 같은 머신의 여러 워커 프로세스가 공유"""
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                object_key   TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                state        TEXT NOT NULL,
+                attempts     INTEGER NOT NULL DEFAULT 0,
+                worker       TEXT,
+                last_error   TEXT,
+                result_key   TEXT,
+                workout_id   INTEGER,
+                created_at   REAL NOT NULL,
+                updated_at   REAL NOT NULL,
+                PRIMARY KEY (object_key, content_hash)
+            )
+        """)
+        # workout_id 컬럼이 없던 기존 장부 파일
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "workout_id" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN workout_id INTEGER")
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        return cls(url[len("sqlite:///"):], **kwargs)
+
+    def _row(self, object_key, content_hash):
+        row = self._conn.execute(
+            "SELECT * FROM jobs WHERE object_key = ? AND content_hash = ?", (object_key, content_hash)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def claim(self, object_key, content_hash):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._row(object_key, content_hash)
+                if row is None:
+                    self._conn.execute(
+                        "INSERT INTO jobs (object_key, content_hash, state, attempts, worker, created_at, updated_at)"
+                        " VALUES (?, ?, ?, 1, ?, ?, ?)",
+                        (object_key, content_hash, STATE_PROCESSING, self.worker_id, now, now)
+                    )
+                    outcome = CLAIMED
+                elif row["state"] == STATE_DONE:
+                    outcome = DONE
+                elif row["state"] == STATE_DEAD:
+                    outcome = DEAD
+                elif row["state"] == STATE_PROCESSING and now - row["updated_at"] < self.lease_sec:
+                    outcome = BUSY
+                elif row["attempts"] >= self.max_attempts:
+                    # 실패했거나 처리 중 워커가 죽은 채로 한도 도달
+                    self._conn.execute(
+                        "UPDATE jobs SET state = ?, updated_at = ? WHERE object_key = ? AND content_hash = ?",
+                        (STATE_DEAD, now, object_key, content_hash)
+                    )
+                    outcome = DEAD
+                else:
+                    self._conn.execute(
+                        "UPDATE jobs SET state = ?, attempts = attempts + 1, worker = ?, updated_at = ?"
+                        " WHERE object_key = ? AND content_hash = ?",
+                        (STATE_PROCESSING, self.worker_id, now, object_key, content_hash)
+                    )
+                    outcome = CLAIMED
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return outcome
+
+    def renew(self, object_key, content_hash):
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET updated_at = ? WHERE object_key = ? AND content_hash = ? AND state = ? AND worker = ?",
+                (time.time(), object_key, content_hash, STATE_PROCESSING, self.worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def _set_state(self, object_key, content_hash, state, error=None, result_key=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, last_error = COALESCE(?, last_error),"
+                " result_key = COALESCE(?, result_key), updated_at = ?"
+                " WHERE object_key = ? AND content_hash = ?",
+                (state, error, result_key, time.time(), object_key, content_hash)
+            )
+
+    def mark_done(self, object_key, content_hash, result_key=None):
+        self._set_state(object_key, content_hash, STATE_DONE, result_key=result_key)
+
+    def mark_failed(self, object_key, content_hash, error):
+        row = self.get(object_key, content_hash)
+        attempts = row["attempts"] if row else self.max_attempts
+        state = STATE_DEAD if attempts >= self.max_attempts else STATE_FAILED
+        self._set_state(object_key, content_hash, state, error=error)
+        return state
+
+    def mark_dead(self, object_key, content_hash, error):
+        self._set_state(object_key, content_hash, STATE_DEAD, error=error)
+
+    def set_workout_id(self, object_key, content_hash, workout_id):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET workout_id = ?, updated_at = ? WHERE object_key = ? AND content_hash = ?",
+                (workout_id, time.time(), object_key, content_hash)
+            )
+
+    def get(self, object_key, content_hash):
+        with self._lock:
+            return self._row(object_key, content_hash)
+
+
+class DynamoDBLedger(JobLedger):
+    """DynamoDB 테이블 기반 장부 - 여러 머신의 워커가 공유 (조건부 쓰기로 중복 방지)
+
+    테이블 파티션 키: job_id (문자열, "{object_key}#{content_hash}")
+    """
+
+    def __init__(self, table_name, **kwargs):
+        super().__init__(**kwargs)
+        from .aws import get_client
+        self.table_name = table_name
+        self._client = get_client("dynamodb")
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        return cls(url[len("dynamodb://"):], **kwargs)
+
+    @staticmethod
+    def _job_id(object_key, content_hash):
+        return {"job_id": {"S": f"{object_key}#{content_hash}"}}
+
+    def claim(self, object_key, content_hash):
+        now = time.time()
+        try:
+            self._client.update_item(
+                TableName=self.table_name,
+                Key=self._job_id(object_key, content_hash),
+                UpdateExpression=(
+                    "SET #s = :processing, attempts = if_not_exists(attempts, :zero) + :one,"
+                    " worker = :worker, updated_at = :now, object_key = :key, content_hash = :hash,"
+                    " created_at = if_not_exists(created_at, :now)"
+                ),
+                ConditionExpression=(
+                    "attribute_not_exists(job_id)"
+                    " OR (#s = :failed AND attempts < :max)"
+                    " OR (#s = :processing AND updated_at < :expired AND attempts < :max)"
+                ),
+                ExpressionAttributeNames={"#s": "state"},
+                ExpressionAttributeValues={
+                    ":processing": {"S": STATE_PROCESSING},
+                    ":failed": {"S": STATE_FAILED},
+                    ":zero": {"N": "0"},
+                    ":one": {"N": "1"},
+                    ":max": {"N": str(self.max_attempts)},
+                    ":worker": {"S": self.worker_id},
+                    ":now": {"N": repr(now)},
+                    ":expired": {"N": repr(now - self.lease_sec)},
+                    ":key": {"S": object_key},
+                    ":hash": {"S": content_hash},
+                },
+            )
+            return CLAIMED
+        except self._client.exceptions.ConditionalCheckFailedException:
+            pass
+
+        row = self.get(object_key, content_hash) or {}
+        state = row.get("state")
+        if state == STATE_DONE:
+            return DONE
+        if state == STATE_PROCESSING and now - row.get("updated_at", 0) < self.lease_sec:
+            return BUSY
+        if state != STATE_DEAD:
+            self.mark_dead(object_key, content_hash, row.get("last_error") or "max attempts exceeded")
+        return DEAD
+
+    def renew(self, object_key, content_hash):
+        try:
+            self._client.update_item(
+                TableName=self.table_name,
+                Key=self._job_id(object_key, content_hash),
+                UpdateExpression="SET updated_at = :now",
+                ConditionExpression="#s = :processing AND worker = :worker",
+                ExpressionAttributeNames={"#s": "state"},
+                ExpressionAttributeValues={
+                    ":now": {"N": repr(time.time())},
+                    ":processing": {"S": STATE_PROCESSING},
+                    ":worker": {"S": self.worker_id},
+                },
+            )
+            return True
+        except self._client.exceptions.ConditionalCheckFailedException:
+            return False
+
+    def _set_state(self, object_key, content_hash, state, error=None, result_key=None):
+        names = {"#s": "state"}
+        values = {":state": {"S": state}, ":now": {"N": repr(time.time())}}
+        expression = "SET #s = :state, updated_at = :now"
+        if error is not None:
+            expression += ", last_error = :error"
+            values[":error"] = {"S": error}
+        if result_key is not None:
+            expression += ", result_key = :result"
+            values[":result"] = {"S": result_key}
+        self._client.update_item(
+            TableName=self.table_name,
+            Key=self._job_id(object_key, content_hash),
+            UpdateExpression=expression,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+        )
+
+    def mark_done(self, object_key, content_hash, result_key=None):
+        self._set_state(object_key, content_hash, STATE_DONE, result_key=result_key)
+
+    def mark_failed(self, object_key, content_hash, error):
+        row = self.get(object_key, content_hash) or {}
+        attempts = row.get("attempts", self.max_attempts)
+        state = STATE_DEAD if attempts >= self.max_attempts else STATE_FAILED
+        self._set_state(object_key, content_hash, state, error=error)
+        return state
+
+    def mark_dead(self, object_key, content_hash, error):
+        self._set_state(object_key, content_hash, STATE_DEAD, error=error)
+
+    def set_workout_id(self, object_key, content_hash, workout_id):
+        self._client.update_item(
+            TableName=self.table_name,
+            Key=self._job_id(object_key, content_hash),
+            UpdateExpression="SET workout_id = :workout, updated_at = :now",
+            ExpressionAttributeValues={":workout": {"N": str(workout_id)}, ":now": {"N": repr(time.time())}},
+        )
+
+    def get(self, object_key, content_hash):
+        item = self._client.get_item(
+            TableName=self.table_name,
+            Key=self._job_id(object_key, content_hash),
+            ConsistentRead=True,
+        ).get("Item")
+        if item is None:
+            return None
+        row = {}
+        for name, value in item.items():
+            if "N" in value:
+                number = float(value["N"])
+                row[name] = int(number) if number.is_integer() else number
+            else:
+                row[name] = value.get("S")
+        return row
+
+
+class LeaseKeeper:
+    """with 블록 동안 작업 lease 를 백그라운드에서 주기적으로 갱신 (heartbeat)
+
+    다운로드/분석/렌더링이 lease_sec 보다 길어져도 다른 워커가 같은 작업을 다시 가져가지 않는다.
+    운동 등록/결과 저장 같은 외부 쓰기 직전에는 check() 로 lease 를 바로 갱신해 소유를 확인한다.
+    """
+
+    def __init__(self, ledger, object_key, content_hash, interval=None):
+        self.ledger = ledger
+        self.object_key = object_key
+        self.content_hash = content_hash
+        self.interval = interval or max(1.0, ledger.lease_sec / 3)
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ledger-lease", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.renew():
+                return
+
+    def renew(self):
+        """lease 갱신 → 소유를 잃었으면 False (장부 일시 오류는 다음 주기에 다시 시도)"""
+        try:
+            owned = self.ledger.renew(self.object_key, self.content_hash)
+        except Exception as e:
+            print(f"작업 lease 갱신 실패: {e}")
+            return True
+        if not owned:
+            self.lost = True
+            print(f"⚠️ 작업 lease 를 다른 워커가 가져감: {self.object_key}")
+        return owned
+
+    def check(self):
+        """단계 경계에서 호출 - 다른 워커에게 넘어갔으면 LeaseLost"""
+        if self.lost or not self.renew():
+            raise LeaseLost(self.object_key)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+# 스킴 → 장부 생성 함수
+LEDGER_BACKENDS = {
+    "sqlite": SQLiteLedger.from_url,
+    "dynamodb": DynamoDBLedger.from_url,
+}
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def register_backend(scheme, factory):
+    """새 장부 백엔드 등록 - factory(url, **kwargs) -> JobLedger"""
+    LEDGER_BACKENDS[scheme] = factory
+
+
+def open_ledger(url, **kwargs):
+    scheme = url.split("://", 1)[0]
+    factory = LEDGER_BACKENDS.get(scheme)
+    if factory is None:
+        raise ValueError(f"지원하지 않는 작업 장부 URL: {url}")
+    return factory(url, **kwargs)
+
+
+def get_ledger():
+    """config.LEDGER_URL 로 연 프로세스 공용 장부"""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = open_ledger(config.LEDGER_URL)
+        return _ledger
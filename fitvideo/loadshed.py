@@ -0,0 +1,95 @@
+"""큐 적체 시 처리 품질을 낮춰 횟수 결과를 제때 내는 저하 모드 (load shedding)
+
+큐 깊이나 최근 작업 지연(큐 도착 → 처리 완료) p90 이 기준을 넘으면 저하 모드로 바꾸고,
+둘 다 복구 기준 아래로 내려가면 정상 모드로 돌아온다 (기준을 따로 두어 모드가 자주 바뀌지 않게 함).
+
+저하 모드에서 워커는
+- 정규화를 건너뛰고 원본 프레임 번호로 분석
+- 더 작은 프레임(DEGRADE_ANALYSIS_SIZE) 으로 Pose 추론
+- 횟수/점수만 저장하고 오버레이 렌더링은 지연 렌더링 메시지로 별도 큐(DEFERRED_QUEUE_URL)에 넣음
+  (지연 렌더링 메시지는 정상 모드일 때만 처리하고, 저하 모드에서는 다시 미뤄 둠)
+
+큐 깊이는 작업 큐만 본다. 미뤄 둔 렌더링이 같은 큐에 쌓이면 적체가 풀려도 복구 기준 아래로
+내려가지 않아 저하 모드에 머물게 되므로 지연 렌더링은 반드시 다른 큐를 쓴다.
+"""
+import json
+import time
+from collections import deque
+
+from . import config
+from .utils import percentile
+
+DEFERRED_RENDER = "deferred_render"  # 지연 렌더링 메시지 본문 키
+
+
+def message_latency(msg, now=None):
+    """큐 도착(SentTimestamp) → 지금까지 걸린 시간 (초), 알 수 없으면 None"""
+    sent_ms = msg.get("Attributes", {}).get("SentTimestamp")
+    if not sent_ms:
+        return None
+    return (now or time.time()) - int(sent_ms) / 1000
+
+
+def is_deferred_render(msg):
+    try:
+        return DEFERRED_RENDER in json.loads(msg["Body"])
+    except Exception:
+        return False
+
+
+class LoadShedder:
+    """큐 깊이 + 최근 작업 지연으로 저하 모드 여부 판단 (워커 프로세스당 1개)"""
+
+    def __init__(self, depth_fn=None):
+        self.depth_fn = depth_fn
+        self.degraded = False
+        self.depth = None
+        self._latencies = deque()  # (완료 시각, 지연)
+        self._checked_at = 0.0
+
+    def record(self, msg):
+        """처리를 마친 메시지의 지연 기록 (지연 렌더링 메시지는 제외)"""
+        latency = message_latency(msg)
+        if latency is not None and not is_deferred_render(msg):
+            self._latencies.append((time.time(), latency))
+
+    def latency_p90(self):
+        cutoff = time.time() - config.DEGRADE_LATENCY_WINDOW_SEC
+        while self._latencies and self._latencies[0][0] < cutoff:
+            self._latencies.popleft()
+        return percentile([latency for _, latency in self._latencies], 90)
+
+    def check(self):
+        """필요하면 큐 깊이를 다시 읽고 모드 갱신 → 저하 모드 여부"""
+        if not config.DEGRADE_ENABLED:
+            return False
+        now = time.time()
+        if now - self._checked_at >= config.DEGRADE_CHECK_SEC:
+            self._checked_at = now
+            try:
+                if self.depth_fn is None:
+                    from .aws import get_queue_depth
+                    self.depth_fn = get_queue_depth
+                self.depth = self.depth_fn()
+            except Exception as e:
+                print(f"큐 상태 확인 실패: {e}")
+
+        depth = self.depth or 0
+        p90 = self.latency_p90() or 0.0
+        if not self.degraded and (depth >= config.DEGRADE_BACKLOG or p90 >= config.DEGRADE_LATENCY_SEC):
+            self.degraded = True
+            print(f"🐢 저하 모드 전환: 큐 {depth}, 지연 p90 {p90:.0f}s → 정규화 생략 / 저해상도 추론 / 오버레이 지연")
+        elif self.degraded and depth <= config.RECOVER_BACKLOG and p90 <= config.RECOVER_LATENCY_SEC:
+            self.degraded = False
+            print(f"🐇 정상 모드 복귀: 큐 {depth}, 지연 p90 {p90:.0f}s")
+        return self.degraded
+
+
+_shedder = None
+
+
+def get_load_shedder():
+    global _shedder
+    if _shedder is None:
+        _shedder = LoadShedder()
+    return _shedder
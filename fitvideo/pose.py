@@ -0,0 +1,108 @@
+"""MediaPipe Pose 생성 및 랜드마크 인덱스
+
+mediapipe 는 ``get_mp_pose()`` / ``create_pose()`` 를 처음 호출할 때 import 된다.
+각도 계산 코드는 mediapipe 없이도 동작하도록 33점 인덱스를 ``PoseLandmark`` 로 따로 둔다.
+"""
+from enum import IntEnum
+
+
+class PoseLandmark(IntEnum):
+    """mediapipe.solutions.pose.PoseLandmark 와 동일한 33점 레이아웃"""
+    NOSE = 0
+    LEFT_EYE_INNER = 1
+    LEFT_EYE = 2
+    LEFT_EYE_OUTER = 3
+    RIGHT_EYE_INNER = 4
+    RIGHT_EYE = 5
+    RIGHT_EYE_OUTER = 6
+    LEFT_EAR = 7
+    RIGHT_EAR = 8
+    MOUTH_LEFT = 9
+    MOUTH_RIGHT = 10
+    LEFT_SHOULDER = 11
+    RIGHT_SHOULDER = 12
+    LEFT_ELBOW = 13
+    RIGHT_ELBOW = 14
+    LEFT_WRIST = 15
+    RIGHT_WRIST = 16
+    LEFT_PINKY = 17
+    RIGHT_PINKY = 18
+    LEFT_INDEX = 19
+    RIGHT_INDEX = 20
+    LEFT_THUMB = 21
+    RIGHT_THUMB = 22
+    LEFT_HIP = 23
+    RIGHT_HIP = 24
+    LEFT_KNEE = 25
+    RIGHT_KNEE = 26
+    LEFT_ANKLE = 27
+    RIGHT_ANKLE = 28
+    LEFT_HEEL = 29
+    RIGHT_HEEL = 30
+    LEFT_FOOT_INDEX = 31
+    RIGHT_FOOT_INDEX = 32
+
+
+NUM_LANDMARKS = len(PoseLandmark)
+
+# mediapipe.solutions.pose.POSE_CONNECTIONS 와 동일한 뼈대 연결
+POSE_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 7), (0, 4), (4, 5), (5, 6), (6, 8), (9, 10),
+    (11, 12), (11, 13), (13, 15), (15, 17), (15, 19), (15, 21), (17, 19),
+    (12, 14), (14, 16), (16, 18), (16, 20), (16, 22), (18, 20),
+    (11, 23), (12, 24), (23, 24), (23, 25), (24, 26), (25, 27), (26, 28),
+    (27, 29), (28, 30), (29, 31), (30, 32), (27, 31), (28, 32),
+)
+VISIBILITY_THRESHOLD = 0.5  # 이보다 visibility 가 낮은 점은 그리지 않음 (mediapipe drawing_utils 와 동일)
+
+
+def get_mp_pose():
+    """mediapipe.solutions.pose 모듈 (지연 import)"""
+    import mediapipe as mp
+    return mp.solutions.pose
+
+
+def get_drawing_utils():
+    import mediapipe as mp
+    return mp.solutions.drawing_utils
+
+
+def create_pose(model_complexity=1, min_detection_confidence=0.5, min_tracking_confidence=0.5, smooth_landmarks=True):
+    """영상(연속 프레임) 분석용 Pose 인스턴스 생성"""
+    return get_mp_pose().Pose(
+        static_image_mode=False,
+        model_complexity=model_complexity,
+        smooth_landmarks=smooth_landmarks,
+        enable_segmentation=False,
+        smooth_segmentation=True,
+        min_detection_confidence=min_detection_confidence,
+        min_tracking_confidence=min_tracking_confidence
+    )
+
+
+def landmarks_to_array(landmark_list):
+    """mediapipe 랜드마크 목록 → (33, 4) [x, y, z, visibility] float32 배열"""
+    import numpy as np
+    return np.array([[lm.x, lm.y, lm.z, lm.visibility] for lm in landmark_list], dtype=np.float32)
+
+
+def write_landmarks(array, landmark_list):
+    """필터링된 배열 값을 mediapipe 랜드마크 목록에 다시 기록 (그리기용)"""
+    for lm, (x, y, z, _) in zip(landmark_list, array):
+        lm.x, lm.y, lm.z = float(x), float(y), float(z)
+
+
+def draw_landmarks(image, landmarks):
+    """(33, 4) 랜드마크 배열을 BGR 프레임에 그림 (mediapipe drawing_utils 기본 스타일)"""
+    import cv2
+    height, width = image.shape[:2]
+    points = {}
+    for index, (x, y, _, visibility) in enumerate(landmarks):
+        if visibility < VISIBILITY_THRESHOLD or not (0 <= x <= 1 and 0 <= y <= 1):
+            continue
+        points[index] = (min(int(x * width), width - 1), min(int(y * height), height - 1))
+    for start, end in POSE_CONNECTIONS:
+        if start in points and end in points:
+            cv2.line(image, points[start], points[end], (224, 224, 224), 2)
+    for point in points.values():
+        cv2.circle(image, point, 2, (0, 0, 255), 2)
@@ -0,0 +1,272 @@
+"""Pose 추론 백엔드 - 프레임 배치 → 33점 랜드마크 배열
+
+모든 백엔드는 RGB 프레임 목록을 받아 프레임마다 (33, 4) [x, y, z, visibility] 배열
+(미감지 시 None) 을 반환한다. 인덱스는 PoseLandmark 레이아웃이므로 각도 계산/필터/그리기 코드는
+백엔드와 무관하게 동작한다.
+
+- mediapipe : Pose.process 를 프레임마다 호출 (영상 추적 상태가 있어 동영상마다 인스턴스 1개)
+- onnx      : ONNX Runtime CPU, 모델 입력 배치로 한 번에 추론
+- openvino  : OpenVINO CPU, 모델 입력 배치로 한 번에 추론
+
+onnx/openvino 는 상태가 없으므로(stateless) 여러 동영상의 프레임을 한 배치에 섞어도 된다.
+모델 출력 형식(layout)은 blazepose (39x5 랜드마크, 앞 33점 사용) 또는 movenet (COCO 17점 →
+33점 매핑, 나머지는 visibility 0) 을 지원한다. 새 런타임은 register_pose_backend 로 추가한다.
+"""
+import numpy as np
+
+from . import config
+from .pose import NUM_LANDMARKS, PoseLandmark, create_pose, landmarks_to_array
+
+# MoveNet(COCO 17점) 순서 → PoseLandmark
+COCO17_TO_POSE33 = [
+    PoseLandmark.NOSE,
+    PoseLandmark.LEFT_EYE, PoseLandmark.RIGHT_EYE,
+    PoseLandmark.LEFT_EAR, PoseLandmark.RIGHT_EAR,
+    PoseLandmark.LEFT_SHOULDER, PoseLandmark.RIGHT_SHOULDER,
+    PoseLandmark.LEFT_ELBOW, PoseLandmark.RIGHT_ELBOW,
+    PoseLandmark.LEFT_WRIST, PoseLandmark.RIGHT_WRIST,
+    PoseLandmark.LEFT_HIP, PoseLandmark.RIGHT_HIP,
+    PoseLandmark.LEFT_KNEE, PoseLandmark.RIGHT_KNEE,
+    PoseLandmark.LEFT_ANKLE, PoseLandmark.RIGHT_ANKLE,
+]
+
+
+class PoseBackend:
+    """Pose 추론 백엔드 인터페이스"""
+
+    batch_size = 1      # 한 번에 넘기면 좋은 프레임 수
+    stateless = False   # True 면 여러 동영상의 프레임을 한 배치에 섞어도 됨
+
+    def infer(self, images):
+        """RGB 프레임 목록 → 프레임별 (33, 4) 배열 또는 None"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MediaPipeBackend(PoseBackend):
+    """mediapipe Pose (또는 같은 process() 를 가진 CascadePose 등) 를 감싼 백엔드"""
+
+    def __init__(self, pose=None, model_complexity=1, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 smooth_landmarks=False):
+        # 결과는 분석/오버레이 모두 LandmarkSmoother 를 거치므로 mediapipe 내부 스무딩은 기본으로 끔
+        self.pose = pose or create_pose(model_complexity, min_detection_confidence, min_tracking_confidence,
+                                        smooth_landmarks)
+
+    def infer(self, images):
+        landmarks = []
+        for image in images:
+            results = self.pose.process(image)
+            landmarks.append(landmarks_to_array(results.pose_landmarks.landmark) if results.pose_landmarks else None)
+        return landmarks
+
+    def close(self):
+        self.pose.close()
+
+
+# =========================
+# 배치 추론 모델 (ONNX Runtime / OpenVINO)
+# =========================
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _decode_blazepose(output, input_width, input_height):
+    """(N, 39*5) 또는 (N, 39, 5) 픽셀 좌표 → (N, 33, 4) 정규화 좌표"""
+    raw = output.reshape(len(output), -1, 5)[:, :NUM_LANDMARKS]
+    landmarks = np.empty((len(raw), NUM_LANDMARKS, 4), dtype=np.float32)
+    landmarks[..., 0] = raw[..., 0] / input_width
+    landmarks[..., 1] = raw[..., 1] / input_height
+    landmarks[..., 2] = raw[..., 2] / input_width
+    landmarks[..., 3] = _sigmoid(raw[..., 3])
+    return landmarks
+
+
+def _decode_movenet(output, input_width, input_height):
+    """(N, 1, 17, 3) [y, x, score] 정규화 좌표 → (N, 33, 4), 매핑 안 되는 점은 visibility 0"""
+    raw = output.reshape(len(output), -1, 3)[:, :len(COCO17_TO_POSE33)]
+    landmarks = np.zeros((len(raw), NUM_LANDMARKS, 4), dtype=np.float32)
+    landmarks[:, COCO17_TO_POSE33, 0] = raw[..., 1]
+    landmarks[:, COCO17_TO_POSE33, 1] = raw[..., 0]
+    landmarks[:, COCO17_TO_POSE33, 3] = raw[..., 2]
+    return landmarks
+
+
+LAYOUT_DECODERS = {
+    "blazepose": (_decode_blazepose, NUM_LANDMARKS),
+    "movenet": (_decode_movenet, len(COCO17_TO_POSE33)),
+}
+
+
+class BatchedModelBackend(PoseBackend):
+    """NHWC 이미지 배치를 받는 단일 입력 모델 공통 처리 (레터박스 → 추론 → 좌표 복원)
+
+    하위 클래스는 _load() 에서 입력 크기/자료형/고정 배치 여부를 정하고 _run(batch) 로 첫 출력을 반환한다.
+    """
+
+    stateless = True
+
+    def __init__(self, model_path, layout="blazepose", batch_size=8, min_detection_confidence=0.5):
+        if layout not in LAYOUT_DECODERS:
+            raise ValueError(f"지원하지 않는 모델 출력 형식: {layout}")
+        self.model_path = model_path
+        self.layout = layout
+        self.batch_size = batch_size
+        self.min_detection_confidence = min_detection_confidence
+        self._decode, self._num_points = LAYOUT_DECODERS[layout]
+        # _load() 가 설정: 입력 (width, height), numpy 자료형, 배치 차원이 1로 고정인지
+        self.input_width, self.input_height, self.input_dtype, self.fixed_batch = self._load()
+        self._batch = None  # 입력 배치 버퍼 (재사용)
+
+    def _load(self):
+        raise NotImplementedError
+
+    def _run(self, batch):
+        raise NotImplementedError
+
+    def _letterbox(self, images):
+        """비율 유지 축소 + 패딩으로 입력 배치 채움 → 프레임별 (scale_x, scale_y, offset_x, offset_y)"""
+        import cv2
+        if self._batch is None or len(self._batch) < len(images):
+            self._batch = np.zeros((max(len(images), self.batch_size), self.input_height, self.input_width, 3),
+                                   dtype=np.uint8)
+        transforms = []
+        for i, image in enumerate(images):
+            height, width = image.shape[:2]
+            scale = min(self.input_width / width, self.input_height / height)
+            new_width, new_height = max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+            pad_x, pad_y = (self.input_width - new_width) // 2, (self.input_height - new_height) // 2
+            self._batch[i].fill(0)
+            self._batch[i, pad_y:pad_y + new_height, pad_x:pad_x + new_width] = cv2.resize(
+                image, (new_width, new_height), interpolation=cv2.INTER_AREA)
+            # 입력 기준 정규화 좌표 → 원본 프레임 기준 정규화 좌표
+            transforms.append((self.input_width / new_width, self.input_height / new_height,
+                               pad_x / self.input_width, pad_y / self.input_height))
+        return transforms
+
+    def _to_input(self, batch):
+        if np.issubdtype(self.input_dtype, np.floating):
+            return batch.astype(self.input_dtype) / 255.0
+        return batch.astype(self.input_dtype, copy=False)
+
+    def infer(self, images):
+        if not images:
+            return []
+        transforms = self._letterbox(images)
+        batch = self._to_input(self._batch[:len(images)])
+        if self.fixed_batch:
+            output = np.concatenate([self._run(batch[i:i + 1]) for i in range(len(images))])
+        else:
+            output = self._run(batch)
+        landmarks = self._decode(output, self.input_width, self.input_height)
+
+        results = []
+        for lm, (scale_x, scale_y, offset_x, offset_y) in zip(landmarks, transforms):
+            lm[:, 0] = (lm[:, 0] - offset_x) * scale_x
+            lm[:, 1] = (lm[:, 1] - offset_y) * scale_y
+            lm[:, 2] *= scale_x
+            # 모델 출력 점들의 평균 신뢰도로 사람 유무 판단
+            detected = lm[:, 3].sum() / self._num_points >= self.min_detection_confidence
+            results.append(lm if detected else None)
+        return results
+
+
+class OnnxPoseBackend(BatchedModelBackend):
+    """ONNX Runtime CPU 추론"""
+
+    _DTYPES = {"tensor(float)": np.float32, "tensor(uint8)": np.uint8, "tensor(int32)": np.int32}
+
+    def _load(self):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if config.POSE_THREADS > 0:
+            # 워커 여러 개가 코어를 나눠 쓰도록 추론 스레드 제한
+            options.intra_op_num_threads = config.POSE_THREADS
+            options.inter_op_num_threads = 1
+        self._session = ort.InferenceSession(self.model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        batch, height, width, _ = model_input.shape
+        return int(width), int(height), self._DTYPES[model_input.type], batch == 1
+
+    def _run(self, batch):
+        return self._session.run(None, {self._input_name: batch})[0]
+
+
+class OpenVINOPoseBackend(BatchedModelBackend):
+    """OpenVINO CPU 추론 (.xml/.onnx 모델)"""
+
+    def _load(self):
+        import openvino as ov
+        core = ov.Core()
+        properties = {"INFERENCE_NUM_THREADS": config.POSE_THREADS} if config.POSE_THREADS > 0 else {}
+        self._compiled = core.compile_model(core.read_model(self.model_path), "CPU", properties)
+        model_input = self._compiled.input(0)
+        shape = model_input.get_partial_shape()
+        height, width = shape[1].get_length(), shape[2].get_length()
+        fixed_batch = shape[0].is_static and shape[0].get_length() == 1
+        return width, height, model_input.get_element_type().to_dtype(), fixed_batch
+
+    def _run(self, batch):
+        return self._compiled([batch])[self._compiled.output(0)]
+
+
+# 이름 → 백엔드 생성 함수
+POSE_BACKENDS = {
+    "mediapipe": MediaPipeBackend,
+    "onnx": OnnxPoseBackend,
+    "openvino": OpenVINOPoseBackend,
+}
+
+
+def register_pose_backend(name, factory):
+    """새 Pose 백엔드 등록 - factory(**kwargs) -> PoseBackend"""
+    POSE_BACKENDS[name] = factory
+
+
+def open_pose_backend(name=None, **kwargs):
+    """config(FIT_POSE_BACKEND / FIT_POSE_MODEL ...) 기준으로 백엔드 생성 - kwargs 가 우선"""
+    name = name or config.POSE_BACKEND
+    factory = POSE_BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"지원하지 않는 Pose 백엔드: {name}")
+    if isinstance(factory, type) and issubclass(factory, BatchedModelBackend):
+        kwargs.setdefault("model_path", config.POSE_MODEL)
+        kwargs.setdefault("layout", config.POSE_MODEL_LAYOUT)
+        kwargs.setdefault("batch_size", config.POSE_BATCH_SIZE)
+    return factory(**kwargs)
+
+
+def infer_frames(frames, backend, bgr=False):
+    """(frame_idx, frame) 반복 → (frame_idx, frame, landmarks) 를 backend.batch_size 단위로 추론해 순서대로 반환
+
+    batch_size 가 1 보다 크면 리더의 재사용 버퍼가 덮어써지지 않도록 프레임을 복사해 보관한다.
+    bgr=True 면 추론 입력만 RGB 로 변환한다 (반환 프레임은 원본 그대로).
+    """
+    import cv2
+    batch_size = max(1, backend.batch_size)
+    pending = []
+    rgb = None  # batch_size 1 일 때 재사용하는 RGB 버퍼
+
+    def run():
+        if bgr and batch_size == 1:
+            nonlocal rgb
+            rgb = cv2.cvtColor(pending[0][1], cv2.COLOR_BGR2RGB, dst=rgb)
+            images = [rgb]
+        elif bgr:
+            images = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for _, frame in pending]
+        else:
+            images = [frame for _, frame in pending]
+        return backend.infer(images)
+
+    for frame_idx, frame in frames:
+        pending.append((frame_idx, frame if batch_size == 1 else frame.copy()))
+        if len(pending) < batch_size:
+            continue
+        for (idx, kept), landmarks in zip(pending, run()):
+            yield idx, kept, landmarks
+        pending.clear()
+    if pending:
+        for (idx, kept), landmarks in zip(pending, run()):
+            yield idx, kept, landmarks
@@ -0,0 +1,127 @@
+"""작업 단위 프로파일러 - 느린 작업만 결과(flamegraph / pstats)를 남김
+
+FIT_PROFILE=sample   : 모든 스레드의 스택을 주기적으로 샘플링 → .folded
+                       (flamegraph.pl, speedscope, inferno 등에서 바로 열림, 스레드 이름이 최상위 프레임)
+FIT_PROFILE=cprofile : cProfile (호출 스레드만, 오버헤드 큼) → .pstats (snakeviz, flameprof 등)
+
+처리 시간이 PROFILE_THRESHOLD_SEC 미만이면 결과를 버린다. 결과 파일은 원본 S3 object_key 별로
+PROFILE_DIR/{object_key}/{시각}.{확장자} 에 저장하고, PROFILE_S3_PREFIX 가 있으면 S3 에도 올린다.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from . import config
+from .utils import message_object_key
+
+
+class StackSampler:
+    """백그라운드 스레드에서 sys._current_frames() 로 스택 샘플링 → 접힌(folded) 스택 집계"""
+
+    def __init__(self, interval=None):
+        self.interval = interval or config.PROFILE_SAMPLE_INTERVAL
+        self.counts = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class JobProfiler:
+    """with 블록을 프로파일링하고, 오래 걸렸으면 object_key 별 결과 파일 저장"""
+
+    def __init__(self, object_key, mode=None, threshold_sec=None):
+        self.object_key = object_key
+        self.mode = mode or config.PROFILE_MODE
+        self.threshold_sec = config.PROFILE_THRESHOLD_SEC if threshold_sec is None else threshold_sec
+        self.elapsed = None
+        self.artifact_path = None
+        self._profiler = None
+
+    def __enter__(self):
+        if self.mode == "cprofile":
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.mode == "sample":
+            self._profiler = StackSampler()
+            self._profiler.start()
+        else:
+            raise ValueError(f"지원하지 않는 프로파일 모드: {self.mode}")
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self._started
+        if self.mode == "cprofile":
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+
+        if self.elapsed >= self.threshold_sec:
+            # 프로파일 저장 실패가 작업 결과에 영향을 주지 않도록 함
+            try:
+                self._save()
+            except Exception as e:
+                print(f"프로파일 저장 실패: {e}")
+        return False
+
+    def _save(self):
+        stamp = time.strftime("%Y%m%d%H%M%S")
+        extension = "pstats" if self.mode == "cprofile" else "folded"
+        directory = os.path.join(config.PROFILE_DIR, self.object_key.replace("..", "_").strip("/"))
+        os.makedirs(directory, exist_ok=True)
+        self.artifact_path = os.path.join(directory, f"{stamp}.{extension}")
+
+        if self.mode == "cprofile":
+            self._profiler.dump_stats(self.artifact_path)
+        else:
+            self._profiler.dump(self.artifact_path)
+        print(f"🐢 느린 작업 ({self.elapsed:.1f}s ≥ {self.threshold_sec:.0f}s) 프로파일 저장: {self.artifact_path}")
+
+        if self.mode == "cprofile":
+            import pstats
+            pstats.Stats(self._profiler).sort_stats("cumulative").print_stats(15)
+
+        if config.PROFILE_S3_PREFIX:
+            from .transfer import upload_file
+            key = f"{config.PROFILE_S3_PREFIX}/{self.object_key}/{stamp}.{extension}"
+            upload_file(self.artifact_path, config.BUCKET_NAME, key)
+            print(f"☁️ 프로파일 업로드: s3://{config.BUCKET_NAME}/{key}")
+
+
+def profile_message(handler, msg):
+    """handler(msg) 를 FIT_PROFILE 설정에 따라 프로파일링하며 실행 (꺼져 있으면 그대로 호출)"""
+    if not config.PROFILE_MODE:
+        return handler(msg)
+    with JobProfiler(message_object_key(msg) or "unknown"):
+        return handler(msg)
@@ -0,0 +1,191 @@
+"""CPU 자원 설정 - 워커별 스레드 수 (OpenCV / Pose 런타임 / 인코더) 와 코어 고정
+
+OpenCV, 추론 런타임, ffmpeg 인코더가 각자 코어 수만큼 스레드를 띄우므로 한 서버에 워커를 여러 개
+돌리면 코어가 과다 구독되어 처리량이 오히려 떨어진다. 프로세스 시작 시 apply_resource_limits() 로
+
+- FIT_CPU_SET        : 허용 CPU 고정 (sched_setaffinity)
+- FIT_CV2_THREADS    : cv2.setNumThreads + 디코더 스레드 (OPENCV_FFMPEG_CAPTURE_OPTIONS,
+                       FFmpegFrameReader 는 ffmpeg -threads)
+- FIT_ENCODER_THREADS: VideoWriter 인코더 스레드 (OPENCV_FFMPEG_WRITER_OPTIONS)
+- FIT_POSE_THREADS   : ONNX Runtime / OpenVINO 추론 스레드 (백엔드 생성 시 config 에서 읽음)
+
+를 적용한다. mediapipe(TFLite) 는 스레드 수 설정이 없으므로 코어 고정으로만 제한된다.
+supervisor 는 FIT_SUPERVISOR_PIN_CORES=1 이면 워커마다 겹치지 않는 코어 묶음을 배정한다.
+
+서버별로 알맞은 워커 수 × 스레드 수는 벤치마크로 찾는다:
+
+    python -m fitvideo.resources sample.mp4 --workers 1,2,4 --threads 1,2,4 --overlay
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from . import config
+
+
+# =========================
+# CPU 구성
+# =========================
+def parse_cpu_list(text):
+    """"0-3,8" → [0, 1, 2, 3, 8]"""
+    cpus = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        start, _, end = part.partition("-")
+        cpus.extend(range(int(start), int(end or start) + 1))
+    return sorted(set(cpus))
+
+
+def format_cpu_list(cpus):
+    return ",".join(str(cpu) for cpu in cpus)
+
+
+def allowed_cpus():
+    """이 프로세스가 쓸 수 있는 CPU 번호"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def physical_cores(cpus=None):
+    """CPU 를 물리 코어별로 묶음 → [[cpu, SMT 형제...], ...] (sysfs 가 없으면 CPU 1개씩)"""
+    cores = {}
+    for cpu in cpus if cpus is not None else allowed_cpus():
+        topology = f"/sys/devices/system/cpu/cpu{cpu}/topology"
+        try:
+            with open(os.path.join(topology, "physical_package_id")) as f:
+                package = int(f.read())
+            with open(os.path.join(topology, "core_id")) as f:
+                core = int(f.read())
+        except (OSError, ValueError):
+            package, core = 0, cpu
+        cores.setdefault((package, core), []).append(cpu)
+    return [sorted(group) for _, group in sorted(cores.items())]
+
+
+def core_sets(num_sets, cpus_per_set, cpus=None):
+    """워커별 CPU 묶음 - SMT 형제가 같은 묶음에 들어가도록 물리 코어 순서로 나눔
+
+    CPU 가 모자라면 처음부터 다시 돌아가며 배정한다 (묶음끼리 겹침).
+    """
+    ordered = [cpu for group in physical_cores(cpus) for cpu in group]
+    size = max(1, min(int(cpus_per_set), len(ordered)))
+    return [[ordered[(i * size + j) % len(ordered)] for j in range(size)] for i in range(num_sets)]
+
+
+# =========================
+# 스레드 수 적용
+# =========================
+def thread_env(threads, cpus=None):
+    """자식 프로세스 환경 변수 - 모든 스레드 풀을 threads 개로, cpus 를 주면 해당 CPU 에 고정"""
+    env = {
+        "FIT_CV2_THREADS": str(threads),
+        "FIT_POSE_THREADS": str(threads),
+        "FIT_ENCODER_THREADS": str(threads),
+        # numpy/BLAS 등 OpenMP 기반 라이브러리
+        "OMP_NUM_THREADS": str(threads),
+        "OPENBLAS_NUM_THREADS": str(threads),
+        "MKL_NUM_THREADS": str(threads),
+    }
+    if cpus:
+        env["FIT_CPU_SET"] = format_cpu_list(cpus)
+    return env
+
+
+def apply_resource_limits():
+    """현재 프로세스에 CPU 고정 + OpenCV/인코더 스레드 수 적용 (프로세스 시작 시 호출)"""
+    cpus = parse_cpu_list(config.CPU_SET)
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    # VideoCapture/VideoWriter 를 열 때마다 읽으므로 이후에 여는 동영상부터 적용됨
+    if config.CV2_THREADS > 0:
+        os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS", f"threads;{config.CV2_THREADS}")
+    if config.ENCODER_THREADS > 0:
+        os.environ.setdefault("OPENCV_FFMPEG_WRITER_OPTIONS", f"threads;{config.ENCODER_THREADS}")
+    if config.CV2_THREADS > 0:
+        import cv2
+        cv2.setNumThreads(config.CV2_THREADS)
+    if cpus or config.CV2_THREADS or config.POSE_THREADS or config.ENCODER_THREADS:
+        print(f"🧮 CPU 설정: CPU {format_cpu_list(allowed_cpus())} | 스레드 cv2 {config.CV2_THREADS or '기본'}"
+              f" / pose {config.POSE_THREADS or '기본'} / encoder {config.ENCODER_THREADS or '기본'}")
+
+
+# =========================
+# 워커 수 × 스레드 수 벤치마크
+# =========================
+def _run_job(video_path, repeat, overlay):
+    """벤치마크 자식 프로세스 - 워커와 같은 분석(+오버레이) 을 repeat 번"""
+    apply_resource_limits()
+    from .analysis import analyze_squat
+    from .scratch import ScratchSpace
+    from .video import create_overlay_video
+    for _ in range(repeat):
+        result = analyze_squat(video_path)
+        if overlay:
+            with ScratchSpace("bench") as scratch:
+                create_overlay_video(video_path, result, scratch.path("bench_analyzed.mp4"))
+
+
+def benchmark(video_path, workers_list, threads_list, repeat=1, overlay=False, pin=False):
+    """워커 수 × 스레드 수 조합마다 동시에 동영상을 처리해 처리량 측정 → 결과 dict 목록"""
+    from .segments import count_frames
+    frames = count_frames(video_path)
+    rows = []
+    for workers in workers_list:
+        for threads in threads_list:
+            sets = core_sets(workers, threads) if pin else [None] * workers
+            command = [sys.executable, "-m", "fitvideo.resources", video_path, "--child", "--repeat", str(repeat)]
+            if overlay:
+                command.append("--overlay")
+            started = time.perf_counter()
+            procs = [subprocess.Popen(command, env=dict(os.environ, **thread_env(threads, cpus)),
+                                      stdout=subprocess.DEVNULL)
+                     for cpus in sets]
+            failed = sum(proc.wait() != 0 for proc in procs)
+            seconds = time.perf_counter() - started
+            videos = workers * repeat
+            rows.append({
+                "workers": workers,
+                "threads": threads,
+                "seconds": seconds,
+                "videos_per_min": videos * 60 / seconds,
+                "fps": videos * frames / seconds,
+                "failed": failed,
+            })
+            print(f"   workers {workers} × threads {threads}: {seconds:.1f}s ({rows[-1]['fps']:.1f} fps)")
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="워커 수 × 스레드 수 처리량 벤치마크")
+    parser.add_argument("video")
+    parser.add_argument("--workers", default="1,2,4", help="동시 워커 수 목록 (쉼표 구분)")
+    parser.add_argument("--threads", default="1,2,4", help="워커별 스레드 수 목록 (쉼표 구분)")
+    parser.add_argument("--repeat", type=int, default=1, help="워커별 처리 횟수")
+    parser.add_argument("--overlay", action="store_true", help="오버레이 렌더링/인코딩까지 포함")
+    parser.add_argument("--pin", action="store_true", help="워커마다 겹치지 않는 코어 묶음에 고정")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _run_job(args.video, args.repeat, args.overlay)
+        return 0
+
+    print(f"🧮 CPU {len(allowed_cpus())}개 (물리 코어 {len(physical_cores())}개)")
+    rows = benchmark(args.video, [int(w) for w in args.workers.split(",")],
+                     [int(t) for t in args.threads.split(",")], args.repeat, args.overlay, args.pin)
+    best = max((row for row in rows if not row["failed"]), key=lambda row: row["fps"], default=None)
+    print(f"{'workers':>7} {'threads':>7} {'seconds':>8} {'videos/min':>10} {'fps':>8} {'failed':>6}")
+    for row in rows:
+        mark = " ◀" if row is best else ""
+        print(f"{row['workers']:>7} {row['threads']:>7} {row['seconds']:>8.1f} {row['videos_per_min']:>10.2f} "
+              f"{row['fps']:>8.1f} {row['failed']:>6}{mark}")
+    if best:
+        print(f"✅ 최고 처리량: 워커 {best['workers']}개 × 스레드 {best['threads']}개 "
+              f"(FIT_SUPERVISOR_CPUS_PER_WORKER={best['threads']})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,255 @@
+"""수신 ↔ 처리 사이의 로컬 작업 스케줄러 (짧은 작업 우선 + 사용자별 공정성)
+
+SQS 가 주는 순서대로 처리하면 한 사용자가 올린 긴 세트 여러 개가 다른 사용자의 짧은 세트를 막는다.
+메시지를 여러 개 미리 받아 두고, 작업 비용(동영상 길이 추정)을 구해 가중 공정 큐 방식으로 고른다.
+
+- 사용자마다 지금까지 처리한 비용 합(가상 시간)을 두고, 각 사용자의 가장 짧은 작업을 처리했을 때의
+  종료 가상 시간(가상 시간 + 비용)이 가장 작은 작업을 먼저 처리한다 → 짧은 작업 우선 + 한 사용자 독점 방지
+- 새로 들어온 사용자는 대기 중인 사용자들의 최소 가상 시간에서 시작 (과거 공백으로 독점하지 않음)
+- 기다린 시간만큼 비용을 깎아(aging) 긴 작업도 결국 처리된다
+- 저하 모드에서 미룬 지연 렌더링 메시지는 일반 작업이 하나도 없을 때만 처리한다
+- 대기가 길어져도 받아 둔 메시지가 큐에 다시 보이지 않도록, 가시성 타임아웃의 절반을 넘긴 대기 작업은
+  백그라운드에서 가시성을 연장한다 (다른 워커 재수신 / 오래된 receipt handle 로 삭제 실패 방지)
+
+비용은 ffprobe 로 읽은 길이(초, SCHEDULER_PROBE=1 이고 ffprobe 가 있을 때) 또는 S3 객체 크기 /
+SCHEDULER_BYTES_PER_SEC 로 추정한다. 완료된 작업은 길이 구간(short/medium/long)별로 대기/처리/전체
+지연 백분위수를 집계해 주기적으로 출력한다.
+"""
+import os
+import threading
+import time
+from collections import defaultdict
+
+from . import config
+from .loadshed import is_deferred_render
+from .utils import message_object_key, parse_filename, percentile
+
+# 추정 길이(초) 기준 작업 구간
+COST_CLASSES = (("short", 30), ("medium", 120), ("long", float("inf")))
+
+
+def cost_class(cost):
+    for name, limit in COST_CLASSES:
+        if cost <= limit:
+            return name
+    return COST_CLASSES[-1][0]
+
+
+def estimate_cost(object_key):
+    """작업 비용 추정 (동영상 길이, 초) - 실패하면 0 (먼저 처리되어 바로 정리됨)"""
+    from .aws import get_object_size, get_presigned_url
+    try:
+        if config.SCHEDULER_PROBE:
+            import shutil
+            if shutil.which("ffprobe"):
+                from .frames import probe_video
+                duration = probe_video(get_presigned_url(object_key))["duration"]
+                if duration:
+                    return duration
+        return get_object_size(object_key) / config.SCHEDULER_BYTES_PER_SEC
+    except Exception as e:
+        print(f"작업 비용 추정 실패 ({object_key}): {e}")
+        return 0.0
+
+
+class Job:
+    __slots__ = ("msg", "object_key", "user", "cost", "received_at", "sent_at", "started_at", "deferred", "held_at")
+
+    def __init__(self, msg, object_key, user, cost, received_at, sent_at, deferred=False):
+        self.msg = msg
+        self.object_key = object_key
+        self.user = user
+        self.cost = cost
+        self.received_at = received_at
+        self.sent_at = sent_at      # 큐 도착 시각 (SentTimestamp, 없으면 수신 시각)
+        self.started_at = None
+        self.deferred = deferred    # 지연 렌더링 (가장 낮은 우선순위)
+        self.held_at = received_at  # 마지막으로 가시성 타임아웃을 새로 건 시각
+
+    @property
+    def cost_class(self):
+        return cost_class(self.cost)
+
+
+class JobScheduler:
+    """메시지를 모아 두고 (사용자 공정성, 짧은 작업 우선) 순서로 꺼내는 스케줄러"""
+
+    def __init__(self, estimator=None, aging=None, visibility_sec=None):
+        self.estimator = estimator or estimate_cost
+        self.aging = config.SCHEDULER_AGING if aging is None else aging
+        self.visibility_sec = visibility_sec or config.SCHEDULER_VISIBILITY_SEC
+        self._lock = threading.Lock()      # 가시성 연장 스레드와 _pending 공유
+        self._pending = {}                 # MessageId → Job
+        self._served = defaultdict(float)  # 대기 작업이 있는 사용자 → 처리한 비용 합 (가상 시간)
+        self._latencies = defaultdict(lambda: {"wait": [], "process": [], "total": []})
+        self.completed = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, msg):
+        """받은 메시지 등록 - 같은 메시지를 다시 받으면 receipt handle 만 갱신"""
+        message_id = msg.get("MessageId") or msg["ReceiptHandle"]
+        with self._lock:
+            if message_id in self._pending:
+                job = self._pending[message_id]
+                job.msg = msg
+                job.held_at = time.time()
+                return job
+
+        now = time.time()
+        object_key = message_object_key(msg)
+        user = None
+        cost = 0.0
+        if object_key:
+            user = parse_filename(os.path.basename(object_key))[0]
+            if not object_key.endswith("_analyzed.mp4"):
+                cost = self.estimator(object_key)
+        sent_ms = msg.get("Attributes", {}).get("SentTimestamp")
+        job = Job(msg, object_key, user, cost, now, int(sent_ms) / 1000 if sent_ms else now, is_deferred_render(msg))
+
+        with self._lock:
+            # 새로 대기하는 사용자는 현재 대기 중인 사용자들의 최소 가상 시간부터 시작
+            waiting_users = {j.user for j in self._pending.values()}
+            if job.user not in waiting_users and waiting_users:
+                floor = min(self._served[u] for u in waiting_users)
+                self._served[job.user] = max(self._served[job.user], floor)
+            self._pending[message_id] = job
+        print(f"🗂️ 작업 등록: {object_key} (사용자 {user}, 추정 {cost:.0f}s, {job.cost_class}) | 대기 {len(self._pending)}")
+        return job
+
+    def next(self):
+        """다음에 처리할 작업 (없으면 None)"""
+        with self._lock:
+            return self._next()
+
+    def _next(self):
+        if not self._pending:
+            return None
+        now = time.time()
+
+        def effective_cost(job):
+            return job.cost - self.aging * (now - job.received_at)
+
+        # 일반 작업이 있으면 지연 렌더링은 고르지 않음
+        only_deferred = all(job.deferred for job in self._pending.values())
+        by_user = defaultdict(list)
+        for message_id, job in self._pending.items():
+            if job.deferred == only_deferred:
+                by_user[job.user].append((effective_cost(job), message_id))
+        # 사용자별 가장 짧은 작업의 종료 가상 시간이 가장 이른 사용자
+        user = min(by_user, key=lambda u: self._served[u] + min(by_user[u])[0])
+        _, message_id = min(by_user[user])
+
+        job = self._pending.pop(message_id)
+        job.started_at = now
+        self._served[user] += job.cost
+        if not any(j.user == user for j in self._pending.values()):
+            # 대기 작업이 없는 사용자는 잊음 - 다시 들어오면 그때 대기 중인 사용자들의 최소 가상 시간부터
+            del self._served[user]
+        return job
+
+    def expiring(self):
+        """가시성 타임아웃의 절반 이상 지난 대기 작업 → 호출한 쪽이 가시성을 연장 (연장 시각은 지금으로 기록)"""
+        now = time.time()
+        with self._lock:
+            jobs = [job for job in self._pending.values() if now - job.held_at >= self.visibility_sec / 2]
+            for job in jobs:
+                job.held_at = now
+        return jobs
+
+    def drain(self):
+        """대기 중인 작업을 모두 꺼냄 (종료 시 메시지 반환용)"""
+        with self._lock:
+            jobs = list(self._pending.values())
+            self._pending.clear()
+            self._served.clear()
+        return jobs
+
+    def done(self, job):
+        """작업 완료 기록 (성공/실패 무관) → 구간별 지연 집계"""
+        finished_at = time.time()
+        latencies = self._latencies[job.cost_class]
+        latencies["wait"].append(job.started_at - job.received_at)
+        latencies["process"].append(finished_at - job.started_at)
+        latencies["total"].append(finished_at - job.sent_at)
+        self.completed += 1
+        if config.SCHEDULER_REPORT_EVERY and self.completed % config.SCHEDULER_REPORT_EVERY == 0:
+            self.print_report()
+
+    def report(self):
+        """구간별 {wait/process/total: {p50, p90, p99}} 과 작업 수"""
+        report = {}
+        for name, _ in COST_CLASSES:
+            latencies = self._latencies.get(name)
+            if not latencies or not latencies["total"]:
+                continue
+            report[name] = {"jobs": len(latencies["total"])}
+            for kind, values in latencies.items():
+                report[name][kind] = {f"p{q}": percentile(values, q) for q in (50, 90, 99)}
+        return report
+
+    def print_report(self):
+        print(f"📊 스케줄러 지연 (완료 {self.completed}건, 대기 {len(self._pending)}건)")
+        for name, stats in self.report().items():
+            total = stats["total"]
+            print(f"   {name:<6} {stats['jobs']:>4}건 | 전체 p50 {total['p50']:.1f}s p90 {total['p90']:.1f}s "
+                  f"p99 {total['p99']:.1f}s | 대기 p90 {stats['wait']['p90']:.1f}s | 처리 p90 {stats['process']['p90']:.1f}s")
+
+
+def run_scheduled(handler, should_stop=None, get_idle_message=None):
+    """스케줄러로 메시지를 모아 handler(msg) 로 처리하는 워커 루프
+
+    대기 작업이 없으면 get_idle_message() (지연 렌더링 큐 등) 로 받은 메시지를 처리한다.
+    should_stop() 이 참이 되면 진행 중인 작업을 마치고, 받아 둔 메시지는 큐에 바로 돌려준 뒤 종료한다.
+    """
+    from .aws import defer_message, get_messages, release_message
+    scheduler = JobScheduler()
+    stopped = threading.Event()
+
+    def keep_pending_hidden():
+        # 작업 1건이 오래 걸려도 대기 중인 메시지가 큐에 다시 보이지 않도록 주기적으로 가시성 연장
+        while not stopped.wait(scheduler.visibility_sec / 4):
+            for job in scheduler.expiring():
+                try:
+                    defer_message(job.msg["ReceiptHandle"], scheduler.visibility_sec)
+                except Exception as e:
+                    print(f"가시성 연장 실패 ({job.object_key}): {e}")
+
+    keeper = threading.Thread(target=keep_pending_hidden, name="scheduler-visibility", daemon=True)
+    keeper.start()
+    try:
+        while not (should_stop and should_stop()):
+            # 대기 작업이 적으면 더 받아옴 (대기 작업이 있으면 기다리지 않고 바로 확인)
+            if len(scheduler) < config.SCHEDULER_PREFETCH:
+                messages = get_messages(
+                    max_messages=min(10, config.SCHEDULER_PREFETCH - len(scheduler)),
+                    wait_seconds=0 if len(scheduler) else 10,
+                    visibility_timeout=scheduler.visibility_sec,
+                )
+                for msg in messages:
+                    scheduler.add(msg)
+
+            job = scheduler.next()
+            if job is None:
+                msg = get_idle_message() if get_idle_message else None
+                if msg:
+                    print("\n🎬 대기 작업 없음 - 지연 렌더링 처리")
+                    handler(msg)
+                else:
+                    print("🕓 동영상 없음, 대기 중...")
+                continue
+
+            print(f"\n📥 작업 시작: {job.object_key} ({job.cost_class}, 대기 {job.started_at - job.received_at:.0f}s)")
+            try:
+                success = handler(job.msg)
+            finally:
+                scheduler.done(job)
+            print("✅ 동영상 분석 완료" if success else "❌ 동영상 분석 실패")
+    finally:
+        stopped.set()
+        keeper.join()
+
+    for job in scheduler.drain():
+        release_message(job.msg["ReceiptHandle"])
+    scheduler.print_report()
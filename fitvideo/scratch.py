@@ -0,0 +1,134 @@
+"""작업별 임시 파일 공간 - 메모리(tmpfs) 우선, 예산을 넘으면 디스크
+
+다운로드 원본 / 정규화본 / 오버레이본 같은 중간 파일을 작업 1건 단위로 모아 관리한다.
+
+    with ScratchSpace(object_key) as scratch:
+        video_path = scratch.path("input.mp4", expected_bytes=size)
+        ...
+    # with 블록이 끝나면 (성공/예외 무관) 작업 디렉터리째 삭제 + 기록한 바이트 수 출력
+
+파일 경로는 OpenCV / ffmpeg / boto3 / 자식 프로세스에 그대로 넘겨야 하므로 memfd 대신 tmpfs
+디렉터리(SCRATCH_MEMORY_DIR, 기본 /dev/shm)를 쓴다. 예상 크기 합이 SCRATCH_MEMORY_BUDGET_MB 를
+넘거나 tmpfs 의 실제 남은 공간이 부족하면 SCRATCH_DISK_DIR 에 만든다.
+"""
+import os
+import shutil
+import tempfile
+import threading
+
+from . import config
+
+# 프로세스 전체 누적 통계 (get_scratch_metrics)
+_metrics = {"jobs": 0, "memory_files": 0, "disk_files": 0, "memory_bytes": 0, "disk_bytes": 0}
+_metrics_lock = threading.Lock()
+# 프로세스 안의 진행 중인 작업들이 예약한 메모리 (bytes)
+_reserved = 0
+
+
+def _free_bytes(directory):
+    stat = os.statvfs(directory)
+    return stat.f_bavail * stat.f_frsize
+
+
+def _memory_root():
+    """사용 가능한 tmpfs 디렉터리 (없거나 쓸 수 없으면 None)"""
+    directory = config.SCRATCH_MEMORY_DIR
+    if not directory or config.SCRATCH_MEMORY_BUDGET_MB <= 0:
+        return None
+    if not os.path.isdir(directory) or not os.access(directory, os.W_OK):
+        return None
+    return directory
+
+
+class ScratchSpace:
+    """작업 1건의 중간 파일 공간 - path() 로 받은 파일은 cleanup() 에서 모두 삭제"""
+
+    def __init__(self, job_name="job"):
+        self.job_name = job_name
+        self.files = {}  # 경로 → "memory" / "disk"
+        self._memory_dir = None
+        self._disk_dir = None
+        self._reserved = 0
+        self._closed = False
+
+    def _dir(self, kind):
+        prefix = "fitjob_" + "".join(c if c.isalnum() else "_" for c in self.job_name)[-40:] + "_"
+        if kind == "memory":
+            if self._memory_dir is None:
+                self._memory_dir = tempfile.mkdtemp(prefix=prefix, dir=_memory_root())
+            return self._memory_dir
+        if self._disk_dir is None:
+            os.makedirs(config.SCRATCH_DISK_DIR, exist_ok=True)
+            self._disk_dir = tempfile.mkdtemp(prefix=prefix, dir=config.SCRATCH_DISK_DIR)
+        return self._disk_dir
+
+    def _reserve_memory(self, expected_bytes):
+        """메모리 예산/tmpfs 남은 공간 안이면 예약 후 True"""
+        global _reserved
+        root = _memory_root()
+        if root is None:
+            return False
+        budget = config.SCRATCH_MEMORY_BUDGET_MB * 1024 * 1024
+        with _metrics_lock:
+            if _reserved + expected_bytes > budget:
+                return False
+            # 다른 워커 프로세스도 같은 tmpfs 를 쓰므로 실제 남은 공간도 확인
+            if _free_bytes(root) - expected_bytes < config.SCRATCH_MIN_FREE_MB * 1024 * 1024:
+                return False
+            _reserved += expected_bytes
+            self._reserved += expected_bytes
+        return True
+
+    def path(self, filename, expected_bytes=0):
+        """중간 파일 경로 - expected_bytes 가 메모리 예산 안이면 tmpfs, 아니면 디스크"""
+        kind = "memory" if self._reserve_memory(expected_bytes) else "disk"
+        path = os.path.join(self._dir(kind), os.path.basename(filename))
+        self.files[path] = kind
+        return path
+
+    def sibling(self, path, suffix, expected_bytes=0):
+        """path 와 같은 이름에 접미사를 붙인 새 중간 파일 (예: _normalized.mp4)"""
+        stem, extension = os.path.splitext(os.path.basename(path))
+        return self.path(f"{stem}{suffix}{extension}", expected_bytes)
+
+    def bytes_written(self):
+        """{memory, disk} 별 현재 파일 크기 합"""
+        written = {"memory": 0, "disk": 0}
+        for path, kind in self.files.items():
+            if os.path.exists(path):
+                written[kind] += os.path.getsize(path)
+        return written
+
+    def cleanup(self):
+        """작업 디렉터리 삭제 + 통계 반영 (여러 번 호출해도 안전)"""
+        global _reserved
+        if self._closed:
+            return
+        self._closed = True
+        written = self.bytes_written()
+        for directory in (self._memory_dir, self._disk_dir):
+            if directory:
+                shutil.rmtree(directory, ignore_errors=True)
+
+        memory_files = sum(1 for kind in self.files.values() if kind == "memory")
+        with _metrics_lock:
+            _reserved -= self._reserved
+            _metrics["jobs"] += 1
+            _metrics["memory_files"] += memory_files
+            _metrics["disk_files"] += len(self.files) - memory_files
+            _metrics["memory_bytes"] += written["memory"]
+            _metrics["disk_bytes"] += written["disk"]
+        print(f"🧹 작업 공간 정리: 파일 {len(self.files)}개 | 메모리 {written['memory'] / 1024 / 1024:.1f}MB"
+              f" / 디스크 {written['disk'] / 1024 / 1024:.1f}MB 기록")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+
+
+def get_scratch_metrics():
+    """프로세스 시작 이후 누적 작업 공간 통계"""
+    with _metrics_lock:
+        return dict(_metrics)
@@ -0,0 +1,248 @@
+"""긴 동영상 1개를 키프레임 기준 구간으로 나눠 여러 프로세스에서 분석/렌더링
+
+- 분석: 구간마다 디코딩 + Pose 만 병렬로 하고 (원본) 랜드마크를 돌려받는다. 랜드마크 필터와
+  반복 판정 상태 머신은 부모 프로세스에서 프레임 순서대로 한 번만 돌리므로 구간 경계에서 상태가
+  끊기지 않고, 구간 수/완료 순서와 무관하게 결과가 같다.
+- 렌더링: 구간마다 오버레이 mp4 를 만들고 ffmpeg concat(-c copy) 으로 순서대로 이어 붙인다.
+- 각 구간은 앞 SEGMENT_OVERLAP_FRAMES 프레임을 추가로 읽어 Pose 추적/랜드마크 필터를 안정시킨 뒤
+  자기 구간부터 사용한다. 구간 경계는 키프레임 + 겹침 위치에 두어 실제 읽기 시작(경계 - 겹침)이
+  키프레임이 되도록 한다 (seek 후 버리는 디코딩이 없음).
+- 분석은 부모의 상태 머신이 세트 종료를 판정하면 아직 시작하지 않은 구간은 취소하고, 실행 중인
+  구간은 중단시킨다 (analyze_squat 의 조기 종료와 같은 효과).
+
+프레임 번호는 FrameReader 와 같이 target_fps 로 선택한 뒤의 번호다.
+"""
+import multiprocessing
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import config
+from .analysis import ANALYSIS_SIZE, SquatFrameAnalyzer, create_analysis_backend
+from .frames import FrameReader, probe_frame_count
+from .pose import NUM_LANDMARKS
+from .pose_backends import infer_frames
+from .resources import apply_resource_limits
+from .video import create_overlay_video
+
+
+def count_frames(video_path, target_fps=None):
+    """동영상 프레임 수 (target_fps 를 주면 선택 후 프레임 수)
+
+    CAP_PROP_FRAME_COUNT 는 mp4v/VFR 에서 추정치이므로 ffprobe 가 있으면 nb_frames/패킷 수를 쓴다.
+    """
+    import cv2
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = int(cap.get(cv2.CAP_PROP_FPS)) or 30
+    cap.release()
+    probed = probe_frame_count(video_path)
+    if probed is not None:
+        total = probed
+    if target_fps is None or target_fps >= fps or total == 0:
+        return total
+    return (total - 1) * target_fps // fps + 1
+
+
+def keyframe_indices(video_path, target_fps=None):
+    """키프레임 위치 (선택 후 프레임 번호) - ffprobe 가 없거나 실패하면 빈 목록"""
+    if shutil.which("ffprobe") is None:
+        return []
+    from .frames import probe_video
+    try:
+        fps = probe_video(video_path)["fps"]
+        out = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "v:0", "-skip_frame", "nokey",
+             "-show_entries", "frame=pts_time", "-of", "csv=p=0", video_path],
+            check=True, capture_output=True, text=True
+        ).stdout
+    except Exception as e:
+        print(f"키프레임 조회 실패: {e}")
+        return []
+    indices = []
+    for line in out.split():
+        try:
+            source_idx = int(round(float(line.strip(",")) * fps))
+        except ValueError:
+            continue
+        if target_fps is not None and target_fps < fps:
+            # 원본 키프레임 이후 처음 선택되는 프레임 번호
+            source_idx = -(-source_idx * target_fps // fps)
+        indices.append(source_idx)
+    return sorted(set(indices))
+
+
+def plan_segments(total_frames, num_segments, keyframes=(), min_frames=None):
+    """[0, total_frames) 를 최대 num_segments 개 구간 [(start, end), ...] 으로 분할
+
+    각 경계는 균등 분할 지점에서 가장 가까운 키프레임으로 옮긴다 (키프레임 정보가 없으면 균등 분할).
+    구간이 min_frames 보다 짧아지지 않도록 구간 수를 줄인다.
+    """
+    min_frames = min_frames or config.SEGMENT_MIN_FRAMES
+    num_segments = max(1, min(num_segments, total_frames // max(1, min_frames)))
+    boundaries = [0]
+    for i in range(1, num_segments):
+        target = total_frames * i // num_segments
+        candidates = [k for k in keyframes if boundaries[-1] + min_frames <= k <= total_frames - min_frames]
+        boundary = min(candidates, key=lambda k: abs(k - target)) if candidates else target
+        if boundary - boundaries[-1] >= min_frames and total_frames - boundary >= min_frames:
+            boundaries.append(boundary)
+    boundaries.append(total_frames)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def plan_overlapped_segments(total_frames, num_segments, keyframes=(), overlap=0):
+    """plan_segments 와 같되 경계를 키프레임 + overlap 에 두어, 겹침을 포함한 읽기 시작이 키프레임이 되도록 함"""
+    return plan_segments(total_frames, num_segments, [k + overlap for k in keyframes])
+
+
+def _default_workers():
+    return config.SEGMENT_WORKERS if config.SEGMENT_WORKERS > 1 else (os.cpu_count() or 1)
+
+
+# =========================
+# 구간 병렬 분석
+# =========================
+_stop = None  # 작업 프로세스별 중단 이벤트 (부모가 세트 종료를 판정하면 set)
+
+
+def _init_segment_worker(stop):
+    global _stop
+    _stop = stop
+    apply_resource_limits()
+
+
+def _analyze_segment(task):
+    """(video_path, target_fps, start, end, overlap) → (start, (n, 33, 4) 원본 랜드마크, 감지 여부)
+
+    중단 이벤트가 set 되면 남은 프레임을 읽지 않고 돌려준다 (부모는 그 결과를 쓰지 않음).
+    """
+    import cv2
+    video_path, target_fps, start, end, overlap = task
+    read_start = max(0, start - overlap)
+    reader = FrameReader(video_path, size=ANALYSIS_SIZE, color=cv2.COLOR_BGR2RGB,
+                         target_fps=target_fps, start_frame=read_start, max_frames=end - read_start)
+    landmarks = np.full((end - start, NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+    detected = np.zeros(end - start, dtype=bool)
+    backend = create_analysis_backend()
+    try:
+        for frame_idx, _, lm in infer_frames(reader, backend):
+            if _stop is not None and _stop.is_set():
+                break
+            # 겹치는 앞부분은 Pose 추적 안정용으로만 사용
+            if frame_idx >= start and lm is not None:
+                landmarks[frame_idx - start] = lm
+                detected[frame_idx - start] = True
+    finally:
+        reader.close()
+        backend.close()
+    return start, landmarks, detected
+
+
+def analyze_squat_segmented(video_path, target_fps=None, workers=None, overlap=None):
+    """analyze_squat 과 같은 결과(dict) 를 구간 병렬 Pose 추론으로 계산"""
+    import cv2
+    workers = workers or _default_workers()
+    overlap = config.SEGMENT_OVERLAP_FRAMES if overlap is None else overlap
+    total = count_frames(video_path, target_fps)
+    segments = plan_overlapped_segments(total, workers, keyframe_indices(video_path, target_fps), overlap)
+
+    cap = cv2.VideoCapture(video_path)
+    fps = int(cap.get(cv2.CAP_PROP_FPS)) or 30
+    cap.release()
+    analyzer = SquatFrameAnalyzer(fps=target_fps or fps)
+    print(f"🧩 구간 병렬 분석: {total} 프레임 → {len(segments)}개 구간 (겹침 {overlap}) × 프로세스 {workers}")
+
+    tasks = [(video_path, target_fps, start, end, overlap) for start, end in segments]
+    stop = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_segment_worker,
+                             initargs=(stop,)) as pool:
+        # 구간 순서대로 결과를 기다리므로 완료 순서와 무관하게 프레임 순서로 이어 붙일 수 있음
+        futures = [pool.submit(_analyze_segment, task) for task in tasks]
+        for future in futures:
+            start, landmarks, detected = future.result()
+            for offset in range(len(landmarks)):
+                analyzer.update(start + offset, landmarks[offset] if detected[offset] else None)
+                if analyzer.finished:
+                    break
+            if analyzer.finished:
+                # 세트가 끝났으면 뒤 구간은 필요 없음 - 대기 중인 구간은 취소, 실행 중인 구간은 중단
+                stop.set()
+                for later in futures:
+                    later.cancel()
+                break
+
+    analyzer.close()
+    analyzer.print_summary()
+    return analyzer.result()
+
+
+# =========================
+# 구간 병렬 렌더링
+# =========================
+def _render_segment(task):
+    video_path, analysis_results, segment_path, start, end, overlap, target_fps = task
+    create_overlay_video(video_path, analysis_results, segment_path, max_frames=end,
+                         start_frame=start, warmup_frames=overlap, target_fps=target_fps)
+    return segment_path
+
+
+def concat_videos(paths, output_path):
+    """같은 코덱/해상도의 mp4 들을 순서대로 이어 붙임 (ffmpeg 있으면 재인코딩 없이)"""
+    if shutil.which("ffmpeg"):
+        list_path = output_path + ".txt"
+        with open(list_path, "w") as f:
+            for path in paths:
+                f.write(f"file '{os.path.abspath(path)}'\n")
+        try:
+            subprocess.run(["ffmpeg", "-v", "error", "-y", "-f", "concat", "-safe", "0", "-i", list_path,
+                            "-c", "copy", output_path], check=True)
+        finally:
+            os.remove(list_path)
+        return output_path
+
+    import cv2
+    out = None
+    for path in paths:
+        with FrameReader(path) as reader:
+            for _, frame in reader:
+                if out is None:
+                    out = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), reader.fps,
+                                          (reader.width, reader.height))
+                out.write(frame)
+    if out is not None:
+        out.release()
+    return output_path
+
+
+def create_overlay_video_segmented(video_path, analysis_results, output_path, max_frames=None, workers=None,
+                                   overlap=None, target_fps=None):
+    """create_overlay_video 와 같은 출력을 구간 병렬 렌더링 + 이어 붙이기로 생성"""
+    workers = workers or _default_workers()
+    overlap = config.SEGMENT_OVERLAP_FRAMES if overlap is None else overlap
+    total = count_frames(video_path, target_fps)
+    if max_frames is not None:
+        total = min(total, max_frames)
+    segments = plan_overlapped_segments(total, workers, keyframe_indices(video_path, target_fps), overlap)
+    if len(segments) == 1:
+        create_overlay_video(video_path, analysis_results, output_path, max_frames=max_frames, target_fps=target_fps)
+        return output_path
+
+    print(f"🧩 구간 병렬 렌더링: {total} 프레임 → {len(segments)}개 구간 × 프로세스 {workers}")
+    base, _ = os.path.splitext(output_path)
+    tasks = [(video_path, analysis_results, f"{base}.part{i:03d}.mp4", start, end, overlap, target_fps)
+             for i, (start, end) in enumerate(segments)]
+    segment_paths = [task[2] for task in tasks]
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=apply_resource_limits) as pool:
+            list(pool.map(_render_segment, tasks))
+        concat_videos(segment_paths, output_path)
+    finally:
+        for path in segment_paths:
+            if os.path.exists(path):
+                os.remove(path)
+    print(f"✅ 구간 이어 붙이기 완료: {output_path}")
+    return output_path
@@ -0,0 +1,261 @@
+"""디코딩 / Pose 추론 / 소비(분석 또는 오버레이 인코딩) 를 프로세스로 나눈 프레임 파이프라인
+
+프레임을 큐로 pickle 해 넘기면 복사 비용이 병렬화 이득보다 크므로, 프레임은 multiprocessing
+shared_memory 슬랩(슬롯 N개)에만 두고 프로세스 사이에는 슬롯 번호와 랜드마크 배열만 보낸다.
+
+    디코더 프로세스  : 빈 슬롯 번호를 받아 프레임을 슬롯에 채움          → (slot, frame_idx)
+    추론 프로세스    : 슬롯의 프레임으로 Pose 추론 (backend.batch_size 단위) → (slot, frame_idx, landmarks)
+    부모 프로세스    : 슬롯 프레임을 읽어 분석/그리기/인코딩 후 슬롯 반환
+
+FrameReader 와 같이 반복 중 받은 frame 은 다음 프레임을 받기 전까지만 유효하다 (부모가 슬롯을
+반환하면 디코더가 덮어씀). 처리 속도 비교:
+
+    python -m fitvideo.shm_pipeline sample.mp4
+"""
+import argparse
+import multiprocessing as mp
+import queue
+import time
+
+import numpy as np
+
+from . import config
+
+POLL_SEC = 1.0          # 자식 프로세스 생존 확인 주기
+FLUSH_WAIT_SEC = 0.05   # 추론 프로세스가 배치를 더 모으려고 기다리는 최대 시간
+
+
+def _attach(shm_name, slots, shape):
+    from multiprocessing.shared_memory import SharedMemory
+    shm = SharedMemory(name=shm_name)
+    return shm, np.ndarray((slots,) + shape, dtype=np.uint8, buffer=shm.buf)
+
+
+def _decode_worker(shm_name, slots, shape, video_path, size, rgb, target_fps, start_frame, max_frames,
+                   free_q, ready_q):
+    """디코더 프로세스 - 빈 슬롯에 프레임을 채워 (slot, frame_idx) 전달, None 을 받으면 중단"""
+    import cv2
+    from .frames import FrameReader, open_frame_reader
+    shm, frames = _attach(shm_name, slots, shape)
+    try:
+        if start_frame:
+            reader = FrameReader(video_path, size=size, color=cv2.COLOR_BGR2RGB if rgb else None,
+                                 target_fps=target_fps, max_frames=max_frames, start_frame=start_frame)
+        else:
+            reader = open_frame_reader(video_path, size=size, rgb=rgb, target_fps=target_fps, max_frames=max_frames)
+        with reader:
+            for frame_idx, frame in reader:
+                slot = free_q.get()
+                if slot is None:
+                    break
+                np.copyto(frames[slot], frame)
+                ready_q.put((slot, frame_idx))
+        ready_q.put(None)
+    except Exception as e:
+        ready_q.put(RuntimeError(f"디코딩 실패: {e}"))
+    finally:
+        del frames
+        shm.close()
+
+
+def _infer_worker(shm_name, slots, shape, backend_factory, bgr, ready_q, out_q):
+    """추론 프로세스 - 슬롯 프레임을 배치로 추론해 (slot, frame_idx, landmarks) 전달"""
+    import cv2
+    from .resources import apply_resource_limits
+    apply_resource_limits()
+    shm, frames = _attach(shm_name, slots, shape)
+    backend = None
+    try:
+        backend = backend_factory()
+        batch_size = max(1, backend.batch_size)
+        rgb = [None] * batch_size  # bgr 입력일 때 재사용하는 RGB 버퍼
+        pending = []
+
+        def flush():
+            images = []
+            for i, (slot, _) in enumerate(pending):
+                if bgr:
+                    rgb[i] = cv2.cvtColor(frames[slot], cv2.COLOR_BGR2RGB, dst=rgb[i])
+                    images.append(rgb[i])
+                else:
+                    images.append(frames[slot])
+            for (slot, frame_idx), landmarks in zip(pending, backend.infer(images)):
+                out_q.put((slot, frame_idx, landmarks))
+            pending.clear()
+
+        while True:
+            try:
+                # 배치가 덜 찼어도 다음 프레임이 늦으면 바로 추론 (모든 슬롯이 묶여 멈추지 않도록)
+                item = ready_q.get(timeout=FLUSH_WAIT_SEC if pending else None)
+            except queue.Empty:
+                flush()
+                continue
+            if item is None or isinstance(item, Exception):
+                if pending:
+                    flush()
+                out_q.put(item)
+                break
+            pending.append(item)
+            if len(pending) >= batch_size:
+                flush()
+    except Exception as e:
+        out_q.put(RuntimeError(f"Pose 추론 실패: {e}"))
+    finally:
+        if backend is not None:
+            backend.close()
+        del frames
+        shm.close()
+
+
+class SharedFramePipeline:
+    """(frame_idx, frame, landmarks) 를 순서대로 반환하는 다중 프로세스 프레임 소스
+
+    - size / rgb / target_fps / start_frame / max_frames: FrameReader 와 같은 의미
+    - backend_factory: 추론 프로세스에서 Pose 백엔드를 만드는 함수 (모듈 수준 함수여야 함)
+    - bgr: 프레임이 BGR 이면 True (추론 입력만 RGB 로 변환)
+    """
+
+    def __init__(self, video_path, size=None, rgb=False, target_fps=None, start_frame=0, max_frames=None,
+                 backend_factory=None, bgr=False, slots=None):
+        import cv2
+        from multiprocessing.shared_memory import SharedMemory
+        from .frames import get_video_info
+        from .pose_backends import open_pose_backend
+
+        cap = cv2.VideoCapture(video_path)
+        self.fps, self.width, self.height = get_video_info(cap)
+        cap.release()
+        width, height = size or (self.width, self.height)
+        self.shape = (height, width, 3)
+        self.slots = slots or config.SHM_PIPELINE_SLOTS
+
+        self._shm = SharedMemory(create=True, size=self.slots * int(np.prod(self.shape)))
+        self._frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=self._shm.buf)
+        # 부모에 스레드(디코더/boto3 등)가 있을 수 있으므로 fork 대신 spawn
+        ctx = mp.get_context("spawn")
+        # 큐는 자식이 붙을 때까지 살아 있어야 하므로 모두 보관 (Process.start() 후 인자 참조가 사라짐)
+        self._free_q = ctx.Queue()
+        self._ready_q = ctx.Queue()
+        self._out_q = ctx.Queue()
+        for slot in range(self.slots):
+            self._free_q.put(slot)
+        self._procs = [
+            ctx.Process(target=_decode_worker, name="shm-decoder", daemon=True, args=(
+                self._shm.name, self.slots, self.shape, video_path, size, rgb, target_fps, start_frame,
+                max_frames, self._free_q, self._ready_q)),
+            ctx.Process(target=_infer_worker, name="shm-inference", daemon=True, args=(
+                self._shm.name, self.slots, self.shape, backend_factory or open_pose_backend, bgr,
+                self._ready_q, self._out_q)),
+        ]
+        self._started = False
+        self._closed = False
+
+    def _get(self):
+        while True:
+            try:
+                return self._out_q.get(timeout=POLL_SEC)
+            except queue.Empty:
+                for proc in self._procs:
+                    if proc.exitcode not in (None, 0):
+                        raise RuntimeError(f"{proc.name} 프로세스 비정상 종료 (exit {proc.exitcode})")
+
+    def __iter__(self):
+        if not self._started:
+            self._started = True
+            for proc in self._procs:
+                proc.start()
+        previous = None
+        try:
+            while True:
+                item = self._get()
+                # 소비자가 이전 프레임을 다 썼으므로 슬롯 반환
+                if previous is not None:
+                    self._free_q.put(previous)
+                    previous = None
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                slot, frame_idx, landmarks = item
+                previous = slot
+                yield frame_idx, self._frames[slot], landmarks
+        finally:
+            self.close()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._started:
+            # 디코더가 빈 슬롯을 기다리는 중이면 깨워서 종료시키고, 남은 프로세스는 강제 종료
+            self._free_q.put(None)
+            for proc in self._procs:
+                proc.join(timeout=2)
+                if proc.is_alive():
+                    proc.terminate()
+                    proc.join()
+        self._frames = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # 소비자가 아직 프레임 배열을 들고 있음 - 프로세스 종료 시 해제
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# =========================
+# 단일 프로세스 대비 벤치마크
+# =========================
+def benchmark(video_path, overlay=True):
+    """analyze_squat (+ create_overlay_video) 를 단일 프로세스 / 파이프라인으로 각각 실행 → 결과 dict 목록"""
+    from .analysis import analyze_squat
+    from .scratch import ScratchSpace
+    from .segments import count_frames
+    from .video import create_overlay_video
+
+    frames = count_frames(video_path)
+    rows = []
+    for name, pipeline in (("single", False), ("shm", True)):
+        with ScratchSpace(f"shm_bench_{name}") as scratch:
+            started = time.perf_counter()
+            result = analyze_squat(video_path, pipeline=pipeline)
+            analyze_sec = time.perf_counter() - started
+            render_sec = 0.0
+            if overlay:
+                started = time.perf_counter()
+                create_overlay_video(video_path, result, scratch.path("bench_analyzed.mp4"), pipeline=pipeline)
+                render_sec = time.perf_counter() - started
+        rows.append({
+            "mode": name,
+            "analyze_fps": frames / analyze_sec if analyze_sec else 0.0,
+            "render_fps": frames / render_sec if render_sec else 0.0,
+            "seconds": analyze_sec + render_sec,
+            "total_count": result["total_count"],
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="공유 메모리 파이프라인 vs 단일 프로세스 처리 속도 비교")
+    parser.add_argument("video")
+    parser.add_argument("--no-overlay", action="store_true", help="분석만 비교")
+    args = parser.parse_args(argv)
+
+    rows = benchmark(args.video, overlay=not args.no_overlay)
+    print(f"{'mode':<8} {'analyze fps':>12} {'render fps':>11} {'seconds':>8} {'count':>6}")
+    for row in rows:
+        print(f"{row['mode']:<8} {row['analyze_fps']:>12.1f} {row['render_fps']:>11.1f} {row['seconds']:>8.1f} "
+              f"{row['total_count']:>6}")
+    if rows[1]["seconds"]:
+        print(f"⚡ 속도 향상: {rows[0]['seconds'] / rows[1]['seconds']:.2f}x"
+              f" | 횟수 일치: {'O' if rows[0]['total_count'] == rows[1]['total_count'] else 'X'}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
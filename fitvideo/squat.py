@@ -0,0 +1,211 @@
+"""스쿼트 반복 판정 (각도 계산, 단계 전환, 점수 산정)
+
+프레임 디코딩/포즈 추론과 분리되어 있어 파일 분석, 배치 CLI 등에서 그대로 재사용할 수 있다.
+"""
+import numpy as np
+
+from .pose import PoseLandmark, landmarks_to_array
+
+MOVE_THRESHOLD_START = 0.0001  # 더 민감한 움직임 감지
+MOVE_THRESHOLD_END = 0.005     # 더 민감한 움직임 감지
+READY_THRESHOLD = 10           # 더 빠른 분석 시작
+POST_SQUAT_FREEZE_FRAMES = 30  # 스쿼트 간 충분한 대기 시간 (10 → 30)
+MIN_ANALYSIS_FRAMES = 100      # 종료 판정 전 최소 분석 프레임
+MIN_REP_FRAMES = 15            # 1회 스쿼트로 인정할 최소 프레임
+
+SQUAT_LABELS = ("Half Squat", "Basic Squat", "Full Squat", "Fail Squat")
+
+
+def calculate_angle(a, b, c):
+    a, b, c = np.array(a), np.array(b), np.array(c)
+    ab = a - b
+    cb = c - b
+    cosine = np.dot(ab, cb) / (np.linalg.norm(ab) * np.linalg.norm(cb) + 1e-6)
+    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+
+# 왼쪽/오른쪽 다리의 (엉덩이, 무릎, 발목) 인덱스
+LEG_JOINTS = np.array([
+    [PoseLandmark.LEFT_HIP, PoseLandmark.LEFT_KNEE, PoseLandmark.LEFT_ANKLE],
+    [PoseLandmark.RIGHT_HIP, PoseLandmark.RIGHT_KNEE, PoseLandmark.RIGHT_ANKLE],
+])
+
+
+def leg_angles(lm):
+    """(33, >=2) 랜드마크 배열 → [왼쪽, 오른쪽] 무릎 각도 (한 번에 계산)"""
+    points = np.asarray(lm)[LEG_JOINTS, :2].astype(np.float64)
+    ab = points[:, 0] - points[:, 1]
+    cb = points[:, 2] - points[:, 1]
+    cosine = np.sum(ab * cb, axis=1) / (np.linalg.norm(ab, axis=1) * np.linalg.norm(cb, axis=1) + 1e-6)
+    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+
+def get_best_leg_angle(lm):
+    """양쪽 다리 중 더 안정적인 각도 선택
+
+    lm 은 (33, 4) 랜드마크 배열 (mediapipe 랜드마크 목록도 허용)
+    """
+    if not isinstance(lm, np.ndarray):
+        lm = landmarks_to_array(lm)
+    left_angle, right_angle = (float(angle) for angle in leg_angles(lm))
+    left_hip = lm[PoseLandmark.LEFT_HIP, :2]
+    right_hip = lm[PoseLandmark.RIGHT_HIP, :2]
+
+    # 더 안정적인 각도 선택
+    if left_angle > 30 and right_angle > 30:
+        if abs(left_angle - right_angle) < 25:
+            return (left_angle + right_angle) / 2, left_hip
+        else:
+            return max(left_angle, right_angle), left_hip if left_angle > right_angle else right_hip
+    elif left_angle > 30:
+        return left_angle, left_hip
+    elif right_angle > 30:
+        return right_angle, right_hip
+    else:
+        return left_angle, left_hip
+
+
+def classify_squat(min_knee_angle):
+    """최저 무릎 각도로 스쿼트 판정"""
+    if 100 >= min_knee_angle > 80:  # 75 → 80으로 조정
+        return "Half Squat"
+    elif 80 >= min_knee_angle > 55:  # 60 → 55로 조정
+        return "Basic Squat"
+    elif 55 >= min_knee_angle > 0:   # 60 → 55로 조정
+        return "Full Squat"
+    return "Fail Squat"
+
+
+def score_counts(counts):
+    """판정별 횟수 → (점수, 등급 메시지)"""
+    weight = {"Full Squat": 1.0, "Basic Squat": 0.7, "Half Squat": 0.4}
+    raw_score = (
+        counts["Full Squat"] * weight["Full Squat"] +
+        counts["Basic Squat"] * weight["Basic Squat"] +
+        counts["Half Squat"] * weight["Half Squat"]
+    )
+    max_score = (
+        (counts["Full Squat"] + counts["Basic Squat"] + counts["Half Squat"]) * weight["Full Squat"]
+    )
+    score_ratio = raw_score / max(max_score, 1)
+    base_score = score_ratio * 100
+    penalty = counts["Fail Squat"] * 3
+    final_score = max(0, min(100, int(base_score - penalty)))
+
+    if final_score >= 80:
+        msg = "Perfect!!"
+    elif final_score >= 60:
+        msg = "Great!!"
+    elif final_score >= 40:
+        msg = "Good!!"
+    else:
+        msg = "Bad.."
+    return final_score, msg
+
+
+class SquatRepCounter:
+    """프레임별 무릎 각도/엉덩이 위치를 받아 스쿼트 횟수를 세는 상태 머신
+
+    ``update()`` 는 1회가 완료된 프레임에서 해당 rep 결과(dict)를 반환한다.
+    마지막 스쿼트 이후 이동이 감지되면 ``finished`` 가 True 가 되고 ``end_frame`` 이 기록된다.
+    verbose=False 면 판정 로그를 출력하지 않는다 (stdout 을 이벤트 출력에 쓰는 스트리밍 등).
+    """
+
+    def __init__(self, verbose=True):
+        self.verbose = verbose
+        self.previous_hip = None
+        self.ready_frames = 0
+        self.counting_started = False
+        self.post_squat_wait = 0
+        self.counter = 0
+        self.stage = None
+        self.prev_stage = None
+        self.min_knee_angle = 180
+        self.rep_start_frame = 0
+        self.rep_results = []
+        self.counts = {"Half Squat": 0, "Basic Squat": 0, "Full Squat": 0, "Fail Squat": 0}
+        self.finished = False
+        self.end_frame = None
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
+    def update(self, frame_idx, knee_angle, hip):
+        move = 0 if self.previous_hip is None else abs(hip[0] - self.previous_hip[0]) + abs(hip[1] - self.previous_hip[1])
+        self.previous_hip = hip
+
+        if not self.counting_started:
+            # 각도 변화로 스쿼트 동작 감지 시 즉시 시작
+            if knee_angle < 165:  # 더 엄격한 스쿼트 시작 조건 (170 → 165)
+                self.counting_started = True
+                self._log(f"🚀 스쿼트 동작 감지! 각도: {knee_angle:.1f}° → 분석 시작")
+            else:
+                self.ready_frames = self.ready_frames + 1 if move < MOVE_THRESHOLD_START else 0
+                if self.ready_frames >= READY_THRESHOLD:
+                    self.counting_started = True
+                    self._log("- 분석 시작 -")
+            return None
+
+        if self.post_squat_wait > 0:
+            if move < MOVE_THRESHOLD_START and knee_angle > 150:  # 더 빠른 다음 스쿼트 감지
+                self.post_squat_wait -= 1
+                return None
+            self.post_squat_wait = 0
+
+        if self.stage == "up" and move > MOVE_THRESHOLD_END:
+            # 더 엄격한 종료 조건: 연속으로 여러 프레임에서 이동이 감지되어야 종료
+            if frame_idx > MIN_ANALYSIS_FRAMES:  # 최소 100프레임은 분석
+                self._log("✅ 마지막 스쿼트 이후 이동 감지됨 → 분석 종료")
+                self.finished = True
+                self.end_frame = frame_idx
+                return None
+            self._log(f"⚠️ 너무 일찍 종료 방지: 프레임 {frame_idx} (최소 {MIN_ANALYSIS_FRAMES}프레임 필요)")
+
+        if self.stage == "down" or (self.stage is None and knee_angle < 170):  # 더 현실적인 하강 감지 (175 → 170)
+            self.min_knee_angle = min(self.min_knee_angle, knee_angle)
+
+        self.stage = "down" if knee_angle < 155 else "up"  # 더 현실적인 단계 전환 (160 → 155)
+
+        # 디버깅: 단계 변화 모니터링
+        if self.prev_stage != self.stage:
+            self._log(f"🔄 단계 변화: {self.prev_stage} → {self.stage} (각도: {knee_angle:.1f}°)")
+
+        rep = None
+        if self.prev_stage == "down" and self.stage == "up":
+            # 스쿼트 간 최소 대기 시간 확인
+            if frame_idx - self.rep_start_frame < MIN_REP_FRAMES:  # 최소 15프레임 이상의 동작 필요
+                self._log(f"⚠️ 너무 빠른 스쿼트 감지 무시: {frame_idx - self.rep_start_frame}프레임 (최소 {MIN_REP_FRAMES}프레임 필요)")
+                return None
+
+            self.counter += 1
+            label = classify_squat(self.min_knee_angle)
+            self._log(f"🎯 {self.counter}회 스쿼트 감지! | 판정: {label} | 각도: {self.min_knee_angle:.1f}° | 프레임: {self.rep_start_frame}-{frame_idx}")
+            self.counts[label] += 1
+            rep = {
+                "rep": self.counter,
+                "label": label,
+                "min_knee_angle": int(self.min_knee_angle),
+                "frame_start": self.rep_start_frame,
+                "frame_end": frame_idx
+            }
+            self.rep_results.append(rep)
+            self.min_knee_angle = 180
+            self.post_squat_wait = POST_SQUAT_FREEZE_FRAMES
+
+        if self.stage == "down" and self.prev_stage != "down":
+            self.rep_start_frame = frame_idx
+
+        self.prev_stage = self.stage
+        return rep
+
+    def summary(self):
+        """현재까지의 판정 결과 (백엔드 PATCH/오버레이에서 쓰는 형태)"""
+        final_score, msg = score_counts(self.counts)
+        return {
+            "counts": dict(self.counts),
+            "total_count": self.counter,
+            "score": final_score,
+            "grade": msg,
+            "rep_results": list(self.rep_results),
+        }
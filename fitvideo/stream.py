@@ -0,0 +1,248 @@
+"""실시간 스트리밍 분석 - 프레임이 들어오는 즉시 판정해 rep 이벤트를 내보냄
+
+    python -m fitvideo.stream rtsp://camera/live
+    python -m fitvideo.stream tcp://0.0.0.0:9000     (길이 접두 JPEG 프레임 수신)
+    python -m fitvideo.stream set.mp4                (로컬 파일을 실제 속도로 재생 - 테스트용)
+
+이벤트는 JSON 한 줄씩 stdout 으로 출력하고, 연결 상태 등 진단 메시지는 stderr 로 출력한다.
+rep 이벤트의 frame_start/frame_end 는 세트 시작 기준 프레임 번호이며, 세트가 시작된 스트림 프레임은
+set_start_frame, set_end 이벤트의 frame 은 스트림 시작 기준 프레임 번호다.
+판정은 파일 분석과 같은 SquatFrameAnalyzer 를 쓰므로 임계값/라벨이 동일하다.
+분석이 입력 속도를 따라가지 못하면 오래된 프레임을 버려 프레임당 지연 상한을 유지한다.
+"""
+import argparse
+import collections
+import json
+import socket
+import struct
+import sys
+import threading
+import time
+
+from .analysis import ANALYSIS_SIZE, SquatFrameAnalyzer
+from .frames import get_video_info, open_frame_reader
+from .utils import percentile
+
+
+class LiveFrameQueue:
+    """최근 max_pending 프레임만 보관하는 큐 - 넘치면 가장 오래된 프레임을 버림"""
+
+    def __init__(self, max_pending=2):
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._frames = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, frame_idx, image, arrived_at):
+        with self._cond:
+            if len(self._frames) >= self.max_pending:
+                self._frames.popleft()
+                self.dropped += 1
+            self._frames.append((frame_idx, image, arrived_at))
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def get(self):
+        """다음 프레임 (frame_idx, image, arrived_at) - 입력이 끝나면 None"""
+        with self._cond:
+            while not self._frames and not self._closed:
+                self._cond.wait()
+            return self._frames.popleft() if self._frames else None
+
+
+def to_analysis_frame(frame_bgr):
+    """BGR 원본 프레임 → 분석용 RGB 축소 프레임"""
+    import cv2
+    small = cv2.resize(frame_bgr, ANALYSIS_SIZE, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+
+
+class FileReplaySource:
+    """로컬 동영상을 실제 촬영 속도(realtime=True)로 흘려보내는 입력 - 스트리밍 테스트용"""
+
+    def __init__(self, path, realtime=True):
+        self.reader = open_frame_reader(path, size=ANALYSIS_SIZE, rgb=True)
+        self.fps = self.reader.fps
+        self.realtime = realtime
+
+    def run(self, frames):
+        started = time.monotonic()
+        try:
+            for frame_idx, image in self.reader:
+                if self.realtime:
+                    delay = started + frame_idx / self.fps - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                # 리더 버퍼는 재사용되므로 다른 스레드로 넘길 때는 복사
+                frames.put(frame_idx, image.copy(), time.monotonic())
+        finally:
+            frames.close()
+
+
+class CaptureSource:
+    """RTSP/HTTP 등 OpenCV(FFmpeg)가 직접 여는 라이브 스트림"""
+
+    def __init__(self, url):
+        import cv2
+        self.cap = cv2.VideoCapture(url)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"스트림 연결 실패: {url}")
+        self.fps = get_video_info(self.cap)[0]
+
+    def run(self, frames):
+        frame_idx = 0
+        try:
+            while True:
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                frames.put(frame_idx, to_analysis_frame(frame), time.monotonic())
+                frame_idx += 1
+        finally:
+            self.cap.release()
+            frames.close()
+
+
+class SocketSource:
+    """TCP 로 프레임을 받는 입력 - 프레임마다 4바이트(big-endian) 길이 + JPEG/PNG 바이트, 길이 0 은 종료
+
+    앱/중계 서버가 카메라 프레임을 인코딩해 밀어 넣는 용도 (연결 1개 처리 후 종료).
+    """
+
+    def __init__(self, host, port, fps=30):
+        self.host = host
+        self.port = port
+        self.fps = fps
+
+    @staticmethod
+    def _recv_exact(conn, size):
+        chunks = []
+        while size:
+            chunk = conn.recv(size)
+            if not chunk:
+                return None
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def run(self, frames):
+        import cv2
+        import numpy as np
+        try:
+            with socket.create_server((self.host, self.port)) as server:
+                print(f"📡 프레임 수신 대기: {self.host}:{self.port}", file=sys.stderr)
+                conn, addr = server.accept()
+                with conn:
+                    print(f"📡 연결됨: {addr}", file=sys.stderr)
+                    frame_idx = 0
+                    while True:
+                        header = self._recv_exact(conn, 4)
+                        if header is None:
+                            break
+                        (length,) = struct.unpack(">I", header)
+                        if length == 0:
+                            break
+                        payload = self._recv_exact(conn, length)
+                        if payload is None:
+                            break
+                        frame = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+                        if frame is None:
+                            continue
+                        frames.put(frame_idx, to_analysis_frame(frame), time.monotonic())
+                        frame_idx += 1
+        finally:
+            frames.close()
+
+
+def open_source(uri, realtime=True, fps=30):
+    """입력 URI → 스트림 입력 객체 (tcp://host:port, rtsp/http URL, 로컬 파일)"""
+    if uri.startswith("tcp://"):
+        host, _, port = uri[len("tcp://"):].rpartition(":")
+        return SocketSource(host or "0.0.0.0", int(port), fps=fps)
+    if "://" in uri:
+        return CaptureSource(uri)
+    return FileReplaySource(uri, realtime=realtime)
+
+
+def run_stream(source, on_event, max_pending=2, stop_at_set_end=False):
+    """source 의 프레임을 실시간 분석하며 on_event(dict) 로 이벤트 전달, 마지막 summary 이벤트 반환
+
+    - rep: 1회 완료 (rep_results 항목 + latency_ms: 프레임 도착 → 판정까지)
+    - set_end: 마지막 스쿼트 이후 이동 감지 → 세트 결과, 이후 새 세트로 계속 (stop_at_set_end 면 종료)
+      세트마다 분석기를 새로 만들고 프레임 번호도 세트 시작 기준으로 다시 센다 (최소 분석 프레임 등 판정 기준 유지)
+    - summary: 입력 종료 시 전체 통계 (처리/버린 프레임 수, 프레임당 지연 백분위수)
+    """
+    frames = LiveFrameQueue(max_pending)
+    threading.Thread(target=source.run, args=(frames,), name="stream-source", daemon=True).start()
+
+    analyzer = SquatFrameAnalyzer(fps=source.fps, verbose=False)
+    latencies = []
+    total_reps = 0
+    sets = 0
+    set_start = 0  # 현재 세트가 시작된 스트림 프레임 번호
+
+    while True:
+        item = frames.get()
+        if item is None:
+            break
+        frame_idx, image, arrived_at = item
+
+        rep = analyzer.process(frame_idx - set_start, image)
+        latency = time.monotonic() - arrived_at
+        latencies.append(latency)
+
+        if rep is not None:
+            total_reps += 1
+            on_event({"type": "rep", "set": sets + 1, **rep, "set_start_frame": set_start,
+                      "latency_ms": round(latency * 1000, 1)})
+
+        if analyzer.finished:
+            sets += 1
+            on_event({"type": "set_end", "set": sets, "frame": frame_idx, "set_start_frame": set_start,
+                      **analyzer.counter.summary()})
+            analyzer.close()
+            if stop_at_set_end:
+                break
+            analyzer = SquatFrameAnalyzer(fps=source.fps, verbose=False)
+            set_start = frame_idx + 1
+
+    analyzer.close()
+    summary = {
+        "type": "summary",
+        "reps": total_reps,
+        "sets": sets,
+        "frames": len(latencies),
+        "dropped": frames.dropped,
+        "latency_ms_p50": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "latency_ms_p95": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+        "latency_ms_max": round(max(latencies) * 1000, 1) if latencies else None,
+    }
+    on_event(summary)
+    return summary
+
+
+def _print_event(event):
+    print(json.dumps(event, ensure_ascii=False), flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="실시간 스쿼트 횟수 분석")
+    parser.add_argument("source", help="tcp://host:port, rtsp://... 스트림 URL 또는 로컬 동영상 파일")
+    parser.add_argument("--no-realtime", action="store_true", help="로컬 파일을 실제 속도가 아닌 최대 속도로 재생")
+    parser.add_argument("--fps", type=int, default=30, help="tcp 입력의 프레임레이트 (기본 30)")
+    parser.add_argument("--max-pending", type=int, default=2, help="분석 대기 프레임 상한 (넘치면 오래된 프레임 버림)")
+    parser.add_argument("--once", action="store_true", help="첫 세트가 끝나면 종료")
+    args = parser.parse_args(argv)
+
+    source = open_source(args.source, realtime=not args.no_realtime, fps=args.fps)
+    run_stream(source, _print_event, max_pending=args.max_pending, stop_at_set_end=args.once)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
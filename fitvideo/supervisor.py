@@ -0,0 +1,272 @@
+"""워커 supervisor - 큐 깊이와 작업 처리 시간에 맞춰 로컬 워커 프로세스 수 조절
+
+    python -m fitvideo.supervisor --min-workers 1 --max-workers 4
+
+주기마다 ApproximateNumberOfMessages 와 최근 작업 처리 시간(워커가 FIT_WORKER_STATS 파일에 기록)
+으로 "쌓인 메시지를 SUPERVISOR_TARGET_DRAIN_SEC 안에 처리할 워커 수" 를 구한다. 이를 CPU 코어 /
+사용 가능 메모리 / 부하(load average) 한도 안으로 제한해 워커를 띄우거나 줄인다.
+- 늘릴 때: 한 주기에 1개씩, 부하가 코어 수를 넘으면 늘리지 않음
+- 줄일 때: SUPERVISOR_SCALE_DOWN_TICKS 주기 연속으로 남을 때 가장 최근 워커에 SIGTERM
+  (워커는 진행 중인 작업을 마치고 종료)
+- 비정상 종료한 워커는 다음 주기에 다시 띄움
+- FIT_SUPERVISOR_PIN_CORES=1 이면 워커마다 겹치지 않는 코어 묶음에 고정하고 스레드 수를 묶음 크기로 맞춤
+"""
+import argparse
+import json
+import math
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from . import config
+from .resources import core_sets, format_cpu_list, thread_env
+from .utils import percentile
+
+LATENCY_WINDOW_SEC = 900  # 처리 시간 통계에 쓰는 최근 구간
+
+
+def available_memory_mb():
+    """/proc/meminfo 의 MemAvailable (MB), 읽을 수 없으면 None"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def process_rss_mb(pid):
+    """프로세스 RSS (MB), 읽을 수 없으면 None"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+# =========================
+# 조절 판단 (순수 함수 - 큐 깊이/부하/메모리를 인자로 받음)
+# =========================
+def worker_limit(current, max_workers, min_workers, cpu_count, available_mb=None, worker_rss_mb=(),
+                 cpus_per_worker=None, worker_mem_mb=None):
+    """CPU / 메모리 기준으로 동시에 띄울 수 있는 워커 수
+
+    available_mb 는 MemAvailable (모르면 None), worker_rss_mb 는 떠 있는 워커들의 RSS 이다.
+    """
+    cpus_per_worker = cpus_per_worker or config.SUPERVISOR_CPUS_PER_WORKER
+    worker_mem_mb = worker_mem_mb or config.SUPERVISOR_WORKER_MEM_MB
+    limit = min(max_workers, max(1, int(cpu_count / cpus_per_worker)))
+    if available_mb is not None:
+        per_worker = max([worker_mem_mb] + [mb for mb in worker_rss_mb if mb])
+        # 이미 떠 있는 워커 메모리는 사용 중이므로 남은 메모리로 추가 가능한 수만 더함
+        limit = min(limit, current + available_mb // per_worker)
+    return max(min_workers, limit)
+
+
+def desired_workers(depth, current, elapsed, target_drain_sec):
+    """쌓인 메시지(depth)를 target_drain_sec 안에 처리할 워커 수 (elapsed: 최근 작업 처리 시간 목록)"""
+    if not elapsed:
+        # 처리 시간 통계가 없으면 메시지가 있을 때 1개씩 늘려 봄
+        return current + 1 if depth > current else current
+    mean_elapsed = sum(elapsed) / len(elapsed)
+    return math.ceil(depth * mean_elapsed / target_drain_sec)
+
+
+def scale_step(current, desired, min_workers, load, cpu_count, surplus_ticks, scale_down_ticks=None):
+    """이번 주기의 워커 수 변화 → (띄울 수, 음수면 종료할 수), 다음 주기의 연속 잉여 주기 수
+
+    - 최소 인원보다 적으면 부하와 무관하게 바로 채움
+    - 늘릴 때는 한 주기에 1개씩, load 가 코어 수 이상이면 보류
+    - 줄일 때는 scale_down_ticks 주기 연속으로 남을 때 1개
+    """
+    scale_down_ticks = scale_down_ticks or config.SUPERVISOR_SCALE_DOWN_TICKS
+    if current < min_workers:
+        return min_workers - current, 0
+    if desired > current:
+        return (1 if load < cpu_count else 0), 0
+    if desired < current:
+        surplus_ticks += 1
+        if surplus_ticks >= scale_down_ticks:
+            return -1, 0
+        return 0, surplus_ticks
+    return 0, 0
+
+
+class WorkerProcess:
+    def __init__(self, index, stats_dir, cpus=None):
+        self.index = index
+        self.cpus = cpus
+        self.stats_path = os.path.join(stats_dir, f"worker-{index}.jsonl")
+        if os.path.exists(self.stats_path):
+            os.remove(self.stats_path)
+        env = dict(os.environ, FIT_WORKER_STATS=self.stats_path)
+        if cpus:
+            env.update(thread_env(len(cpus), cpus))
+        # 터미널 Ctrl+C 가 워커에 직접 가지 않도록 별도 세션으로 실행 (종료는 supervisor 가 SIGTERM 으로)
+        self.proc = subprocess.Popen([sys.executable, "-m", "fitvideo.worker"], env=env, start_new_session=True)
+        self.started_at = time.time()
+        self.retiring = False
+        self._stats_offset = 0
+
+    @property
+    def pid(self):
+        return self.proc.pid
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def retire(self):
+        """진행 중인 작업을 마치고 종료하도록 SIGTERM"""
+        self.retiring = True
+        if self.alive():
+            self.proc.send_signal(signal.SIGTERM)
+
+    def read_stats(self):
+        """지난번 이후 기록된 작업 통계 (dict 목록)"""
+        if not os.path.exists(self.stats_path):
+            return []
+        with open(self.stats_path) as f:
+            f.seek(self._stats_offset)
+            lines = f.readlines()
+            self._stats_offset = f.tell()
+        return [json.loads(line) for line in lines if line.endswith("\n")]
+
+
+class Supervisor:
+    def __init__(self, min_workers=None, max_workers=None, interval=None, target_drain_sec=None, stats_dir=None):
+        self.min_workers = config.SUPERVISOR_MIN_WORKERS if min_workers is None else min_workers
+        self.max_workers = max_workers or config.SUPERVISOR_MAX_WORKERS
+        self.interval = interval or config.SUPERVISOR_INTERVAL_SEC
+        self.target_drain_sec = target_drain_sec or config.SUPERVISOR_TARGET_DRAIN_SEC
+        self.stats_dir = stats_dir or os.path.join(config.DOWNLOAD_DIR, "supervisor")
+        os.makedirs(self.stats_dir, exist_ok=True)
+        self.workers = []
+        self.retiring = []
+        self.jobs = []          # 최근 작업 {"finished_at", "elapsed", "ok"}
+        self._next_index = 0
+        self._surplus_ticks = 0
+        self._stopping = False
+
+    # =========================
+    # 워커 관리
+    # =========================
+    def _free_core_set(self):
+        """아직 실행 중인 워커(종료 대기 포함)가 쓰지 않는 코어 묶음"""
+        sets = core_sets(self.max_workers, config.SUPERVISOR_CPUS_PER_WORKER)
+        used = [w.cpus for w in self.workers + self.retiring]
+        return next((cpus for cpus in sets if cpus not in used), sets[self._next_index % len(sets)])
+
+    def spawn(self):
+        cpus = self._free_core_set() if config.SUPERVISOR_PIN_CORES else None
+        worker = WorkerProcess(self._next_index, self.stats_dir, cpus)
+        self._next_index += 1
+        self.workers.append(worker)
+        pinned = f", CPU {format_cpu_list(cpus)}" if cpus else ""
+        print(f"🚀 워커 시작: #{worker.index} (pid {worker.pid}{pinned}) → {len(self.workers)}개")
+
+    def retire_one(self):
+        worker = self.workers.pop()  # 가장 최근에 띄운 워커부터
+        worker.retire()
+        self.retiring.append(worker)
+        print(f"🧊 워커 종료 요청: #{worker.index} (pid {worker.pid}) → {len(self.workers)}개")
+
+    def reap(self):
+        """종료된 워커 정리 + 통계 수집 (비정상 종료는 목록에서 빼서 다음 주기에 다시 띄움)"""
+        for worker in self.workers + self.retiring:
+            self.jobs.extend(worker.read_stats())
+        for worker in list(self.workers):
+            if not worker.alive():
+                print(f"⚠️ 워커 비정상 종료: #{worker.index} (exit {worker.proc.returncode})")
+                self.workers.remove(worker)
+        for worker in list(self.retiring):
+            if not worker.alive():
+                print(f"👋 워커 종료됨: #{worker.index}")
+                self.retiring.remove(worker)
+        cutoff = time.time() - LATENCY_WINDOW_SEC
+        self.jobs = [job for job in self.jobs if job["finished_at"] >= cutoff]
+
+    # =========================
+    # 목표 워커 수
+    # =========================
+    def resource_limit(self):
+        """CPU / 메모리 기준으로 동시에 띄울 수 있는 워커 수"""
+        return worker_limit(len(self.workers), self.max_workers, self.min_workers, os.cpu_count() or 1,
+                            available_memory_mb(), [process_rss_mb(w.pid) for w in self.workers])
+
+    def desired_workers(self, depth):
+        """쌓인 메시지를 목표 시간 안에 처리할 워커 수"""
+        return desired_workers(depth, len(self.workers), [job["elapsed"] for job in self.jobs],
+                               self.target_drain_sec)
+
+    def tick(self):
+        from .aws import get_queue_depth
+        self.reap()
+        try:
+            depth = get_queue_depth()
+        except Exception as e:
+            print(f"큐 상태 확인 실패: {e}")
+            depth = None
+
+        limit = self.resource_limit()
+        current = len(self.workers)
+        desired = current if depth is None else self.desired_workers(depth)
+        desired = max(self.min_workers, min(desired, limit))
+
+        elapsed = [job["elapsed"] for job in self.jobs]
+        p90 = percentile(elapsed, 90)
+        load = os.getloadavg()[0] if hasattr(os, "getloadavg") else 0.0
+        print(f"📊 큐 {depth} | 워커 {current} (목표 {desired}, 한도 {limit}) | 최근 작업 {len(elapsed)}건"
+              f"{f' p90 {p90:.0f}s' if p90 is not None else ''} | load {load:.1f}")
+
+        step, self._surplus_ticks = scale_step(current, desired, self.min_workers, load, os.cpu_count() or 1,
+                                               self._surplus_ticks)
+        if step == 0 and desired > current:
+            print(f"⏸️ 부하가 높아 워커를 늘리지 않음 (load {load:.1f})")
+        for _ in range(step):
+            self.spawn()
+        for _ in range(-step):
+            self.retire_one()
+
+    def stop(self, signum=None, frame=None):
+        self._stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        print(f"🧭 supervisor 시작: 워커 {self.min_workers}~{self.max_workers}개, 주기 {self.interval:.0f}s")
+        while not self._stopping:
+            self.tick()
+            deadline = time.time() + self.interval
+            while not self._stopping and time.time() < deadline:
+                time.sleep(0.5)
+                self.reap()
+
+        print("🛑 supervisor 종료 - 모든 워커가 진행 중인 작업을 마칠 때까지 대기")
+        while self.workers:
+            self.retire_one()
+        for worker in self.retiring:
+            worker.proc.wait()
+        self.reap()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="큐 깊이 기반 워커 프로세스 자동 확장")
+    parser.add_argument("--min-workers", type=int, default=None)
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--interval", type=float, default=None, help="확인 주기 (초)")
+    parser.add_argument("--target-drain", type=float, default=None, help="쌓인 메시지를 처리할 목표 시간 (초)")
+    args = parser.parse_args(argv)
+
+    Supervisor(args.min_workers, args.max_workers, args.interval, args.target_drain).run()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+"""S3 멀티파트 병렬 전송 + 처리량 측정
+
+boto3 기본값 대신 config 의 청크 크기/동시성으로 TransferConfig 를 만들고, 프로세스 공용
+클라이언트(aws.get_s3)를 모든 스레드가 함께 쓴다. 전송마다 바이트/소요시간을 기록해
+누적 처리량을 get_transfer_metrics() 로 조회할 수 있다. 동시에 여러 전송이 진행될 수 있으므로
+처리량은 전송별 소요시간의 합이 아니라 전송이 하나라도 진행 중이던 실제 시간으로 나눈다.
+"""
+import threading
+import time
+
+from . import config
+
+_transfer_config = None
+_metrics_lock = threading.Lock()
+# seconds: 전송별 소요시간 합, active_seconds: 전송이 하나 이상 진행 중이던 시간
+_metrics = {
+    "download": {"count": 0, "bytes": 0, "seconds": 0.0, "active_seconds": 0.0},
+    "upload": {"count": 0, "bytes": 0, "seconds": 0.0, "active_seconds": 0.0},
+}
+# 방향별 [진행 중인 전송 수, 진행 구간 시작 시각]
+_active = {"download": [0, 0.0], "upload": [0, 0.0]}
+
+
+def get_transfer_config():
+    """config 값으로 만든 TransferConfig (프로세스 공용)"""
+    global _transfer_config
+    if _transfer_config is None:
+        from boto3.s3.transfer import TransferConfig
+        _transfer_config = TransferConfig(
+            multipart_threshold=config.S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=config.S3_MULTIPART_CHUNKSIZE,
+            max_concurrency=config.S3_MAX_CONCURRENCY,
+            use_threads=True,
+        )
+    return _transfer_config
+
+
+class TransferStats:
+    """전송 1건의 진행량/처리량 (boto3 Callback 으로 사용, 여러 전송 스레드에서 호출됨)"""
+
+    def __init__(self, direction):
+        self.direction = direction
+        self.transferred = 0
+        self.started = time.monotonic()
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+        self._finished = False
+        with _metrics_lock:
+            active = _active[direction]
+            if active[0] == 0:
+                active[1] = self.started
+            active[0] += 1
+
+    def __call__(self, bytes_amount):
+        with self._lock:
+            self.transferred += bytes_amount
+
+    def finish(self, failed=False):
+        """전송 종료 기록 - 실패한 전송은 진행 구간만 닫고 누적 통계에는 넣지 않음"""
+        if self._finished:
+            return self
+        self._finished = True
+        now = time.monotonic()
+        self.seconds = now - self.started
+        with _metrics_lock:
+            metrics, active = _metrics[self.direction], _active[self.direction]
+            active[0] -= 1
+            if active[0] == 0:
+                metrics["active_seconds"] += now - active[1]
+            if not failed:
+                metrics["count"] += 1
+                metrics["bytes"] += self.transferred
+                metrics["seconds"] += self.seconds
+        return self
+
+    @property
+    def mb_per_sec(self):
+        return self.transferred / 1e6 / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return f"{self.transferred / 1e6:.1f}MB, {self.seconds:.1f}s, {self.mb_per_sec:.1f}MB/s"
+
+
+def download_file(bucket, key, local_path):
+    """S3 → 로컬 파일 (멀티파트 병렬 다운로드)"""
+    from .aws import get_s3
+    stats = TransferStats("download")
+    try:
+        get_s3().download_file(bucket, key, local_path, Callback=stats, Config=get_transfer_config())
+    except Exception:
+        stats.finish(failed=True)
+        raise
+    return stats.finish()
+
+
+def upload_file(local_path, bucket, key, extra_args=None):
+    """로컬 파일 → S3 (멀티파트 병렬 업로드)"""
+    from .aws import get_s3
+    stats = TransferStats("upload")
+    try:
+        get_s3().upload_file(local_path, bucket, key, ExtraArgs=extra_args, Callback=stats,
+                             Config=get_transfer_config())
+    except Exception:
+        stats.finish(failed=True)
+        raise
+    return stats.finish()
+
+
+def get_transfer_metrics():
+    """프로세스 누적 전송 통계 {download|upload: {count, bytes, seconds, active_seconds, mb_per_sec}}
+
+    mb_per_sec 는 방향별 전체 처리량 (bytes / active_seconds) 이다.
+    """
+    now = time.monotonic()
+    with _metrics_lock:
+        snapshot = {direction: dict(values) for direction, values in _metrics.items()}
+        for direction, (running, since) in _active.items():
+            if running:
+                snapshot[direction]["active_seconds"] += now - since
+    for values in snapshot.values():
+        seconds = values["active_seconds"]
+        values["mb_per_sec"] = round(values["bytes"] / 1e6 / seconds, 2) if seconds else 0.0
+    return snapshot
@@ -0,0 +1,59 @@
+"""파일명 파싱 등 의존성 없는 유틸"""
+
+
+def parse_filename(filename):
+    """{user_id}_{user_name}_{load_kg}_{timestamp}.mp4 형식의 파일명 파싱"""
+    base = filename
+    if base.lower().endswith(".mp4"):
+        base = base[:-4]
+    parts = base.split("_")
+    if len(parts) < 4:
+        return None, None, None, None
+    try:
+        uid = int(parts[0])
+        uname = parts[1]
+        load_kg = float(parts[2])
+        timestamp = parts[3]
+        return uid, uname, load_kg, timestamp
+    except Exception:
+        return None, None, None, None
+
+
+def ts_to_yyyymmdd(ts: str) -> str:
+    # ts: yyyyMMddHHmmssSSS(17자리) 가정 → 앞 8자리 날짜
+    try:
+        return ts[:8]
+    except Exception:
+        return ""
+
+
+def parse_s3_uri(uri):
+    """s3://bucket/prefix → (bucket, prefix), S3 경로가 아니면 None"""
+    if not uri.startswith("s3://"):
+        return None
+    bucket, _, prefix = uri[len("s3://"):].partition("/")
+    return bucket, prefix
+
+
+def percentile(values, q):
+    """값 목록의 q(0~100) 백분위수 (선형 보간), 비어 있으면 None"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def message_object_key(msg):
+    """SQS 메시지(S3 이벤트 또는 {"video_key": ...}) → S3 object_key, 알 수 없으면 None"""
+    import json
+    from urllib.parse import unquote_plus
+    try:
+        body = json.loads(msg["Body"])
+        if "Records" in body:
+            return unquote_plus(body["Records"][0]["s3"]["object"]["key"])
+        return body.get("video_key")
+    except Exception:
+        return None
@@ -0,0 +1,219 @@
+"""동영상 정규화 / 오버레이 렌더링 (cv2, mediapipe 는 함수 호출 시 import)"""
+import os
+
+from .filters import LandmarkSmoother
+from .frames import FrameReader, get_video_info
+from .pose import draw_landmarks
+
+# 정규화 기준 해상도/프레임레이트
+NORMALIZED_WIDTH = 1920
+NORMALIZED_HEIGHT = 1080
+NORMALIZED_FPS = 29
+
+
+# =========================
+# 이미지 전처리
+# =========================
+def preprocess_frame(frame):
+    """프레임 전처리로 포즈 감지 성능 향상"""
+    import cv2
+    import numpy as np
+    try:
+        # 1. 노이즈 제거
+        denoised = cv2.fastNlMeansDenoisingColored(frame, None, 10, 10, 7, 21)
+
+        # 2. 대비 향상 (CLAHE)
+        lab = cv2.cvtColor(denoised, cv2.COLOR_BGR2LAB)
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+        lab[:,:,0] = clahe.apply(lab[:,:,0])
+        enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+
+        # 3. 선명도 향상
+        kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
+        sharpened = cv2.filter2D(enhanced, -1, kernel)
+
+        return sharpened
+    except Exception as e:
+        print(f"이미지 전처리 오류: {e}")
+        return frame
+
+
+# =========================
+# 비디오 생성/분석
+# =========================
+def create_overlay_video(video_path, analysis_results, output_path, max_frames=None, backend=None,
+                         start_frame=0, warmup_frames=0, pipeline=None, target_fps=None):
+    """분석 결과를 오버레이로 표시한 동영상 생성 (max_frames: 렌더링할 앞부분 프레임 수)
+
+    backend 를 주지 않으면 FIT_POSE_BACKEND 설정으로 Pose 백엔드를 만들어 쓰고 닫는다.
+    start_frame 을 주면 [start_frame, max_frames) 구간만 렌더링하고(구간 병렬 렌더링용), 그 앞
+    warmup_frames 프레임은 Pose 추적/랜드마크 필터를 안정시키는 데만 쓰고 출력하지 않는다.
+    pipeline(기본 FIT_SHM_PIPELINE) 이면 디코딩/추론을 별도 프로세스에서 수행하고 여기서는 그리기/인코딩만 한다.
+    target_fps 를 주면 분석과 같은 규칙으로 프레임을 골라 그 FPS 로 출력한다 (정규화하지 않은 원본에 그릴 때
+    rep 프레임 번호 / max_frames 가 analyze_squat(target_fps=...) 과 같은 번호를 가리키도록).
+    """
+    import cv2
+    from . import config
+    from .pose_backends import infer_frames, open_pose_backend
+    pipeline = (config.SHM_PIPELINE if pipeline is None else pipeline) and backend is None
+    own_backend = backend is None and not pipeline
+    if own_backend:
+        # mediapipe 는 complexity 1 (더 정확한 감지), 잡음은 랜드마크 필터로 처리
+        backend = open_pose_backend()
+
+    read_start = max(0, start_frame - warmup_frames)
+    read_frames = None if max_frames is None else max(0, max_frames - read_start)
+    if pipeline:
+        # 디코딩 / Pose 추론 프로세스 분리 (프레임은 공유 메모리 슬롯에 그린 뒤 바로 인코딩)
+        from .shm_pipeline import SharedFramePipeline
+        reader = frames = SharedFramePipeline(video_path, target_fps=target_fps, start_frame=read_start,
+                                              max_frames=read_frames, bgr=True)
+    else:
+        reader = FrameReader(video_path, target_fps=target_fps, start_frame=read_start, max_frames=read_frames)
+        frames = infer_frames(reader, backend, bgr=True)
+    fps, width, height = min(reader.fps, target_fps or reader.fps), reader.width, reader.height
+    smoother = LandmarkSmoother(fps=fps)
+
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+
+    rep_results = analysis_results.get("rep_results", [])
+    # 중간부터 렌더링할 때는 읽기 시작 전에 시작된 마지막 rep 부터 표시
+    current_rep = max((r.get("rep", 0) for r in rep_results if r.get("frame_start", 0) < read_start), default=0)
+
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    font_scale = 0.8
+    thickness = 2
+
+    try:
+        for frame_count, frame, landmarks in frames:
+            # 추론이 끝난 프레임 버퍼에 바로 그림 (배치 1 이면 디코더 슬롯, 아니면 보관용 복사본)
+            overlay_frame = frame
+
+            if landmarks is not None:
+                draw_landmarks(overlay_frame, smoother(landmarks, frame_count))
+                for rep_info in rep_results:
+                    if rep_info.get("frame_start", 0) <= frame_count <= rep_info.get("frame_end", 10**9):
+                        current_rep = rep_info.get("rep", 0)
+                        break
+            if frame_count < start_frame:
+                continue  # 준비 구간은 출력하지 않음
+
+            # 상단 패널
+            panel_height = 120
+            cv2.rectangle(overlay_frame, (0, 0), (width, panel_height), (0, 0, 0), -1)
+            cv2.rectangle(overlay_frame, (0, 0), (width, panel_height), (255, 255, 255), 2)
+
+            info_texts = [
+                f"Rep: {current_rep}",
+                f"Total: {analysis_results.get('total_count', 0)}",
+                f"Score: {analysis_results.get('score', 0)}",
+                f"Grade: {analysis_results.get('grade', 'N/A')}"
+            ]
+
+            for i, text in enumerate(info_texts):
+                y_pos = 30 + i * 25
+                cv2.putText(overlay_frame, text, (20, y_pos), font, font_scale, (255, 255, 255), thickness)
+
+            # 하단 패널
+            stats_panel_y = height - 80
+            cv2.rectangle(overlay_frame, (0, stats_panel_y), (width, height), (0, 0, 0), -1)
+            cv2.rectangle(overlay_frame, (0, stats_panel_y), (width, height), (255, 255, 255), 2)
+
+            counts = analysis_results.get("counts", {})
+            stats_texts = [
+                f"Full Squat: {counts.get('Full Squat', 0)}",
+                f"Basic Squat: {counts.get('Basic Squat', 0)}",
+                f"Half Squat: {counts.get('Half Squat', 0)}",
+                f"Fail Squat: {counts.get('Fail Squat', 0)}"
+            ]
+
+            for i, text in enumerate(stats_texts):
+                y_pos = stats_panel_y + 25 + i * 15
+                cv2.putText(overlay_frame, text, (20, y_pos), font, 0.6, (255, 255, 255), 1)
+
+            if 0 < current_rep <= len(rep_results):
+                rep_info = rep_results[current_rep - 1]
+                rep_text = f"Rep {current_rep}: {rep_info.get('label', 'N/A')} ({rep_info.get('min_knee_angle', 0)}°)"
+                cv2.putText(overlay_frame, rep_text, (width//2 - 150, height//2), font, 1.2, (0, 255, 0), 3)
+
+            out.write(overlay_frame)
+    finally:
+        reader.close()
+        out.release()
+        if own_backend:
+            backend.close()
+    print(f"✅ 오버레이 비디오 생성 완료: {output_path}")
+
+
+# =========================
+# 동영상 정규화
+# =========================
+def normalize_video(video_path, target_width=NORMALIZED_WIDTH, target_height=NORMALIZED_HEIGHT,
+                    target_fps=NORMALIZED_FPS, max_frames=None, output_path=None):
+    """동영상을 표준 해상도로 정규화 - 1920x1080 @ 29fps
+
+    max_frames 를 주면 세트 종료 이후 구간은 디코딩/인코딩하지 않는다.
+    output_path 를 주지 않으면 원본 옆 *_normalized.mp4 에 저장한다.
+    """
+    import cv2
+    print(f"🔄 동영상 정규화 시작: {target_width}x{target_height} @ {target_fps}fps")
+
+    # 임시 정규화된 동영상 경로
+    normalized_path = output_path or os.path.splitext(video_path)[0] + "_normalized.mp4"
+
+    # 정규화 크기로 축소까지 디코더 스레드에서 수행
+    reader = FrameReader(video_path, size=(target_width, target_height), target_fps=target_fps, max_frames=max_frames)
+    original_fps, original_width, original_height = reader.fps, reader.width, reader.height
+
+    print(f"📹 원본 동영상: {original_width}x{original_height} @ {original_fps}fps")
+
+    # 정규화가 필요한지 확인 (잘라내기는 오버레이 렌더링에서 max_frames 로 처리)
+    if (original_width == target_width and
+        original_height == target_height and
+        original_fps == target_fps):
+        print("✅ 이미 표준 해상도 - 정규화 불필요")
+        reader.close()
+        return video_path
+
+    if max_frames is not None:
+        print(f"✂️ 활성 구간만 정규화: 앞 {max_frames} 프레임")
+
+    # 비디오 라이터 설정
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    out = cv2.VideoWriter(normalized_path, fourcc, target_fps, (target_width, target_height))
+
+    processed_frames = 0
+
+    for _, normalized_frame in reader:
+        # 정규화된 프레임을 출력
+        out.write(normalized_frame)
+        processed_frames += 1
+
+        # 진행상황 표시
+        if processed_frames % 100 == 0:
+            print(f"   진행률: {processed_frames} 프레임 처리 완료")
+
+    reader.close()
+    out.release()
+
+    # 정규화 결과 검증
+    if os.path.exists(normalized_path):
+        verify_cap = cv2.VideoCapture(normalized_path)
+        final_fps, final_width, final_height = get_video_info(verify_cap)
+        verify_cap.release()
+
+        print(f"✅ 동영상 정규화 완료: {processed_frames} 프레임 → {final_width}x{final_height} @ {final_fps}fps")
+        print(f"🔍 정규화 검증: 원본 {original_width}x{original_height}@{original_fps} → 결과 {final_width}x{final_height}@{final_fps}")
+
+        # 정규화가 제대로 되었는지 확인
+        if final_width == target_width and final_height == target_height and final_fps == target_fps:
+            print("✅ 정규화 성공!")
+            return normalized_path
+        else:
+            print("❌ 정규화 실패 - 원본 동영상 반환")
+            os.remove(normalized_path)
+            return video_path
+    else:
+        print("❌ 정규화된 동영상 파일 생성 실패")
+        return video_path
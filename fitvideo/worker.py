@@ -0,0 +1,484 @@
+"""SQS 메시지를 받아 분석/업로드/결과 저장을 수행하는 워커
+
+실행: ``python -m fitvideo.worker``
+"""
+import json
+import os
+import signal
+import threading
+import time
+from urllib.parse import unquote_plus
+
+import requests
+
+from . import config
+from .analysis import analyze_squat, get_active_frames
+from .aws import (defer_message, delete_message, download_video, get_message, get_next_set_no, get_object_head,
+                  get_queue_depth, send_message, send_to_dead_letter)
+from .history import append_result as append_history, set_video_key as set_history_video_key
+from .ledger import BUSY, DEAD, DONE, STATE_FAILED, LeaseKeeper, LeaseLost, get_ledger
+from .loadshed import DEFERRED_RENDER, get_load_shedder
+from .profiling import profile_message
+from .resources import apply_resource_limits
+from .scratch import ScratchSpace
+from .transfer import upload_file
+from .utils import parse_filename, ts_to_yyyymmdd
+from .video import NORMALIZED_FPS, create_overlay_video, normalize_video
+
+
+# =========================
+# 분석 결과 저장 (서버)
+# =========================
+def patch_analysis(workout_id, user_id, result, analyzed_object_key=None):
+    """PATCH /workouts/{id}/analysis - analyzed_object_key 가 없으면 횟수/점수/rep 결과만 먼저 저장"""
+    analysis_data = {
+        "rep_cnt": result["total_count"],
+        "feedback": {
+            "depth": result["grade"],
+            "alignment": "auto",
+            "score": result["score"],
+            "counts": result["counts"]
+        },
+        "rep_results": result["rep_results"],
+    }
+    if analyzed_object_key is not None:
+        analysis_data["analyzed_video_key"] = analyzed_object_key
+
+    res = requests.patch(
+        f"{config.BASE_URL}/workouts/{workout_id}/analysis",
+        params={"user_id": user_id},
+        json=analysis_data
+    )
+    stage = "영상" if analyzed_object_key is not None else "횟수"
+    print(f"▶ PATCH /analysis ({stage}):", res.status_code)
+    if res.status_code == 200:
+        print("✅ 분석 결과 저장 성공:", res.json())
+        return True
+    print("❌ 분석 결과 저장 실패:", res.text)
+    return False
+
+
+# =========================
+# 작업 장부 / 메시지 가시성
+# =========================
+SQS_MAX_VISIBILITY_SEC = 12 * 60 * 60  # change_message_visibility 최대값
+
+
+def hold_busy_message(msg, ledger, job_key, content_hash):
+    """다른 워커가 처리 중인 메시지 - 그 워커의 lease 가 끝날 때까지 다시 받지 않도록 가시성 연장"""
+    row = ledger.get(job_key, content_hash) or {}
+    remaining = ledger.lease_sec - (time.time() - row.get("updated_at", time.time()))
+    visibility = int(min(max(remaining, 30), SQS_MAX_VISIBILITY_SEC))
+    defer_message(msg["ReceiptHandle"], visibility, queue_url=msg.get("QueueUrl"))
+    return visibility
+
+
+def is_missing_object(error):
+    """S3 객체가 없어 재시도해도 소용없는 오류인지 (head_object 404 등)"""
+    code = getattr(error, "response", {}).get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+# =========================
+# 오버레이 렌더링 / 업로드
+# =========================
+def render_and_upload(video_path, result, active_frames, scratch, encoded_bytes, user_id, user_name, timestamp,
+                      exercise_dir, normalize=True):
+    """(정규화 +) 오버레이 렌더링 후 S3 업로드 → 분석 영상 object key
+
+    normalize=False 는 분석 결과의 프레임 번호가 원본 기준일 때 (저하 모드) 원본에 바로 그린다.
+    """
+    # 긴 동영상은 설정 시 구간 병렬로 렌더링
+    render = create_overlay_video
+    if config.SEGMENT_WORKERS > 1:
+        from .segments import create_overlay_video_segmented as render
+
+    # 동영상 정규화 (1920x1080 @ 29fps) 및 오버레이 - 활성 구간만 처리
+    normalized_video_path = video_path
+    render_fps = None
+    if normalize:
+        normalized_video_path = normalize_video(video_path, max_frames=active_frames,
+                                                output_path=scratch.sibling(video_path, "_normalized", encoded_bytes))
+        if normalized_video_path == video_path:
+            # 정규화 실패/불필요로 원본을 받으면 분석과 같은 프레임 선택으로 렌더링 (rep 프레임 번호 일치)
+            render_fps = NORMALIZED_FPS
+    analyzed_video_local_path = scratch.sibling(video_path, "_analyzed", encoded_bytes)
+    render(normalized_video_path, result, analyzed_video_local_path, max_frames=active_frames, target_fps=render_fps)
+
+    yyyymmdd = ts_to_yyyymmdd(timestamp)
+    set_no   = get_next_set_no(user_id, user_name, yyyymmdd, exercise_dir)
+
+    analyzed_object_key = f"{config.ROOT_PREFIX}/{user_id}_{user_name}/{yyyymmdd}/{exercise_dir}/set{set_no}_{timestamp}.mp4"
+
+    upload_stats = upload_file(
+        analyzed_video_local_path,
+        config.BUCKET_NAME,
+        analyzed_object_key,
+        extra_args={
+            "ContentType": "video/mp4",
+            "Metadata": {
+                "user-id": str(user_id),
+                "exercise": exercise_dir,
+                "set-no": str(set_no),
+                "timestamp": timestamp
+            }
+        }
+    )
+    print(f"✅ 분석된 비디오 업로드 완료: {analyzed_object_key} ({upload_stats})")
+    return analyzed_object_key
+
+
+def process_deferred_render(msg, job):
+    """저하 모드에서 미룬 오버레이 렌더링 처리 - 정상 모드일 때만 렌더링/업로드 후 분석 영상 키 저장"""
+    object_key = job["object_key"]
+    queue_url = msg.get("QueueUrl")  # 지연 렌더링 큐에서 받은 메시지
+    if get_load_shedder().check():
+        print(f"⏭️ 저하 모드 - 지연 렌더링 다시 미룸: {object_key}")
+        defer_message(msg["ReceiptHandle"], config.DEGRADE_DEFER_SEC, queue_url=queue_url)
+        return True
+
+    # 원본 분석과 구분되는 키로 중복 렌더링 방지
+    ledger = get_ledger()
+    render_key = f"{object_key}#overlay"
+    content_hash, source_bytes = get_object_head(object_key)
+    status = ledger.claim(render_key, content_hash)
+    if status == DONE:
+        print(f"⚠️ 이미 렌더링된 영상: {object_key} → 삭제")
+        delete_message(msg["ReceiptHandle"], queue_url=queue_url)
+        return True
+    if status == BUSY:
+        visibility = hold_busy_message(msg, ledger, render_key, content_hash)
+        print(f"⏳ 다른 워커가 렌더링 중: {object_key} → {visibility}초 뒤 다시 확인")
+        return True
+    if status == DEAD:
+        print(f"☠️ 재시도 한도 초과 렌더링: {object_key}")
+        send_to_dead_letter(msg, f"max attempts exceeded: {render_key}")
+        delete_message(msg["ReceiptHandle"], queue_url=queue_url)
+        return False
+
+    print(f"🎬 지연 렌더링 시작: {object_key}")
+    scratch = ScratchSpace(render_key)
+    lease = LeaseKeeper(ledger, render_key, content_hash).start()
+    try:
+        video_path = download_video(object_key, scratch.path(os.path.basename(object_key), source_bytes))
+        analyzed_object_key = render_and_upload(
+            video_path, job["result"], job["active_frames"], scratch,
+            int(source_bytes * config.SCRATCH_REENCODE_RATIO), job["user_id"], job["user_name"],
+            job["timestamp"], job["exercise_dir"], normalize=job["normalize"]
+        )
+        lease.check()
+        patch_analysis(job["workout_id"], job["user_id"], job["result"], analyzed_object_key)
+        # 저하 모드에서 영상 키 없이 기록한 로컬 이력에 영상 키 반영
+        try:
+            set_history_video_key(job["user_id"], job["timestamp"], job["exercise_dir"], analyzed_object_key)
+        except Exception as e:
+            print(f"이력 영상 키 갱신 실패: {e}")
+        ledger.mark_done(render_key, content_hash, analyzed_object_key)
+        delete_message(msg["ReceiptHandle"], queue_url=queue_url)
+        return True
+
+    except LeaseLost:
+        # 다른 워커가 이어서 처리 중 → 장부/메시지는 그 워커에게 맡김
+        print(f"⚠️ 렌더링 lease 상실 - 결과 저장 생략: {render_key}")
+        return False
+
+    except Exception as e:
+        print("❌ 지연 렌더링 예외 발생:", e)
+        if ledger.mark_failed(render_key, content_hash, str(e)) == STATE_FAILED:
+            print(f"🔁 재시도 예정: {render_key}")
+            return False
+        send_to_dead_letter(msg, str(e))
+        delete_message(msg["ReceiptHandle"], queue_url=queue_url)
+        return False
+
+    finally:
+        lease.stop()
+        scratch.cleanup()
+
+
+# =========================
+# 메시지 처리
+# =========================
+def process_video_message(msg):
+    """동영상 메시지 처리
+
+    중복/재시도 여부는 작업 장부(ledger)로 판단한다. 처리 중 예외가 나면 메시지를 지우지 않고
+    가시성 타임아웃 후 다시 받도록 두며, MAX_ATTEMPTS 를 넘기면 dead-letter 로 보낸다.
+    작업을 맡기 전의 예외(S3/장부 일시 오류 등)는 시도 횟수에 넣지 않고 메시지만 남겨 둔다.
+    처리하는 동안 장부 lease 를 주기적으로 갱신하고, 운동 등록/결과 저장 직전에 소유를 다시 확인한다.
+    등록한 운동 ID 는 장부에 기록해, 재시도 때는 운동을 다시 등록하지 않고 같은 운동에 결과를 저장한다.
+    분석 결과(횟수/점수/rep 결과)는 분석 직후 먼저 저장하고, 분석 영상 키는 렌더링/업로드 후 추가한다.
+    중간 파일(원본/정규화본/오버레이본)은 작업 공간에 만들고 성공/실패와 무관하게 마지막에 삭제한다.
+    큐 적체로 저하 모드일 때는 정규화를 건너뛰고 작은 프레임으로 분석하며, 오버레이는 지연 렌더링으로 미룬다.
+    """
+    ledger = get_ledger()
+    claimed = False
+    scratch = None
+    lease = None
+    try:
+        print(f"🔍 메시지 내용 확인:")
+        print(f"   Body: {msg['Body'][:200]}...")
+
+        # 메시지 구조 (다시 받아도 같으므로 형식 오류는 바로 dead-letter)
+        try:
+            body = json.loads(msg["Body"])
+            if DEFERRED_RENDER in body:
+                return process_deferred_render(msg, body[DEFERRED_RENDER])
+            if "Records" in body:
+                object_key = unquote_plus(body["Records"][0]["s3"]["object"]["key"])
+                print(f"   📁 S3 이벤트 감지: {object_key}")
+            elif "video_key" in body:
+                object_key = body["video_key"]
+                print(f"   비디오 키: {object_key}")
+            else:
+                print(f"   ❌ 알 수 없는 메시지 구조: {list(body.keys())}")
+                print("❌ 메시지 구조 오류 → 삭제")
+                delete_message(msg["ReceiptHandle"])
+                return False
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            print(f"❌ 메시지 형식 오류: {e}")
+            send_to_dead_letter(msg, f"malformed message: {e}")
+            delete_message(msg["ReceiptHandle"])
+            return False
+
+        # 분석본 필터
+        if object_key.endswith("_analyzed.mp4"):
+            print(f"⚠️ 분석된 영상: {object_key} → 삭제")
+            delete_message(msg["ReceiptHandle"])
+            return True
+
+        # 중복 필터 (S3 키 + 내용 해시 기준, 워커 재시작/다른 워커와 공유)
+        content_hash, source_bytes = get_object_head(object_key)
+        status = ledger.claim(object_key, content_hash)
+        if status == DONE:
+            print(f"⚠️ 이미 처리된 영상: {object_key} → 삭제")
+            delete_message(msg["ReceiptHandle"])
+            return True
+        if status == BUSY:
+            visibility = hold_busy_message(msg, ledger, object_key, content_hash)
+            print(f"⏳ 다른 워커가 처리 중: {object_key} → {visibility}초 뒤 다시 확인")
+            return True
+        if status == DEAD:
+            print(f"☠️ 재시도 한도 초과 영상: {object_key}")
+            send_to_dead_letter(msg, f"max attempts exceeded: {object_key}")
+            delete_message(msg["ReceiptHandle"])
+            return False
+        claimed = True
+        lease = LeaseKeeper(ledger, object_key, content_hash).start()
+        # 재시도면 앞선 시도에서 등록한 운동을 그대로 사용 (운동 중복 등록 방지)
+        workout_id = (ledger.get(object_key, content_hash) or {}).get("workout_id")
+
+        print(f"새로운 동영상 분석 시작: {object_key}")
+
+        # 다운로드 및 파싱 (크기가 메모리 예산 안이면 tmpfs 에)
+        scratch = ScratchSpace(object_key)
+        encoded_bytes = int(source_bytes * config.SCRATCH_REENCODE_RATIO)
+        video_path = download_video(object_key, scratch.path(os.path.basename(object_key), source_bytes))
+        user_id, user_name, load_kg, timestamp = parse_filename(os.path.basename(video_path))
+
+        if None in [user_id, user_name, load_kg, timestamp]:
+            print("❌ 파일명 파싱 실패 → 삭제")
+            ledger.mark_dead(object_key, content_hash, "filename parse failed")
+            delete_message(msg["ReceiptHandle"])
+            return False
+
+        exercise_id = 2  # 스쿼트 (필요시 메시지/메타데이터로 받아서 변경)
+        if workout_id is None:
+            lease.check()
+            # 최신 입실 조회
+            visit_res = requests.get(f"{config.BASE_URL}/visits/last/{user_id}")
+            if visit_res.status_code != 200:
+                print("❌ 입실 기록 없음 → 삭제")
+                ledger.mark_dead(object_key, content_hash, "no visit record")
+                delete_message(msg["ReceiptHandle"])
+                return False
+            visit_id = visit_res.json()["id"]
+
+            # 운동 등록
+            workout_data = {
+                "user_id": user_id,
+                "visit_id": visit_id,
+                "exercise_id": exercise_id,
+                "load_kg": load_kg,
+                "s3_key": object_key
+            }
+            res = requests.post(f"{config.BASE_URL}/workouts", json=workout_data)
+            print("▶ POST /workouts:", res.status_code)
+            if res.status_code != 200:
+                print("❌ 운동 등록 실패:", res.text)
+                ledger.mark_dead(object_key, content_hash, f"POST /workouts {res.status_code}")
+                delete_message(msg["ReceiptHandle"])
+                return False
+
+            workout_id = res.json()["workout_id"]
+            ledger.set_workout_id(object_key, content_hash, workout_id)
+        else:
+            print(f"♻️ 재시도 - 등록된 운동 재사용: workout_id={workout_id}")
+
+        exercise_dir = config.EXERCISE_MAP.get(exercise_id, "squat")
+
+        degraded = get_load_shedder().check()
+        if degraded:
+            # 저하 모드: 정규화 없이 원본 프레임 번호로, 작은 프레임으로 분석
+            result = analyze_squat(video_path, size=config.DEGRADE_ANALYSIS_SIZE)
+        else:
+            # 긴 동영상은 설정 시 구간 병렬로 분석
+            analyze = analyze_squat
+            if config.SEGMENT_WORKERS > 1:
+                from .segments import analyze_squat_segmented as analyze
+            # 원본에서 정규화와 같은 프레임만 골라 분석 → 세트 종료 프레임 결정
+            result = analyze(video_path, target_fps=NORMALIZED_FPS)
+        active_frames = get_active_frames(result)
+
+        # 1단계: 횟수/점수를 먼저 저장 → 앱은 렌더링/업로드를 기다리지 않고 결과 표시
+        lease.check()
+        try:
+            patch_analysis(workout_id, user_id, result)
+        except Exception as e:
+            print(f"분석 결과 선저장 실패 (영상 업로드 후 다시 저장): {e}")
+
+        if degraded and config.DEFERRED_QUEUE_URL:
+            # 오버레이는 정상 모드로 돌아온 뒤 처리하도록 지연 렌더링 큐로 넘김 (2단계는 그때 저장).
+            # 작업 큐에 넣으면 미뤄 둔 렌더링이 큐 깊이에 잡혀 저하 모드에서 빠져나오지 못한다
+            send_message({
+                DEFERRED_RENDER: {
+                    "object_key": object_key,
+                    "workout_id": workout_id,
+                    "user_id": user_id,
+                    "user_name": user_name,
+                    "timestamp": timestamp,
+                    "exercise_dir": exercise_dir,
+                    "active_frames": active_frames,
+                    "normalize": False,
+                    "result": {k: result[k] for k in ("total_count", "score", "grade", "counts", "rep_results")},
+                },
+                "video_key": object_key,
+            }, queue_url=config.DEFERRED_QUEUE_URL)
+            analyzed_object_key = None
+            print(f"⏭️ 오버레이 렌더링 지연: {object_key}")
+        else:
+            # 저하 모드 분석은 원본 프레임 번호이므로 정규화 없이 원본에 렌더링
+            analyzed_object_key = render_and_upload(video_path, result, active_frames, scratch, encoded_bytes,
+                                                    user_id, user_name, timestamp, exercise_dir,
+                                                    normalize=not degraded)
+            # 2단계: 분석 영상 키 추가 (1단계가 실패했어도 전체 결과가 함께 저장되도록 모두 다시 보냄)
+            lease.check()
+            patch_analysis(workout_id, user_id, result, analyzed_object_key)
+
+        # 로컬 이력 저장소에 추가 (앱 이력/추세 조회용)
+        try:
+            append_history(user_id, timestamp, exercise_dir, load_kg, result, analyzed_object_key)
+        except Exception as e:
+            print(f"이력 저장 실패: {e}")
+
+        ledger.mark_done(object_key, content_hash, analyzed_object_key)
+        print(f"✅ 동영상 분석 완료: {object_key}")
+
+        delete_message(msg["ReceiptHandle"])
+        return True
+
+    except LeaseLost:
+        # lease_sec 안에 갱신하지 못해 다른 워커가 가져감 → 장부/메시지는 그 워커에게 맡김
+        print(f"⚠️ 작업 lease 상실 - 결과 저장 생략: {object_key}")
+        return False
+
+    except Exception as e:
+        print("❌ 예외 발생:", e)
+        print("💬 원본 메시지:\n", msg.get("Body"))
+
+        if not claimed:
+            if is_missing_object(e):
+                send_to_dead_letter(msg, f"object not found: {e}")
+                delete_message(msg["ReceiptHandle"])
+                return False
+            # 작업을 맡기 전 일시 오류 (S3 조회/장부 접근 등) → 메시지를 남겨 가시성 타임아웃 후 다시 처리
+            print("🔁 작업 시작 전 오류 - 메시지 유지")
+            return False
+
+        # 재시도 가능하면 메시지를 남겨 가시성 타임아웃 후 다시 처리
+        if ledger.mark_failed(object_key, content_hash, str(e)) == STATE_FAILED:
+            print(f"🔁 재시도 예정: {object_key}")
+            return False
+
+        send_to_dead_letter(msg, str(e))
+        delete_message(msg["ReceiptHandle"])
+        return False
+
+    finally:
+        if lease is not None:
+            lease.stop()
+        # 로컬 중간 파일 정리 (성공/실패/조기 반환 모두)
+        if scratch is not None:
+            scratch.cleanup()
+
+
+_stop = threading.Event()
+
+
+def request_stop(signum=None, frame=None):
+    """현재 작업을 마친 뒤 종료 (supervisor 가 워커를 줄일 때 SIGTERM)"""
+    if not _stop.is_set():
+        print("🛑 종료 요청 - 진행 중인 작업을 마치고 종료합니다")
+    _stop.set()
+
+
+def handle_message(msg):
+    """메시지 1건 처리 - 프로파일링(설정 시) + 처리 시간 기록 (FIT_WORKER_STATS, supervisor 가 읽음)"""
+    started = time.time()
+    # FIT_PROFILE 설정 시 느린 작업의 프로파일을 S3 키별로 남김
+    success = profile_message(process_video_message, msg)
+    # 큐 도착 → 완료 지연을 저하 모드 판단에 반영
+    get_load_shedder().record(msg)
+    if config.WORKER_STATS_PATH:
+        finished = time.time()
+        with open(config.WORKER_STATS_PATH, "a") as f:
+            f.write(json.dumps({"finished_at": finished, "elapsed": finished - started, "ok": bool(success)}) + "\n")
+    return success
+
+
+def get_deferred_render_message():
+    """정상 모드일 때만 지연 렌더링 큐에서 메시지 1건 (없거나 저하 모드면 None)"""
+    if not config.DEFERRED_QUEUE_URL or get_load_shedder().check():
+        return None
+    return get_message(queue_url=config.DEFERRED_QUEUE_URL, wait_seconds=0)
+
+
+def main():
+    signal.signal(signal.SIGTERM, request_stop)
+    apply_resource_limits()
+    print("스쿼트 분석 시작...")
+    print("⏳ 동영상 대기 중... (동영상을 업로드하면 분석이 시작됩니다)")
+
+    # 큐 상태 확인
+    try:
+        message_count = get_queue_depth()
+        print(f"현재 큐에 {message_count}개의 메시지가 있습니다")
+    except Exception as e:
+        print(f"큐 상태 확인 실패: {e}")
+
+    if config.SCHEDULER_ENABLED:
+        # 여러 메시지를 받아 짧은 작업 우선 + 사용자별 공정 순서로 처리
+        from .scheduler import run_scheduled
+        run_scheduled(handle_message, should_stop=_stop.is_set, get_idle_message=get_deferred_render_message)
+        return
+
+    while not _stop.is_set():
+        # 일반 작업이 없을 때만 미뤄 둔 오버레이 렌더링 처리
+        msg = get_message() or get_deferred_render_message()
+        if msg:
+            print("\n📥 동영상 메시지 감지됨!")
+            success = handle_message(msg)
+
+            if success:
+                print("✅ 동영상 분석 완료")
+            else:
+                print("❌ 동영상 분석 실패")
+        else:
+            print("🕓 동영상 없음, 대기 중...")
+
+        _stop.wait(5)
+    print("👋 워커 종료")
+
+
+if __name__ == "__main__":
+    main()
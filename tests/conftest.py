@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_video():
+    """프레임마다 밝기가 다른 작은 mp4v 동영상 생성 → 경로"""
+    def make(path, frames=10, size=(64, 48), fps=30):
+        import cv2
+        import numpy as np
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+        for i in range(frames):
+            writer.write(np.full((size[1], size[0], 3), (i * 20) % 256, np.uint8))
+        writer.release()
+        return str(path)
+    return make
@@ -0,0 +1,99 @@
+import hashlib
+import os
+
+import pytest
+
+from fitvideo import analysis, batch
+
+
+def _md5(path):
+    with open(path, "rb") as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+def test_list_videos_accepts_upper_case_and_skips_analyzed(tmp_path):
+    for name in ("12_kim_60_1.MP4", "12_kim_60_2.mp4", "12_kim_60_1_analyzed.MP4", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    names = [os.path.basename(path) for path in batch.list_videos(str(tmp_path))]
+    assert names == ["12_kim_60_1.MP4", "12_kim_60_2.mp4"]
+
+
+def test_overlay_output_path_for_upper_case_extension(monkeypatch):
+    written = []
+    monkeypatch.setattr(analysis, "analyze_squat", lambda path, backend=None: {"end_frame": None, "fps": 30})
+    monkeypatch.setattr(analysis, "create_overlay_video",
+                        lambda path, result, output_path, **kwargs: written.append(output_path))
+
+    _, output_path = analysis.analyze_squat_with_overlay("/videos/12_kim_60_20250101.MP4")
+    assert output_path == "/videos/12_kim_60_20250101_analyzed.mp4"
+    assert written == [output_path]
+
+
+def test_analyze_one_does_not_touch_upper_case_source(tmp_path, monkeypatch, make_video):
+    source_dir = tmp_path / "src"
+    source_dir.mkdir()
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    source = make_video(source_dir / "12_kim_60_20250101.MP4")
+    before = _md5(source)
+
+    def fake_overlay(video_path, output_path=None):
+        assert output_path and os.path.abspath(output_path) != os.path.abspath(source)
+        with open(output_path, "wb") as f:
+            f.write(b"analyzed")
+        return {"total_count": 3, "score": 80}, output_path
+
+    monkeypatch.setattr(analysis, "analyze_squat_with_overlay", fake_overlay)
+    item, total_count, score = batch.analyze_one(str(source_dir), source, str(output_dir))
+
+    assert (item, total_count, score) == (source, 3, 80)
+    assert _md5(source) == before
+    assert (output_dir / "12_kim_60_20250101_analyzed.mp4").read_bytes() == b"analyzed"
+    assert (output_dir / "12_kim_60_20250101.json").exists()
+
+
+def test_normalize_video_keeps_upper_case_source(tmp_path, make_video):
+    from fitvideo.video import normalize_video
+    source = make_video(tmp_path / "12_kim_60_20250101.MP4", frames=5)
+    before = _md5(source)
+
+    normalized = normalize_video(source, target_width=32, target_height=24, target_fps=15)
+    assert normalized != source
+    assert normalized.endswith("_normalized.mp4")
+    assert _md5(source) == before
+
+
+def test_output_names_keep_subpaths_under_s3_prefix():
+    source = "s3://bucket/uploads/"
+    names = {batch._stem(key, source) for key in ("uploads/a/12_kim_60_1.mp4", "uploads/b/12_kim_60_1.mp4")}
+    assert names == {"a/12_kim_60_1", "b/12_kim_60_1"}
+    assert batch._stem("uploads/a/12_kim_60_1.MP4", "s3://bucket/uploads") == "a/12_kim_60_1"
+    assert batch._stem("uploads/20250101.mp4", "s3://bucket/uploads/2025") == "20250101"
+    assert batch._stem("/data/videos/12_kim_60_1.mp4", "/data/videos") == "12_kim_60_1"
+
+
+def test_nested_output_name_is_written_to_subdirectory(tmp_path):
+    local = tmp_path / "result.json"
+    local.write_text("{}")
+    batch._write_output(str(tmp_path / "out"), "a/12_kim_60_1.json", str(local), "application/json")
+    assert batch._output_exists(str(tmp_path / "out"), "a/12_kim_60_1.json")
+    assert not batch._output_exists(str(tmp_path / "out"), "b/12_kim_60_1.json")
+
+
+def test_only_missing_s3_output_counts_as_not_done(monkeypatch):
+    from botocore.exceptions import ClientError
+    from fitvideo import aws
+    keys = []
+
+    class FakeS3:
+        def head_object(self, Bucket, Key):
+            keys.append(Key)
+            raise ClientError({"Error": {"Code": code, "Message": ""}}, "HeadObject")
+
+    monkeypatch.setattr(aws, "get_s3", FakeS3)
+    code = "404"
+    assert batch._output_exists("s3://bucket/rescore/", "a/x.json") is False
+    assert keys == ["rescore/a/x.json"]
+    code = "403"
+    with pytest.raises(ClientError):
+        batch._output_exists("s3://bucket/rescore/", "a/x.json")
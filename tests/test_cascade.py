@@ -0,0 +1,85 @@
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from fitvideo import cascade
+from fitvideo.pose import NUM_LANDMARKS, PoseLandmark
+
+
+def _results(angle, visibility=1.0):
+    """무릎 각도가 angle 인 mediapipe 형식 결과 (angle None 이면 미감지)"""
+    if angle is None:
+        return SimpleNamespace(pose_landmarks=None)
+    points = [[0.5, 0.5, 0.0, visibility] for _ in range(NUM_LANDMARKS)]
+    theta = math.radians(angle)
+    for hip, knee, ankle in ((PoseLandmark.LEFT_HIP, PoseLandmark.LEFT_KNEE, PoseLandmark.LEFT_ANKLE),
+                             (PoseLandmark.RIGHT_HIP, PoseLandmark.RIGHT_KNEE, PoseLandmark.RIGHT_ANKLE)):
+        points[knee][:2] = [0.5, 0.7]
+        points[ankle][:2] = [0.5 + 0.2 * math.sin(theta), 0.7 - 0.2 * math.cos(theta)]
+    landmark = [SimpleNamespace(x=x, y=y, z=z, visibility=v) for x, y, z, v in points]
+    return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=landmark))
+
+
+class StubPose:
+    """프레임 대신 {"light": (각도, visibility), "heavy": 각도} 를 받아 해당 모델 결과를 돌려줌"""
+
+    def __init__(self, complexity):
+        self.model = "light" if complexity == 0 else "heavy"
+        self.frames = []
+        self.closed = False
+
+    def process(self, frame):
+        self.frames.append(frame["id"])
+        spec = frame.get(self.model, frame.get("light"))
+        return _results(*spec) if isinstance(spec, tuple) else _results(spec)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pose(monkeypatch):
+    monkeypatch.setattr(cascade, "create_pose", lambda complexity, *args, **kwargs: StubPose(complexity))
+    return cascade.CascadePose()
+
+
+def _run(pose, frames):
+    frames = [dict(frame, id=i) for i, frame in enumerate(frames)]
+    return [pose.process(frame) for frame in frames]
+
+
+def test_heavy_model_runs_near_decision_angles_and_bottom(pose):
+    angles = [
+        178,  # 서 있음 → light
+        172,  # 분석 시작 165 ± 8
+        160,  # 단계 전환 155 ± 8
+        150,  # 단계 전환 155 ± 8
+        140,  # 하강 중 현재까지 최저 → 최저점 부근
+        120, 100,
+        105,  # 최저 100 + 10 이내
+        115,  # 최저 100 + 10 밖 → light
+        140,
+        178,  # 올라옴 → 최저 각도 초기화
+        130,  # 새 하강의 첫 프레임 → 최저점 부근
+    ]
+    _run(pose, [{"light": angle} for angle in angles])
+    assert pose.light.frames == list(range(len(angles)))
+    assert pose.heavy.frames == [1, 2, 3, 4, 5, 6, 7, 11]
+    assert (pose.light_frames, pose.heavy_frames) == (12, 8)
+    assert pose.heavy_ratio == pytest.approx(8 / 12)
+
+
+def test_heavy_model_runs_when_light_misses_or_legs_are_unclear(pose):
+    _run(pose, [{"light": None}, {"light": (178, 0.3)}, {"light": (178, 0.9)}])
+    assert pose.heavy.frames == [0, 1]
+
+
+def test_heavy_result_replaces_light_unless_it_misses(pose):
+    replaced, kept = _run(pose, [{"light": 150, "heavy": 120}, {"light": 150, "heavy": None}])
+    assert replaced.pose_landmarks.landmark[PoseLandmark.LEFT_ANKLE].x == pytest.approx(
+        _results(120).pose_landmarks.landmark[PoseLandmark.LEFT_ANKLE].x)
+    assert kept.pose_landmarks.landmark[PoseLandmark.LEFT_ANKLE].x == pytest.approx(
+        _results(150).pose_landmarks.landmark[PoseLandmark.LEFT_ANKLE].x)
+    pose.close()
+    assert pose.light.closed and pose.heavy.closed
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from fitvideo import enhance
+from fitvideo.enhance import EnhancedBackend, LowLightEnhancer
+from fitvideo.pose_backends import PoseBackend
+
+LANDMARKS = np.zeros((33, 4), dtype=np.float32)
+
+
+def _frame(level, noise=0):
+    """밝기 level, noise 를 주면 가로줄 절반(측정 시 읽는 줄 기준)을 level + noise 로"""
+    image = np.full((48, 64, 3), level, dtype=np.uint8)
+    if noise:
+        image[::4] = min(255, level + noise)
+    return image
+
+
+def test_measure_thresholds():
+    enhancer = LowLightEnhancer(brightness=70, contrast=30)
+    assert enhancer.measure(_frame(20, noise=60)) is True  # 어두움
+    enhancer = LowLightEnhancer(brightness=70, contrast=30)
+    assert enhancer.measure(_frame(150)) is True  # 대비 낮음
+    enhancer = LowLightEnhancer(brightness=70, contrast=30)
+    assert enhancer.measure(_frame(100, noise=100)) is False
+    assert enhancer.brightness == pytest.approx(150) and enhancer.contrast == pytest.approx(50)
+
+
+def test_measure_only_every_interval():
+    enhancer = LowLightEnhancer(brightness=70, contrast=30)
+    assert enhancer.measure(_frame(100, noise=100)) is False
+    # 다음 측정 전까지는 어두운 프레임이 와도 이전 판정 유지
+    assert all(enhancer.measure(_frame(10)) is False for _ in range(enhance.MEASURE_INTERVAL - 1))
+    assert enhancer.measure(_frame(10)) is True
+
+
+class BrightEnhancer(LowLightEnhancer):
+    """항상 밝다고 판정하고, 보정본은 표시만 바꿔 돌려주는 보정기"""
+
+    def measure(self, image):
+        return False
+
+    def enhance(self, image):
+        return ("enhanced", image)
+
+
+class StubBackend(PoseBackend):
+    """보정본에서만 포즈를 찾는 (recover=True) / 어디서도 못 찾는 백엔드 - 넣은 프레임 기록"""
+
+    def __init__(self, stateless, recover):
+        self.stateless = stateless
+        self.recover = recover
+        self.calls = []
+
+    def infer(self, images):
+        self.calls.append([isinstance(image, tuple) for image in images])
+        return [LANDMARKS if self.recover and isinstance(image, tuple) else None for image in images]
+
+
+def test_retry_recovers_then_enhances_every_frame():
+    backend = StubBackend(stateless=True, recover=True)
+    enhanced = EnhancedBackend(backend, BrightEnhancer())
+    for _ in range(enhance.RETRY_SAMPLES):
+        assert enhanced.infer([_frame(100)])[0] is LANDMARKS
+    assert backend.calls[:2] == [[False], [True]] and enhanced.always
+
+    # 재추론 복구율이 높아 이후 프레임은 첫 추론부터 보정본
+    backend.calls.clear()
+    enhanced.infer([_frame(100), _frame(100)])
+    assert backend.calls == [[True, True]]
+
+
+def test_retry_stops_when_it_does_not_help():
+    backend = StubBackend(stateless=True, recover=False)
+    enhanced = EnhancedBackend(backend, BrightEnhancer())
+    for _ in range(enhance.RETRY_SAMPLES):
+        enhanced.infer([_frame(100)])
+    assert not enhanced.retry and not enhanced.always
+    backend.calls.clear()
+    enhanced.infer([_frame(100)])
+    assert backend.calls == [[False]]
+
+
+def test_stateful_backend_never_sees_a_frame_twice():
+    backend = StubBackend(stateless=False, recover=True)
+    enhanced = EnhancedBackend(backend, BrightEnhancer())
+    for _ in range(enhance.RETRY_SAMPLES + 5):
+        assert enhanced.infer([_frame(100), _frame(100)]) == [None, None]
+    assert all(call == [False, False] for call in backend.calls)
+    assert len(backend.calls) == enhance.RETRY_SAMPLES + 5 and enhanced.retries == 0
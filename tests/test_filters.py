@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from fitvideo.filters import LandmarkSmoother
+
+
+def _landmarks(x=0.5, y=0.5, visibility=1.0):
+    landmarks = np.zeros((33, 4), dtype=np.float32)
+    landmarks[:, 0], landmarks[:, 1], landmarks[:, 3] = x, y, visibility
+    return landmarks
+
+
+def test_stationary_input_passes_through():
+    smoother = LandmarkSmoother(fps=30)
+    for frame_idx in range(30):
+        out = smoother(_landmarks(), frame_idx)
+        np.testing.assert_allclose(out, _landmarks(), atol=1e-6)
+
+
+def test_stationary_jitter_is_reduced():
+    rng = np.random.default_rng(0)
+    smoother = LandmarkSmoother(fps=30)
+    raw, filtered = [], []
+    for frame_idx in range(120):
+        landmarks = _landmarks(x=0.5 + rng.normal(0, 0.01))
+        raw.append(landmarks[0, 0])
+        filtered.append(smoother(landmarks, frame_idx)[0, 0])
+    assert np.std(filtered[30:]) < np.std(raw[30:]) / 2
+    assert np.mean(filtered[30:]) == pytest.approx(0.5, abs=0.01)
+
+
+def test_gap_longer_than_max_gap_resets():
+    smoother = LandmarkSmoother(fps=30, max_gap=10)
+    smoother(_landmarks(x=0.2), 0)
+    # 짧은 공백 뒤에는 이전 추정치와 섞임
+    assert smoother(_landmarks(x=0.8), 5)[0, 0] < 0.8
+
+    smoother(_landmarks(x=0.2), 6)
+    # max_gap 보다 긴 공백 뒤에는 새 측정값에서 다시 시작
+    np.testing.assert_allclose(smoother(_landmarks(x=0.8), 17), _landmarks(x=0.8))
+    # 프레임 번호가 되돌아가도 (새 동영상/세트) 초기화
+    np.testing.assert_allclose(smoother(_landmarks(x=0.1), 3), _landmarks(x=0.1))
+
+
+def test_visibility_weights_measurement():
+    smoother = LandmarkSmoother(fps=30, min_visibility=0.5)
+    smoother(_landmarks(x=0.2), 0)
+    moved = _landmarks(x=0.8)
+    moved[1, 3] = 0.25   # min_visibility 의 절반 → 반영 비율 절반
+    moved[2, 3] = 0.0    # 반영 안 함
+    out = smoother(moved, 1)
+
+    full_step = out[0, 0] - 0.2
+    assert 0 < full_step < 0.6
+    assert out[1, 0] - 0.2 == pytest.approx(full_step / 2, rel=1e-4)
+    assert out[2, 0] == pytest.approx(0.2)
+    # visibility 값 자체는 필터링하지 않음
+    np.testing.assert_array_equal(out[:, 3], moved[:, 3])
@@ -0,0 +1,115 @@
+import cv2
+import numpy as np
+import pytest
+
+from fitvideo.frames import FrameReader
+from fitvideo.pose_backends import PoseBackend
+from fitvideo.segments import count_frames
+
+
+def _levels(reader):
+    """반환된 (frame_idx, 원본 프레임 번호) 목록 - make_video 의 프레임 i 는 밝기 i * 20 (압축 오차 감안)"""
+    return [(frame_idx, int(round(frame.mean() / 20))) for frame_idx, frame in reader]
+
+
+def _selected(fps, target_fps, n):
+    reader = FrameReader.__new__(FrameReader)
+    reader.fps, reader.target_fps = fps, target_fps
+    reader._resample = target_fps is not None and target_fps < fps
+    return [i for i in range(n) if reader._selected(i)]
+
+
+def test_selected_keeps_every_frame_without_resampling():
+    assert _selected(30, None, 10) == list(range(10))
+    assert _selected(24, 29, 10) == list(range(10))
+    assert _selected(29, 29, 10) == list(range(10))
+
+
+@pytest.mark.parametrize("fps, target_fps", [(30, 29), (60, 29), (30, 15), (120, 29), (50, 29)])
+def test_selected_matches_target_rate(fps, target_fps):
+    selected = _selected(fps, target_fps, fps * 4)
+    # 1초마다 정확히 target_fps 프레임, 첫 프레임은 항상 선택
+    assert selected[0] == 0
+    for second in range(4):
+        assert sum(second * fps <= i < (second + 1) * fps for i in selected) == target_fps
+    # 선택 후 번호 k 의 원본 프레임은 ceil(k * fps / target_fps)
+    assert selected == [-(-k * fps // target_fps) for k in range(len(selected))]
+
+
+def test_selected_drops_every_other_frame_at_half_rate():
+    assert _selected(30, 15, 8) == [0, 2, 4, 6]
+
+
+def test_reader_numbers_selected_frames(tmp_path, make_video):
+    path = make_video(tmp_path / "v.mp4", frames=12, fps=30)
+    with FrameReader(path, target_fps=15) as reader:
+        frames = _levels(reader)
+    assert frames == [(k, 2 * k) for k in range(6)]
+    assert count_frames(path, 15) == len(frames)
+    assert count_frames(path) == 12
+
+
+def test_reader_max_frames_counts_selected_frames(tmp_path, make_video):
+    path = make_video(tmp_path / "v.mp4", frames=12, fps=30)
+    with FrameReader(path, target_fps=15, max_frames=3) as reader:
+        assert [frame_idx for frame_idx, _ in reader] == [0, 1, 2]
+
+
+class NoPoseBackend(PoseBackend):
+    def infer(self, images):
+        return [None] * len(images)
+
+
+def test_overlay_with_target_fps_uses_analysis_numbering(tmp_path, make_video):
+    from fitvideo.video import create_overlay_video
+    path = make_video(tmp_path / "v.mp4", frames=12, fps=30)
+    output = str(tmp_path / "out.mp4")
+    result = {"total_count": 0, "score": 0, "grade": "-", "counts": {}, "rep_results": []}
+
+    # 분석(target_fps=15)의 앞 4 프레임 = 원본 앞 8 프레임 구간
+    create_overlay_video(path, result, output, max_frames=4, backend=NoPoseBackend(), target_fps=15, pipeline=False)
+    cap = cv2.VideoCapture(output)
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 4
+    assert int(cap.get(cv2.CAP_PROP_FPS)) == 15
+    ok, frame = cap.read()
+    cap.release()
+    assert ok and np.asarray(frame).shape[:2] == (48, 64)
+
+
+def test_reader_start_frame_after_seek(tmp_path, make_video):
+    path = make_video(tmp_path / "v.mp4", frames=12, fps=30)
+    with FrameReader(path, start_frame=5) as reader:
+        assert _levels(reader) == [(k, k) for k in range(5, 12)]
+    with FrameReader(path, target_fps=15, start_frame=2) as reader:
+        assert _levels(reader) == [(k, 2 * k) for k in range(2, 6)]
+
+
+class KeyframeSeekCapture:
+    """seek 가 성공했다고 하지만 처음(키프레임) 위치에 멈추는 VideoCapture"""
+
+    video_capture = cv2.VideoCapture
+
+    def __init__(self, path):
+        self._cap = self.video_capture(path)
+
+    def set(self, prop, value):
+        return prop == cv2.CAP_PROP_POS_FRAMES or self._cap.set(prop, value)
+
+    def __getattr__(self, name):
+        return getattr(self._cap, name)
+
+
+def test_reader_decodes_forward_when_seek_lands_elsewhere(tmp_path, make_video, monkeypatch):
+    path = make_video(tmp_path / "v.mp4", frames=12, fps=30)
+    monkeypatch.setattr(cv2, "VideoCapture", KeyframeSeekCapture)
+    with FrameReader(path, start_frame=5) as reader:
+        assert _levels(reader) == [(k, k) for k in range(5, 12)]
+
+
+def test_count_frames_prefers_probed_count(tmp_path, make_video, monkeypatch):
+    from fitvideo import segments
+    path = make_video(tmp_path / "v.mp4", frames=12, fps=30)
+    monkeypatch.setattr(segments, "probe_frame_count", lambda path: None)
+    assert count_frames(path, 15) == 6
+    monkeypatch.setattr(segments, "probe_frame_count", lambda path: 10)
+    assert count_frames(path) == 10 and count_frames(path, 15) == 5
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from fitvideo import history
+
+USER = 12
+
+
+def _result(total_count, score, counts, reps=(), angles=()):
+    return {
+        "total_count": total_count,
+        "score": score,
+        "counts": counts,
+        "rep_results": [
+            {"rep": i + 1, "label": label, "min_knee_angle": angle, "frame_start": start, "frame_end": end}
+            for i, (label, angle, start, end) in enumerate(reps)
+        ],
+        "frame_analysis": [{"knee_angle": angle} for angle in angles],
+    }
+
+
+@pytest.fixture
+def root(tmp_path):
+    return str(tmp_path / "history")
+
+
+def test_round_trip(root):
+    first = _result(2, 85, {"Full Squat": 1, "Basic Squat": 1},
+                    reps=[("Full Squat", 50, 30, 50), ("Basic Squat", 70, 80, 101)], angles=[170.0, None, 60.5])
+    second = _result(1, 40, {"Half Squat": 1}, reps=[("Half Squat", 90, 20, 40)])
+    history.append_result(USER, "20250101090000000", "squat", 60, first, "fitvideoresult/set1.mp4", root=root)
+    history.append_result(USER, "20250101091000000", "squat", 80, second, root=root)
+
+    sets = history.list_sets(USER, "20250101", "squat", root=root)
+    assert [(s["timestamp"], s["load_kg"], s["rep_cnt"], s["score"], s["video_key"]) for s in sets] == [
+        ("20250101090000000", 60.0, 2, 85, "fitvideoresult/set1.mp4"),
+        ("20250101091000000", 80.0, 1, 40, ""),
+    ]
+    reps = history.list_reps(USER, "20250101", "squat", root=root)
+    assert [(r["timestamp"][-5:], r["rep"], r["label"], r["frame_end"]) for r in reps] == [
+        ("00000", 1, "Full Squat", 50), ("00000", 2, "Basic Squat", 101), ("00000", 1, "Half Squat", 40),
+    ]
+
+    angles = history.knee_angles(USER, "20250101090000000", "squat", root=root)
+    assert angles[0] == 170.0 and np.isnan(angles[1]) and angles[2] == pytest.approx(60.5)
+
+    [daily] = history.daily_history(USER, root=root)
+    assert daily["date"] == "20250101" and daily["exercise"] == "squat"
+    assert (daily["sets"], daily["reps"], daily["best_score"]) == (2, 3, 85)
+    assert daily["volume_kg"] == pytest.approx(60 * 2 + 80 * 1)
+    assert daily["avg_score"] == pytest.approx(62.5)
+    assert (daily["full"], daily["basic"], daily["half"], daily["fail"]) == (1, 1, 1, 0)
+
+
+def test_reanalysis_replaces_set(root):
+    history.append_result(USER, "20250101090000000", "squat", 60, _result(2, 50, {"Half Squat": 2}), root=root)
+    history.append_result(USER, "20250101090000000", "squat", 60, _result(3, 90, {"Full Squat": 3}), root=root)
+
+    [row] = history.list_sets(USER, "20250101", "squat", root=root)
+    assert (row["rep_cnt"], row["score"]) == (3, 90)
+    [daily] = history.daily_history(USER, root=root)
+    assert (daily["sets"], daily["reps"]) == (1, 3)
+
+
+def test_reanalysis_down_to_zero_reps_removes_rep_rows(root):
+    history.append_result(USER, "20250101090000000", "squat", 60,
+                          _result(2, 50, {"Half Squat": 2},
+                                  reps=[("Half Squat", 90, 10, 30), ("Half Squat", 85, 40, 60)]), root=root)
+    history.append_result(USER, "20250101091000000", "squat", 60,
+                          _result(1, 90, {"Full Squat": 1}, reps=[("Full Squat", 50, 10, 30)]), root=root)
+    history.append_result(USER, "20250101090000000", "squat", 60, _result(0, 0, {}), root=root)
+
+    sets = {row["timestamp"]: row["rep_cnt"] for row in history.list_sets(USER, "20250101", "squat", root=root)}
+    assert sets == {"20250101090000000": 0, "20250101091000000": 1}
+    reps = history.list_reps(USER, "20250101", "squat", root=root)
+    assert [(r["timestamp"], r["label"]) for r in reps] == [("20250101091000000", "Full Squat")]
+    [daily] = history.daily_history(USER, root=root)
+    assert daily["reps"] == 1
+
+    history.append_result(USER, "20250101091000000", "squat", 60, _result(0, 0, {}), root=root)
+    assert history.list_reps(USER, "20250101", "squat", root=root) == []
+    # rep 이 한 번도 없던 날짜는 reps 파일을 만들지 않음
+    history.append_result(USER, "20250102090000000", "squat", 60, _result(0, 0, {}), root=root)
+    assert history.list_reps(USER, "20250102", "squat", root=root) == []
+
+
+def test_daily_history_filters(root):
+    for timestamp in ("20250101090000000", "20250105090000000", "20250110090000000"):
+        history.append_result(USER, timestamp, "squat", 60, _result(1, 70, {"Basic Squat": 1}), root=root)
+    history.append_result(USER, "20250105100000000", "deadlift", 100, _result(1, 70, {"Basic Squat": 1}), root=root)
+
+    dates = [(row["date"], row["exercise"]) for row in history.daily_history(USER, root=root)]
+    assert dates == [("20250101", "squat"), ("20250105", "deadlift"), ("20250105", "squat"), ("20250110", "squat")]
+    filtered = history.daily_history(USER, exercise="squat", since="20250102", until="20250109", root=root)
+    assert [row["date"] for row in filtered] == ["20250105"]
+    assert history.daily_history(99, root=root) == []
+
+
+def test_set_video_key_after_deferred_render(root):
+    history.append_result(USER, "20250101090000000", "squat", 60, _result(1, 70, {"Basic Squat": 1}), root=root)
+    history.append_result(USER, "20250101091000000", "squat", 60, _result(1, 70, {"Basic Squat": 1}), "a", root=root)
+
+    key = "fitvideoresult/12_kim/20250101/squat/set1_20250101090000000.mp4"
+    assert history.set_video_key(USER, "20250101090000000", "squat", key, root=root)
+    assert [row["video_key"] for row in history.list_sets(USER, "20250101", "squat", root=root)] == [key, "a"]
+    assert not history.set_video_key(USER, "20250102090000000", "squat", key, root=root)
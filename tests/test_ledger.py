@@ -0,0 +1,135 @@
+import sqlite3
+import time
+
+import pytest
+
+from fitvideo.ledger import (BUSY, CLAIMED, DEAD, DONE, STATE_DEAD, STATE_DONE, STATE_FAILED, STATE_PROCESSING,
+                             LeaseKeeper, LeaseLost, SQLiteLedger, open_ledger)
+
+KEY = "uploads/12_kim_60_20250101120000000.mp4"
+HASH = "etag-1"
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return SQLiteLedger(str(tmp_path / "jobs.sqlite3"), max_attempts=3, lease_sec=60, worker_id="test:1")
+
+
+def _expire_lease(ledger):
+    ledger._conn.execute("UPDATE jobs SET updated_at = updated_at - 3600")
+
+
+def test_claim_then_done(ledger):
+    assert ledger.claim(KEY, HASH) == CLAIMED
+    assert ledger.get(KEY, HASH)["state"] == STATE_PROCESSING
+    # 처리 중인 동안 다른 워커는 BUSY
+    assert ledger.claim(KEY, HASH) == BUSY
+
+    ledger.mark_done(KEY, HASH, "fitvideoresult/set1.mp4")
+    row = ledger.get(KEY, HASH)
+    assert row["state"] == STATE_DONE
+    assert row["result_key"] == "fitvideoresult/set1.mp4"
+    assert ledger.claim(KEY, HASH) == DONE
+
+
+def test_same_key_with_new_content_is_a_new_job(ledger):
+    assert ledger.claim(KEY, HASH) == CLAIMED
+    ledger.mark_done(KEY, HASH)
+    assert ledger.claim(KEY, "etag-2") == CLAIMED
+
+
+def test_failed_job_retries_until_max_attempts(ledger):
+    assert ledger.claim(KEY, HASH) == CLAIMED
+    assert ledger.mark_failed(KEY, HASH, "boom 1") == STATE_FAILED
+    assert ledger.claim(KEY, HASH) == CLAIMED
+    assert ledger.mark_failed(KEY, HASH, "boom 2") == STATE_FAILED
+    assert ledger.claim(KEY, HASH) == CLAIMED
+    assert ledger.get(KEY, HASH)["attempts"] == 3
+
+    assert ledger.mark_failed(KEY, HASH, "boom 3") == STATE_DEAD
+    row = ledger.get(KEY, HASH)
+    assert (row["state"], row["last_error"]) == (STATE_DEAD, "boom 3")
+    assert ledger.claim(KEY, HASH) == DEAD
+
+
+def test_expired_lease_is_reclaimed(ledger):
+    assert ledger.claim(KEY, HASH) == CLAIMED
+    _expire_lease(ledger)
+    assert ledger.claim(KEY, HASH) == CLAIMED
+    assert ledger.get(KEY, HASH)["attempts"] == 2
+
+
+def test_expired_lease_at_max_attempts_is_dead(ledger):
+    ledger.max_attempts = 1
+    assert ledger.claim(KEY, HASH) == CLAIMED
+    _expire_lease(ledger)
+    assert ledger.claim(KEY, HASH) == DEAD
+    assert ledger.get(KEY, HASH)["state"] == STATE_DEAD
+
+
+def test_mark_dead_is_final(ledger):
+    assert ledger.claim(KEY, HASH) == CLAIMED
+    ledger.mark_dead(KEY, HASH, "filename parse failed")
+    assert ledger.claim(KEY, HASH) == DEAD
+
+
+def test_workout_id_survives_retry(ledger):
+    assert ledger.claim(KEY, HASH) == CLAIMED
+    assert ledger.get(KEY, HASH)["workout_id"] is None
+    ledger.set_workout_id(KEY, HASH, 42)
+    ledger.mark_failed(KEY, HASH, "upload failed")
+
+    assert ledger.claim(KEY, HASH) == CLAIMED
+    assert ledger.get(KEY, HASH)["workout_id"] == 42
+
+
+def test_old_ledger_file_gets_workout_id_column(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE jobs (
+            object_key TEXT NOT NULL, content_hash TEXT NOT NULL, state TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0, worker TEXT, last_error TEXT, result_key TEXT,
+            created_at REAL NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (object_key, content_hash)
+        )
+    """)
+    conn.execute("INSERT INTO jobs VALUES (?, ?, 'done', 1, 'w', NULL, NULL, 0, 0)", (KEY, HASH))
+    conn.commit()
+    conn.close()
+
+    ledger = open_ledger("sqlite:///" + path)
+    assert ledger.get(KEY, HASH)["workout_id"] is None
+    assert ledger.claim(KEY, HASH) == DONE
+
+
+def test_open_ledger_rejects_unknown_scheme():
+    with pytest.raises(ValueError):
+        open_ledger("redis://localhost/jobs")
+
+
+def test_renew_keeps_long_job_busy(ledger, tmp_path):
+    other = SQLiteLedger(ledger.path, max_attempts=3, lease_sec=60, worker_id="test:2")
+    assert ledger.claim(KEY, HASH) == CLAIMED
+    _expire_lease(ledger)
+    assert ledger.renew(KEY, HASH)
+    # 갱신된 lease 안에서는 다른 워커가 가져가지 못함
+    assert other.claim(KEY, HASH) == BUSY
+    assert not other.renew(KEY, HASH)
+
+
+def test_lease_keeper_heartbeat_and_loss(ledger):
+    other = SQLiteLedger(ledger.path, max_attempts=3, lease_sec=60, worker_id="test:2")
+    assert ledger.claim(KEY, HASH) == CLAIMED
+    _expire_lease(ledger)
+    with LeaseKeeper(ledger, KEY, HASH, interval=0.01) as lease:
+        deadline = time.time() + 5
+        while time.time() - ledger.get(KEY, HASH)["updated_at"] > 60 and time.time() < deadline:
+            time.sleep(0.01)
+        lease.check()
+        assert other.claim(KEY, HASH) == BUSY
+
+    # lease 가 끝난 뒤 다른 워커가 가져가면 check() 는 LeaseLost
+    _expire_lease(ledger)
+    assert other.claim(KEY, HASH) == CLAIMED
+    with pytest.raises(LeaseLost):
+        LeaseKeeper(ledger, KEY, HASH).check()
@@ -0,0 +1,27 @@
+import pytest
+
+from fitvideo import config
+from fitvideo.loadshed import LoadShedder
+
+
+@pytest.fixture
+def degrade(monkeypatch):
+    monkeypatch.setattr(config, "DEGRADE_ENABLED", True)
+    monkeypatch.setattr(config, "DEGRADE_CHECK_SEC", 0)
+    monkeypatch.setattr(config, "DEGRADE_BACKLOG", 30)
+    monkeypatch.setattr(config, "RECOVER_BACKLOG", 5)
+
+
+def test_backlog_hysteresis(degrade):
+    depth = [0]
+    shedder = LoadShedder(depth_fn=lambda: depth[0])
+    modes = []
+    for depth[0] in (10, 30, 20, 6, 5, 20, 29, 30):
+        modes.append(shedder.check())
+    # 30 이상에서 저하, 5 이하에서만 복귀 (그 사이에서는 이전 모드 유지)
+    assert modes == [False, True, True, True, False, False, False, True]
+
+
+def test_disabled_never_degrades(degrade, monkeypatch):
+    monkeypatch.setattr(config, "DEGRADE_ENABLED", False)
+    assert LoadShedder(depth_fn=lambda: 1000).check() is False
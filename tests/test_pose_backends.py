@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from fitvideo.pose import NUM_LANDMARKS
+from fitvideo.pose_backends import COCO17_TO_POSE33, BatchedModelBackend
+
+
+class SpotModelBackend(BatchedModelBackend):
+    """가짜 모델 - 레터박스된 입력에서 가장 밝은 점을 모든 관절 위치로 출력
+
+    blazepose 형식은 입력 픽셀 좌표 [x, y, z, visibility 로짓, presence],
+    movenet 형식은 정규화 좌표 [y, x, score] 로 돌려준다.
+    """
+
+    def __init__(self, layout, score=0.9, fixed_batch=False, **kwargs):
+        self.score = score
+        self._fixed = fixed_batch
+        self.batch_sizes = []
+        super().__init__("spot.onnx", layout=layout, **kwargs)
+
+    def _load(self):
+        return 128, 96, np.float32, self._fixed
+
+    def _run(self, batch):
+        self.batch_sizes.append(len(batch))
+        gray = batch.mean(axis=3)
+        outputs = []
+        for image in gray:
+            y, x = np.unravel_index(np.argmax(image), image.shape)
+            if self.layout == "blazepose":
+                logit = np.log(self.score / (1 - self.score))
+                outputs.append(np.tile([x + 0.5, y + 0.5, 12.8, logit, 0], (39, 1)).ravel())
+            else:
+                y_norm, x_norm = (y + 0.5) / self.input_height, (x + 0.5) / self.input_width
+                outputs.append(np.tile([y_norm, x_norm, self.score], (17, 1))[None])
+        return np.array(outputs, dtype=np.float32)
+
+
+def _spot_image(width, height, x, y):
+    """(x, y) 정규화 위치에 흰 점이 있는 검은 프레임"""
+    image = np.zeros((height, width, 3), np.uint8)
+    cx, cy = int(x * width), int(y * height)
+    image[cy - 3:cy + 3, cx - 3:cx + 3] = 255
+    return image
+
+
+# 가로로 긴 / 세로로 긴 프레임 모두 (패딩이 위아래 / 좌우)
+FRAMES = [((320, 120), (0.75, 0.25)), ((90, 240), (0.3, 0.8))]
+
+
+@pytest.mark.parametrize("layout", ["blazepose", "movenet"])
+@pytest.mark.parametrize("fixed_batch", [False, True])
+def test_landmarks_are_mapped_back_to_frame_coordinates(layout, fixed_batch):
+    backend = SpotModelBackend(layout, fixed_batch=fixed_batch, batch_size=4)
+    images = [_spot_image(width, height, x, y) for (width, height), (x, y) in FRAMES]
+    results = backend.infer(images)
+    assert backend.batch_sizes == ([1, 1] if fixed_batch else [2])
+
+    for lm, ((width, height), (x, y)) in zip(results, FRAMES):
+        assert lm.shape == (NUM_LANDMARKS, 4)
+        points = lm if layout == "blazepose" else lm[COCO17_TO_POSE33]
+        # 입력 1픽셀이 원본에서 차지하는 크기 정도의 오차 안
+        tolerance = 1.5 * max(width / backend.input_width, height / backend.input_height) / min(width, height)
+        np.testing.assert_allclose(points[:, 0], x, atol=tolerance * height / width + 0.01)
+        np.testing.assert_allclose(points[:, 1], y, atol=tolerance + 0.01)
+        np.testing.assert_allclose(points[:, 3], 0.9, atol=1e-5)
+
+
+def test_blazepose_depth_uses_frame_width_scale():
+    backend = SpotModelBackend("blazepose")
+    lm, = backend.infer([_spot_image(320, 120, 0.5, 0.5)])
+    # z 12.8px / 입력 폭 128 = 0.1, 가로로 긴 프레임은 폭이 입력 폭을 꽉 채우므로 그대로
+    np.testing.assert_allclose(lm[:, 2], 0.1, atol=1e-5)
+
+
+def test_movenet_unmapped_points_are_invisible():
+    backend = SpotModelBackend("movenet")
+    lm, = backend.infer([_spot_image(320, 120, 0.5, 0.5)])
+    unmapped = np.setdiff1d(np.arange(NUM_LANDMARKS), COCO17_TO_POSE33)
+    assert (lm[unmapped, 3] == 0).all()
+
+
+@pytest.mark.parametrize("layout", ["blazepose", "movenet"])
+def test_low_confidence_frames_are_not_detected(layout):
+    # movenet 은 33점 중 17점만 채워지므로 매핑된 점 수 기준으로 평균 신뢰도를 냄
+    assert SpotModelBackend(layout, score=0.6).infer([_spot_image(64, 48, 0.5, 0.5)])[0] is not None
+    assert SpotModelBackend(layout, score=0.4).infer([_spot_image(64, 48, 0.5, 0.5)]) == [None]
+
+
+def test_unknown_layout_is_rejected():
+    with pytest.raises(ValueError):
+        SpotModelBackend("openpose")
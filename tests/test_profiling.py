@@ -0,0 +1,90 @@
+import os
+import pstats
+import threading
+import time
+
+import pytest
+
+from fitvideo import config, profiling
+from fitvideo.profiling import JobProfiler, StackSampler
+
+KEY = "uploads/12_kim_60_20250101120000000.mp4"
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "PROFILE_S3_PREFIX", "")
+    monkeypatch.setattr(config, "PROFILE_SAMPLE_INTERVAL", 0.002)
+    return tmp_path
+
+
+def busy_squat_job(seconds):
+    """샘플링에 잡히도록 seconds 동안 CPU 를 씀"""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def _artifacts(root):
+    return [os.path.join(directory, name) for directory, _, names in os.walk(root) for name in names]
+
+
+@pytest.mark.parametrize("mode", ["sample", "cprofile"])
+def test_fast_job_leaves_no_profile(profile_dir, mode):
+    with JobProfiler(KEY, mode=mode, threshold_sec=60) as profiler:
+        busy_squat_job(0.01)
+    assert profiler.elapsed < 60 and profiler.artifact_path is None
+    assert _artifacts(profile_dir) == []
+
+
+def test_slow_job_writes_folded_stacks_per_object_key(profile_dir):
+    with JobProfiler(KEY, mode="sample", threshold_sec=0) as profiler:
+        busy_squat_job(0.2)
+
+    assert _artifacts(profile_dir) == [profiler.artifact_path]
+    assert os.path.dirname(profiler.artifact_path) == os.path.join(str(profile_dir), KEY)
+    assert profiler.artifact_path.endswith(".folded")
+    lines = open(profiler.artifact_path).read().splitlines()
+    stacks = {}
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        stacks[stack] = int(count)
+    # 최상위 프레임은 스레드 이름, 그 아래로 바깥 → 안쪽 호출 순서
+    busy = [stack for stack in stacks if "busy_squat_job (test_profiling.py:" in stack]
+    assert busy and all(stack.startswith(threading.main_thread().name + ";") for stack in busy)
+    assert all(not stack.startswith("stack-sampler") for stack in stacks)
+    # 많이 샘플링된 스택부터
+    assert list(stacks.values()) == sorted(stacks.values(), reverse=True)
+
+
+def test_slow_job_writes_pstats(profile_dir):
+    with JobProfiler(KEY, mode="cprofile", threshold_sec=0) as profiler:
+        busy_squat_job(0.02)
+    assert profiler.artifact_path.endswith(".pstats")
+    stats = pstats.Stats(profiler.artifact_path)
+    assert any(name == "busy_squat_job" for _, _, name in stats.stats)
+
+
+def test_save_failure_does_not_fail_job(profile_dir, monkeypatch, capsys):
+    monkeypatch.setattr(config, "PROFILE_DIR", os.path.join(str(profile_dir), "file"))
+    open(config.PROFILE_DIR, "w").close()
+    with JobProfiler(KEY, mode="sample", threshold_sec=0):
+        busy_squat_job(0.01)
+    assert "프로파일 저장 실패" in capsys.readouterr().out
+
+
+def test_sampler_counts_other_threads_only():
+    sampler = StackSampler(interval=0.002)
+    sampler.start()
+    busy_squat_job(0.05)
+    sampler.stop()
+    assert sampler.samples > 0
+    assert sum(sampler.counts.values()) >= sampler.samples
+
+
+def test_profile_message_is_passthrough_when_disabled(monkeypatch):
+    monkeypatch.setattr(config, "PROFILE_MODE", "")
+    assert profiling.profile_message(lambda msg: msg["ok"], {"ok": True}) is True
@@ -0,0 +1,45 @@
+import pytest
+
+from fitvideo import config, frames, resources
+
+
+def test_parse_cpu_list():
+    assert resources.parse_cpu_list("0-3,8") == [0, 1, 2, 3, 8]
+    assert resources.parse_cpu_list(" 2, 0-1 ,2,") == [0, 1, 2]
+    assert resources.parse_cpu_list("") == []
+    assert resources.format_cpu_list(resources.parse_cpu_list("4-6")) == "4,5,6"
+
+
+@pytest.fixture
+def smt_cores(monkeypatch):
+    """물리 코어 4개 × SMT 2 (cpu n 과 n+4 가 형제)"""
+    monkeypatch.setattr(resources, "physical_cores", lambda cpus=None: [[0, 4], [1, 5], [2, 6], [3, 7]])
+
+
+def test_core_sets_keep_smt_siblings_together(smt_cores):
+    assert resources.core_sets(2, 4) == [[0, 4, 1, 5], [2, 6, 3, 7]]
+    assert resources.core_sets(4, 2) == [[0, 4], [1, 5], [2, 6], [3, 7]]
+
+
+def test_core_sets_wrap_around_when_short(smt_cores):
+    assert resources.core_sets(3, 4) == [[0, 4, 1, 5], [2, 6, 3, 7], [0, 4, 1, 5]]
+    # 묶음 크기는 1 ~ 전체 CPU 수로 제한
+    assert resources.core_sets(1, 16) == [[0, 4, 1, 5, 2, 6, 3, 7]]
+    assert resources.core_sets(2, 0) == [[0], [4]]
+
+
+def test_thread_env():
+    env = resources.thread_env(2)
+    assert {env[name] for name in ("FIT_CV2_THREADS", "FIT_POSE_THREADS", "FIT_ENCODER_THREADS",
+                                   "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")} == {"2"}
+    assert "FIT_CPU_SET" not in env
+    assert resources.thread_env(1, [0, 4])["FIT_CPU_SET"] == "0,4"
+
+
+@pytest.mark.parametrize("cv2_threads, threads", [(0, None), (2, 2)])
+def test_ffmpeg_reader_gets_decoder_threads(monkeypatch, cv2_threads, threads):
+    monkeypatch.setattr(config, "CV2_THREADS", cv2_threads)
+    monkeypatch.setattr(frames, "probe_video", lambda path: {"fps": 30, "width": 64, "height": 48})
+    reader = frames.open_frame_reader("v.mp4", backend="ffmpeg")
+    assert isinstance(reader, frames.FFmpegFrameReader) and reader.threads == threads
+    assert ("-threads" in reader._command()) == (threads is not None)
@@ -0,0 +1,142 @@
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from fitvideo import scheduler
+from fitvideo.loadshed import DEFERRED_RENDER
+from fitvideo.scheduler import JobScheduler
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """scheduler 모듈이 보는 time.time() 을 직접 움직이는 시계"""
+    now = [1000.0]
+    monkeypatch.setattr(scheduler, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def _key(user, n):
+    return f"uploads/{user}_kim_60_2025010112000000{n}.mp4"
+
+
+def _message(user, n, deferred=False):
+    body = {"video_key": _key(user, n)}
+    if deferred:
+        body[DEFERRED_RENDER] = {"object_key": _key(user, n)}
+    return {"MessageId": f"{user}-{n}", "ReceiptHandle": f"rh-{user}-{n}", "Body": json.dumps(body)}
+
+
+def _scheduler(costs, aging=0.0):
+    """costs: {(user, n): 비용(초)} - 비용 추정은 이 표에서 조회"""
+    by_key = {_key(user, n): cost for (user, n), cost in costs.items()}
+    return JobScheduler(estimator=by_key.__getitem__, aging=aging)
+
+
+def _order(sched):
+    order = []
+    while True:
+        job = sched.next()
+        if job is None:
+            return order
+        order.append(job.msg["MessageId"])
+        sched.done(job)
+
+
+def test_shortest_job_first_across_users(clock):
+    sched = _scheduler({(1, 1): 100, (2, 1): 10})
+    sched.add(_message(1, 1))
+    sched.add(_message(2, 1))
+    assert _order(sched) == ["2-1", "1-1"]
+
+
+def test_user_cannot_monopolize_with_short_jobs(clock):
+    sched = _scheduler({(1, 1): 10, (1, 2): 10, (1, 3): 10, (2, 1): 15})
+    for user, n in ((1, 1), (1, 2), (1, 3), (2, 1)):
+        sched.add(_message(user, n))
+    # 짧은 작업만 보면 1-1, 1-2, 1-3, 2-1 이지만 사용자 1 의 가상 시간이 쌓여 2-1 이 끼어든다
+    assert _order(sched) == ["1-1", "2-1", "1-2", "1-3"]
+
+
+def test_new_user_starts_from_waiting_users_virtual_time(clock):
+    sched = _scheduler({(1, 1): 50, (1, 2): 50, (2, 1): 60})
+    sched.add(_message(1, 1))
+    sched.add(_message(1, 2))
+    job = sched.next()
+    sched.done(job)
+    assert job.msg["MessageId"] == "1-1"
+    # 사용자 2 는 가상 시간 0 이 아니라 50 에서 시작 → 종료 110 > 사용자 1 의 100
+    sched.add(_message(2, 1))
+    assert _order(sched) == ["1-2", "2-1"]
+
+
+def test_aging_lets_long_job_run(clock):
+    sched = _scheduler({(1, 1): 100, (1, 2): 10}, aging=0.1)
+    sched.add(_message(1, 1))
+    clock[0] += 1000
+    sched.add(_message(1, 2))
+    # 1000초 기다린 100초 작업의 유효 비용은 0 < 10
+    assert _order(sched) == ["1-1", "1-2"]
+
+
+def test_deferred_render_runs_only_when_no_regular_jobs(clock):
+    sched = _scheduler({(1, 1): 0, (2, 1): 300})
+    sched.add(_message(1, 1, deferred=True))
+    sched.add(_message(2, 1))
+    assert _order(sched) == ["2-1", "1-1"]
+
+
+def test_redelivered_message_updates_receipt_handle(clock):
+    sched = _scheduler({(1, 1): 10})
+    first = sched.add(_message(1, 1))
+    redelivered = dict(_message(1, 1), ReceiptHandle="rh-new")
+    assert sched.add(redelivered) is first and len(sched) == 1
+    assert sched.next().msg["ReceiptHandle"] == "rh-new"
+
+
+def test_users_without_pending_jobs_are_forgotten(clock):
+    sched = _scheduler({(1, 1): 10, (2, 1): 15, (2, 2): 15})
+    for user, n in ((1, 1), (2, 1), (2, 2)):
+        sched.add(_message(user, n))
+    sched.next()
+    assert set(sched._served) == {2}
+    _order(sched)
+    assert dict(sched._served) == {}
+
+
+def test_expiring_jobs_are_reported_once_per_half_timeout(clock):
+    sched = JobScheduler(estimator=lambda key: 10, aging=0, visibility_sec=900)
+    sched.add(_message(1, 1))
+    clock[0] += 400
+    sched.add(_message(2, 1))
+    assert sched.expiring() == []
+    clock[0] += 50
+    assert [job.msg["MessageId"] for job in sched.expiring()] == ["1-1"]
+    assert sched.expiring() == []
+    clock[0] += 450
+    assert [job.msg["MessageId"] for job in sched.expiring()] == ["1-1", "2-1"]
+
+
+def test_run_scheduled_keeps_pending_messages_hidden(monkeypatch):
+    from fitvideo import aws, config
+    batches = [[_message(1, 1), _message(2, 1)]]
+    deferred, released, handled = [], [], []
+    monkeypatch.setattr(config, "SCHEDULER_VISIBILITY_SEC", 0.2)
+    monkeypatch.setattr(config, "SCHEDULER_REPORT_EVERY", 0)
+    monkeypatch.setattr(scheduler, "estimate_cost", lambda key: 10)
+    monkeypatch.setattr(aws, "get_messages", lambda **kwargs: batches.pop() if batches else [])
+    monkeypatch.setattr(aws, "defer_message", lambda handle, sec: deferred.append(handle))
+    monkeypatch.setattr(aws, "release_message", released.append)
+
+    def slow_handler(msg):
+        # 첫 작업이 가시성 타임아웃보다 오래 걸림
+        handled.append(msg["ReceiptHandle"])
+        if len(handled) == 1:
+            time.sleep(0.5)
+        return True
+
+    scheduler.run_scheduled(slow_handler, should_stop=lambda: len(handled) >= 2)
+    assert handled == ["rh-1-1", "rh-2-1"]
+    # 첫 작업을 처리하는 동안 대기 중이던 두 번째 메시지의 가시성을 연장
+    assert "rh-2-1" in deferred and released == []
@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from fitvideo import config, scratch
+from fitvideo.scratch import ScratchSpace
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def roots(tmp_path, monkeypatch):
+    """임시 디렉터리를 tmpfs/디스크 루트로, 메모리 예산 1MB, tmpfs 남은 공간 100MB"""
+    memory_dir, disk_dir = tmp_path / "shm", tmp_path / "disk"
+    memory_dir.mkdir()
+    monkeypatch.setattr(config, "SCRATCH_MEMORY_DIR", str(memory_dir))
+    monkeypatch.setattr(config, "SCRATCH_DISK_DIR", str(disk_dir))
+    monkeypatch.setattr(config, "SCRATCH_MEMORY_BUDGET_MB", 1)
+    monkeypatch.setattr(config, "SCRATCH_MIN_FREE_MB", 10)
+    monkeypatch.setattr(scratch, "_free_bytes", lambda directory: 100 * MB)
+    monkeypatch.setattr(scratch, "_reserved", 0)
+    monkeypatch.setattr(scratch, "_metrics", dict.fromkeys(scratch._metrics, 0))
+    return memory_dir, disk_dir
+
+
+def _write(path, size):
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+
+
+def test_files_go_to_memory_until_budget_is_reserved(roots):
+    memory_dir, disk_dir = roots
+    with ScratchSpace("uploads/1_kim.mp4") as space:
+        first = space.path("input.mp4", expected_bytes=600 * 1024)
+        second = space.sibling(first, "_normalized", expected_bytes=600 * 1024)
+        third = space.path("overlay.mp4", expected_bytes=300 * 1024)
+        assert first.startswith(str(memory_dir)) and os.path.basename(second) == "input_normalized.mp4"
+        # 600KB + 600KB 는 1MB 예산 초과 → 디스크, 남은 예산 안의 300KB 는 다시 메모리
+        assert second.startswith(str(disk_dir)) and third.startswith(str(memory_dir))
+        assert space.files == {first: "memory", second: "disk", third: "memory"}
+        assert scratch._reserved == 900 * 1024
+
+
+def test_budget_is_shared_by_concurrent_jobs(roots):
+    memory_dir, disk_dir = roots
+    with ScratchSpace("a") as a, ScratchSpace("b") as b:
+        assert a.path("input.mp4", expected_bytes=700 * 1024).startswith(str(memory_dir))
+        assert b.path("input.mp4", expected_bytes=700 * 1024).startswith(str(disk_dir))
+    # 정리하면 예약이 풀려 다음 작업은 다시 메모리
+    assert scratch._reserved == 0
+    with ScratchSpace("c") as c:
+        assert c.path("input.mp4", expected_bytes=700 * 1024).startswith(str(memory_dir))
+
+
+def test_low_tmpfs_free_space_falls_back_to_disk(roots, monkeypatch):
+    _, disk_dir = roots
+    monkeypatch.setattr(scratch, "_free_bytes", lambda directory: 10 * MB + 100 * 1024)
+    with ScratchSpace() as space:
+        # 예산 안이어도 쓰고 나면 SCRATCH_MIN_FREE_MB 아래로 떨어지므로 디스크
+        assert space.path("input.mp4", expected_bytes=200 * 1024).startswith(str(disk_dir))
+        assert scratch._reserved == 0
+
+
+def test_missing_tmpfs_uses_disk(roots, monkeypatch, tmp_path):
+    _, disk_dir = roots
+    monkeypatch.setattr(config, "SCRATCH_MEMORY_DIR", str(tmp_path / "no-shm"))
+    with ScratchSpace() as space:
+        assert space.path("input.mp4", expected_bytes=1).startswith(str(disk_dir))
+
+
+def test_cleanup_removes_files_and_records_metrics(roots, capsys):
+    memory_dir, disk_dir = roots
+    space = ScratchSpace("job")
+    in_memory = space.path("input.mp4", expected_bytes=100 * 1024)
+    on_disk = space.path("overlay.mp4", expected_bytes=2 * MB)
+    _write(in_memory, 1000)
+    _write(on_disk, 3000)
+    assert space.bytes_written() == {"memory": 1000, "disk": 3000}
+
+    space.cleanup()
+    space.cleanup()  # 두 번째 호출은 아무것도 하지 않음
+    assert os.listdir(memory_dir) == [] and os.listdir(disk_dir) == []
+    assert scratch._reserved == 0
+    assert scratch.get_scratch_metrics() == {"jobs": 1, "memory_files": 1, "disk_files": 1,
+                                             "memory_bytes": 1000, "disk_bytes": 3000}
+    assert capsys.readouterr().out.count("작업 공간 정리") == 1
+
+
+def test_cleanup_runs_when_job_raises(roots):
+    memory_dir, _ = roots
+    with pytest.raises(RuntimeError):
+        with ScratchSpace() as space:
+            _write(space.path("input.mp4", expected_bytes=10), 10)
+            raise RuntimeError("분석 실패")
+    assert os.listdir(memory_dir) == [] and scratch._reserved == 0
@@ -0,0 +1,93 @@
+import math
+import multiprocessing
+
+import numpy as np
+
+from fitvideo import config, segments
+from fitvideo.analysis import analyze_squat
+from fitvideo.pose import NUM_LANDMARKS, PoseLandmark
+from fitvideo.pose_backends import PoseBackend
+
+# 프레임 밝기로 자세를 표시 (mp4v 손실 압축에도 구분되도록 큰 간격)
+STAND, DOWN, MOVED = 220, 30, 120
+
+
+class BrightnessPoseBackend(PoseBackend):
+    """프레임 밝기 → 서 있음(170°) / 앉음(60°) / 옆으로 이동한 자세의 랜드마크"""
+
+    stateless = True
+
+    def infer(self, images):
+        return [self._landmarks(image.mean()) for image in images]
+
+    @staticmethod
+    def _landmarks(brightness):
+        angle = 60 if brightness < 75 else 170
+        hip_x = 0.6 if 75 <= brightness < 170 else 0.5
+        lm = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        lm[:, 3] = 1.0
+        theta = math.radians(angle)
+        for hip, knee, ankle in ((PoseLandmark.LEFT_HIP, PoseLandmark.LEFT_KNEE, PoseLandmark.LEFT_ANKLE),
+                                 (PoseLandmark.RIGHT_HIP, PoseLandmark.RIGHT_KNEE, PoseLandmark.RIGHT_ANKLE)):
+            lm[hip, :2] = (hip_x, 0.5)
+            lm[knee, :2] = (hip_x, 0.7)
+            lm[ankle, :2] = (hip_x + 0.2 * math.sin(theta), 0.7 - 0.2 * math.cos(theta))
+        return lm
+
+
+def _squat_video(path):
+    """3회 스쿼트 → 이동(세트 종료) → 뒤에 더 있는 스쿼트는 세지 않아야 함"""
+    import cv2
+    levels = [STAND] * 10
+    for _ in range(3):
+        levels += [STAND] * 20 + [DOWN] * 20 + [STAND] * 31
+    levels += [STAND] * 60 + [MOVED] * 30
+    levels += ([STAND] * 20 + [DOWN] * 20) * 3
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 30, (64, 48))
+    for level in levels:
+        writer.write(np.full((48, 64, 3), level, np.uint8))
+    writer.release()
+    return str(path), len(levels)
+
+
+def test_overlapped_segments_read_from_keyframes():
+    keyframes = [0, 90, 200, 310]
+    plan = segments.plan_overlapped_segments(400, 4, keyframes, overlap=12)
+    assert plan[0][0] == 0 and plan[-1][1] == 400
+    assert all(start - 12 in keyframes for start, _ in plan[1:])
+
+
+def test_segmented_analysis_matches_analyze_squat(tmp_path, monkeypatch):
+    video_path, total = _squat_video(tmp_path / "set.mp4")
+    monkeypatch.setattr(config, "SEGMENT_MIN_FRAMES", 60)
+    # fork 로 만든 작업 프로세스도 같은 스텁 백엔드를 씀
+    monkeypatch.setattr(segments, "create_analysis_backend", BrightnessPoseBackend)
+    monkeypatch.setattr(segments, "keyframe_indices", lambda *args: [0, 60, 130, 250, 330])
+
+    expected = analyze_squat(video_path, backend=BrightnessPoseBackend(), pipeline=False)
+    result = segments.analyze_squat_segmented(video_path, workers=4, overlap=10)
+
+    assert expected["total_count"] == 3 and expected["end_frame"] < total - 100
+    for field in ("total_count", "counts", "rep_results", "end_frame"):
+        assert result[field] == expected[field]
+    assert len(result["frame_analysis"]) == len(expected["frame_analysis"])
+
+
+def test_stopped_segment_returns_without_reading(tmp_path, monkeypatch):
+    video_path, _ = _squat_video(tmp_path / "set.mp4")
+    inferred = []
+
+    class CountingBackend(BrightnessPoseBackend):
+        def infer(self, images):
+            inferred.extend(images)
+            return super().infer(images)
+
+    stop = multiprocessing.Event()
+    stop.set()
+    monkeypatch.setattr(segments, "_stop", None)
+    segments._init_segment_worker(stop)
+    monkeypatch.setattr(segments, "create_analysis_backend", CountingBackend)
+    start, landmarks, detected = segments._analyze_segment((video_path, None, 100, 200, 10))
+    assert start == 100 and len(landmarks) == 100
+    assert len(inferred) <= 1 and not detected.any()
+
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from fitvideo.frames import FrameReader
+from fitvideo.pose import NUM_LANDMARKS
+from fitvideo.pose_backends import PoseBackend
+from fitvideo.shm_pipeline import SharedFramePipeline
+
+
+class MeanBackend(PoseBackend):
+    """프레임 평균 밝기를 모든 값으로 채운 랜드마크 - 어떤 프레임으로 추론했는지 확인용"""
+
+    batch_size = 3
+
+    def infer(self, images):
+        return [np.full((NUM_LANDMARKS, 4), image.mean(), dtype=np.float32) for image in images]
+
+
+def mean_backend():
+    # spawn 된 추론 프로세스가 import 할 수 있도록 모듈 수준 함수
+    return MeanBackend()
+
+
+def _expected(video_path, **kwargs):
+    with FrameReader(video_path, **kwargs) as reader:
+        return [(frame_idx, frame.copy()) for frame_idx, frame in reader]
+
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"target_fps": 20},
+    {"start_frame": 4, "max_frames": 11},
+])
+def test_same_frames_and_numbering_as_frame_reader(make_video, tmp_path, kwargs):
+    video_path = make_video(tmp_path / "in.mp4", frames=15)
+    expected = _expected(video_path, **kwargs)
+
+    with SharedFramePipeline(video_path, backend_factory=mean_backend, slots=4, **kwargs) as pipeline:
+        got = [(frame_idx, frame.copy(), landmarks) for frame_idx, frame, landmarks in pipeline]
+
+    assert [frame_idx for frame_idx, _, _ in got] == [frame_idx for frame_idx, _ in expected]
+    for (_, frame, landmarks), (_, expected_frame) in zip(got, expected):
+        np.testing.assert_array_equal(frame, expected_frame)
+        assert landmarks[0, 0] == pytest.approx(expected_frame.mean(), abs=1e-3)
+
+
+def test_early_stop_shuts_down_processes(make_video, tmp_path):
+    from multiprocessing.shared_memory import SharedMemory
+    video_path = make_video(tmp_path / "in.mp4", frames=30)
+    pipeline = SharedFramePipeline(video_path, backend_factory=mean_backend, slots=2)
+    shm_name = pipeline._shm.name
+
+    seen = []
+    for frame_idx, _, _ in pipeline:
+        seen.append(frame_idx)
+        if frame_idx == 2:
+            break  # 분석기가 세트 종료를 판정한 경우처럼 중간에 그만 읽음
+
+    assert seen == [0, 1, 2]
+    assert all(not proc.is_alive() for proc in pipeline._procs)
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=shm_name)
+    pipeline.close()  # 여러 번 닫아도 안전
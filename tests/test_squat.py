@@ -0,0 +1,80 @@
+import pytest
+
+from fitvideo.squat import MIN_REP_FRAMES, POST_SQUAT_FREEZE_FRAMES, SquatRepCounter, classify_squat, score_counts
+
+HIP = (0.5, 0.5)
+
+
+def squat_set(reps, up_frames=20, down_frames=20):
+    """(knee_angle, hip) 프레임 목록 - 서 있다가 reps 의 최저 각도로 스쿼트 후 이동해서 종료"""
+    frames = [(170, HIP)] * 10  # 정지 상태로 분석 시작
+    for angle in reps:
+        frames += [(170, HIP)] * up_frames + [(angle, HIP)] * down_frames + [(170, HIP)]
+        frames += [(170, HIP)] * POST_SQUAT_FREEZE_FRAMES
+    frames += [(170, HIP)] * 60
+    frames += [(170, (0.6, 0.5))]  # 마지막 스쿼트 이후 이동
+    return frames
+
+
+def run(counter, frames):
+    reps = []
+    for frame_idx, (angle, hip) in enumerate(frames):
+        rep = counter.update(frame_idx, angle, hip)
+        if rep is not None:
+            reps.append(rep)
+        if counter.finished:
+            break
+    return reps
+
+
+@pytest.mark.parametrize("angle, label", [(90, "Half Squat"), (60, "Basic Squat"), (40, "Full Squat"),
+                                          (120, "Fail Squat")])
+def test_classify_squat(angle, label):
+    assert classify_squat(angle) == label
+
+
+def test_counts_reps_with_frame_ranges_and_end():
+    counter = SquatRepCounter(verbose=False)
+    frames = squat_set([60, 40])
+    reps = run(counter, frames)
+
+    assert [rep["label"] for rep in reps] == ["Basic Squat", "Full Squat"]
+    assert [rep["min_knee_angle"] for rep in reps] == [60, 40]
+    assert reps[0]["frame_start"] == 30 and reps[0]["frame_end"] == 50
+    assert reps[1]["frame_start"] > reps[0]["frame_end"]
+    assert reps[1]["frame_end"] - reps[1]["frame_start"] == 20
+
+    assert counter.finished
+    assert counter.end_frame == len(frames) - 1
+    summary = counter.summary()
+    assert summary["total_count"] == 2
+    assert summary["counts"] == {"Half Squat": 0, "Basic Squat": 1, "Full Squat": 1, "Fail Squat": 0}
+    assert summary["rep_results"] == reps
+
+
+def test_rep_is_not_closed_before_min_rep_frames():
+    counter = SquatRepCounter(verbose=False)
+    reps = run(counter, squat_set([60], down_frames=5))
+    assert len(reps) == 1
+    assert reps[0]["frame_end"] - reps[0]["frame_start"] == MIN_REP_FRAMES
+
+
+def test_early_movement_does_not_end_analysis():
+    counter = SquatRepCounter(verbose=False)
+    frames = [(170, HIP)] * 10 + [(170, HIP)] * 5 + [(170, (0.6, 0.5))] + [(170, HIP)] * 5
+    run(counter, frames)
+    assert not counter.finished
+
+
+def test_quiet_counter_prints_nothing(capsys):
+    run(SquatRepCounter(verbose=False), squat_set([60]))
+    assert capsys.readouterr().out == ""
+
+    run(SquatRepCounter(), squat_set([60]))
+    assert "1회 스쿼트 감지" in capsys.readouterr().out
+
+
+def test_score_counts():
+    assert score_counts({"Full Squat": 3, "Basic Squat": 0, "Half Squat": 0, "Fail Squat": 0}) == (100, "Perfect!!")
+    score, _ = score_counts({"Full Squat": 0, "Basic Squat": 0, "Half Squat": 2, "Fail Squat": 1})
+    assert score == 37
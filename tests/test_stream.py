@@ -0,0 +1,47 @@
+from fitvideo import stream
+from fitvideo.analysis import SquatFrameAnalyzer
+
+from test_squat import squat_set
+
+
+class ScriptedSource:
+    """image 자리에 (knee_angle, hip) 를 넣어 보내는 입력 (max_pending 을 충분히 크게 주면 버리는 프레임 없음)"""
+
+    fps = 30
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def run(self, frames):
+        for frame_idx, frame in enumerate(self.frames):
+            frames.put(frame_idx, frame, 0.0)
+        frames.close()
+
+
+class ScriptedAnalyzer(SquatFrameAnalyzer):
+    def process(self, frame_count, image):
+        angle, hip = image
+        self.frame_analysis.append({"frame": frame_count})
+        return self.counter.update(frame_count, angle, hip)
+
+
+def test_rep_frames_restart_per_set(monkeypatch, capsys):
+    monkeypatch.setattr(stream, "SquatFrameAnalyzer", ScriptedAnalyzer)
+    first, second = squat_set([60]), squat_set([40])
+    events = []
+    summary = stream.run_stream(ScriptedSource(first + second), events.append, max_pending=1000)
+
+    reps = [event for event in events if event["type"] == "rep"]
+    set_ends = [event for event in events if event["type"] == "set_end"]
+    assert [event["set"] for event in set_ends] == [1, 2]
+    assert set_ends[0]["frame"] == len(first) - 1
+    assert set_ends[1]["frame"] == len(first) + len(second) - 1
+    assert set_ends[1]["set_start_frame"] == len(first)
+
+    # 두 세트의 rep 프레임 번호는 각 세트 시작 기준으로 같아야 함
+    assert [(rep["set"], rep["frame_start"], rep["frame_end"]) for rep in reps] == [(1, 30, 50), (2, 30, 50)]
+    assert [rep["set_start_frame"] for rep in reps] == [0, len(first)]
+    assert summary["reps"] == 2 and summary["sets"] == 2 and summary["dropped"] == 0
+
+    # 판정 로그가 stdout(JSON 이벤트 출력) 에 섞이지 않음
+    assert capsys.readouterr().out == ""
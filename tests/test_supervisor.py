@@ -0,0 +1,52 @@
+import pytest
+
+from fitvideo.supervisor import desired_workers, scale_step, worker_limit
+
+
+def test_desired_workers_drains_queue_within_target():
+    # 메시지 10개 × 평균 60초 / 목표 120초 → 5개
+    assert desired_workers(10, 2, [30, 90], 120) == 5
+    assert desired_workers(0, 2, [30, 90], 120) == 0
+
+
+def test_desired_workers_probes_one_at_a_time_without_stats():
+    assert desired_workers(5, 2, [], 120) == 3
+    assert desired_workers(2, 2, [], 120) == 2
+
+
+@pytest.mark.parametrize("current, available_mb, rss, expected", [
+    (1, None, [], 4),            # 메모리 정보 없음 → CPU 한도 (8코어 / 2)
+    (1, 10000, [], 4),
+    (1, 2500, [], 3),            # 현재 1개 + 남은 2500MB / 1000MB
+    (2, 2200, [1200, None], 3),  # 워커 RSS 가 기본 추정보다 크면 그 값으로 나눔 → 2 + 1
+    (0, 500, [], 1),             # 더 못 띄워도 최소 인원은 유지
+])
+def test_worker_limit_by_cpu_and_memory(current, available_mb, rss, expected):
+    limit = worker_limit(current, max_workers=6, min_workers=1, cpu_count=8, available_mb=available_mb,
+                         worker_rss_mb=rss, cpus_per_worker=2, worker_mem_mb=1000)
+    assert limit == expected
+
+
+def test_worker_limit_never_exceeds_max_workers():
+    assert worker_limit(0, max_workers=2, min_workers=0, cpu_count=32, cpus_per_worker=1, worker_mem_mb=1000) == 2
+
+
+def test_scale_up_one_per_tick_unless_overloaded():
+    assert scale_step(1, 4, 1, load=2.0, cpu_count=8, surplus_ticks=2, scale_down_ticks=3) == (1, 0)
+    assert scale_step(1, 4, 1, load=8.0, cpu_count=8, surplus_ticks=0, scale_down_ticks=3) == (0, 0)
+
+
+def test_min_workers_are_refilled_regardless_of_load():
+    assert scale_step(0, 0, 2, load=50.0, cpu_count=8, surplus_ticks=1, scale_down_ticks=3) == (2, 0)
+
+
+def test_scale_down_after_consecutive_surplus_ticks():
+    ticks, steps = 0, []
+    for _ in range(4):
+        step, ticks = scale_step(3, 1, 1, load=0.0, cpu_count=8, surplus_ticks=ticks, scale_down_ticks=3)
+        steps.append(step)
+    assert steps == [0, 0, -1, 0]
+
+
+def test_balanced_tick_resets_surplus():
+    assert scale_step(2, 2, 1, load=0.0, cpu_count=8, surplus_ticks=2, scale_down_ticks=3) == (0, 0)
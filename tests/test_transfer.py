@@ -0,0 +1,118 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from fitvideo import aws, config, transfer
+
+pytest.importorskip("moto")
+
+BUCKET = "test-bucket"
+MB = 1024 * 1024
+
+
+def _reset_metrics(monkeypatch):
+    empty = {"count": 0, "bytes": 0, "seconds": 0.0, "active_seconds": 0.0}
+    monkeypatch.setattr(transfer, "_metrics", {direction: dict(empty) for direction in ("download", "upload")})
+    monkeypatch.setattr(transfer, "_active", {direction: [0, 0.0] for direction in ("download", "upload")})
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """moto 가상 S3 + 공용 클라이언트/전송 설정/누적 통계 초기화"""
+    from moto import mock_aws
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN"):
+        monkeypatch.setenv(name, "testing")
+    monkeypatch.setattr(config, "BUCKET_NAME", BUCKET)
+    monkeypatch.setattr(config, "S3_ENDPOINT_URL", None)
+    # 작은 파일로도 멀티파트 경로를 타도록 (S3 최소 파트 크기 5MB)
+    monkeypatch.setattr(config, "S3_MULTIPART_THRESHOLD", 5 * MB)
+    monkeypatch.setattr(config, "S3_MULTIPART_CHUNKSIZE", 5 * MB)
+    monkeypatch.setattr(aws, "_clients", {})
+    monkeypatch.setattr(transfer, "_transfer_config", None)
+    _reset_metrics(monkeypatch)
+    with mock_aws():
+        client = aws.get_s3()
+        client.create_bucket(Bucket=BUCKET, CreateBucketConfiguration={"LocationConstraint": config.REGION_NAME})
+        yield client
+
+
+def test_shared_client_uses_pool_and_adaptive_retries(s3):
+    assert aws.get_s3() is s3
+    assert s3.meta.config.max_pool_connections == config.S3_MAX_POOL_CONNECTIONS
+    assert s3.meta.config.retries["mode"] == "adaptive"
+
+
+def test_multipart_round_trip(s3, tmp_path):
+    data = os.urandom(12 * MB + 123)
+    source = tmp_path / "source.mp4"
+    source.write_bytes(data)
+
+    up = transfer.upload_file(str(source), BUCKET, "uploads/source.mp4")
+    # 멀티파트 업로드는 ETag 에 "-파트 수" 가 붙음
+    assert s3.head_object(Bucket=BUCKET, Key="uploads/source.mp4")["ETag"].strip('"').endswith("-3")
+    assert up.transferred == len(data)
+
+    local_path = aws.download_video("uploads/source.mp4", str(tmp_path / "copy.mp4"))
+    assert open(local_path, "rb").read() == data
+
+    metrics = transfer.get_transfer_metrics()
+    assert [metrics[d]["count"] for d in ("upload", "download")] == [1, 1]
+    assert [metrics[d]["bytes"] for d in ("upload", "download")] == [len(data), len(data)]
+
+
+def test_throughput_uses_wall_clock_of_concurrent_transfers(monkeypatch):
+    _reset_metrics(monkeypatch)
+    now = [0.0]
+    monkeypatch.setattr(transfer, "time", SimpleNamespace(monotonic=lambda: now[0]))
+
+    # 10MB 전송 2건이 0~2초에 동시에 진행 → 전송별 시간 합은 4초지만 처리량은 20MB / 2초
+    first, second = transfer.TransferStats("download"), transfer.TransferStats("download")
+    first(10_000_000)
+    now[0] = 1.0
+    second(10_000_000)
+    assert transfer.get_transfer_metrics()["download"]["active_seconds"] == 1.0
+    now[0] = 2.0
+    first.finish()
+    second.finish()
+    metrics = transfer.get_transfer_metrics()["download"]
+    assert (metrics["count"], metrics["seconds"], metrics["active_seconds"]) == (2, 4.0, 2.0)
+    assert metrics["mb_per_sec"] == 10.0
+
+    # 쉬는 구간(2~10초)은 빼고, 실패한 전송은 시간만 차지하고 바이트/건수에는 넣지 않음
+    now[0] = 10.0
+    failed, third = transfer.TransferStats("download"), transfer.TransferStats("download")
+    third(4_000_000)
+    now[0] = 12.0
+    failed.finish(failed=True)
+    third.finish()
+    third.finish()  # 두 번 불러도 한 번만 기록
+    metrics = transfer.get_transfer_metrics()["download"]
+    assert (metrics["count"], metrics["bytes"], metrics["active_seconds"]) == (3, 24_000_000, 4.0)
+    assert metrics["mb_per_sec"] == 6.0
+    assert transfer.get_transfer_metrics()["upload"]["mb_per_sec"] == 0.0
+
+
+def test_overlay_script_uploads_next_to_source(s3, tmp_path, monkeypatch):
+    import video_analysis_with_overlay as script
+    key = "uploads/12_kim_60_20250101120000000.MP4"
+    s3.put_object(Bucket=BUCKET, Key=key, Body=b"video")
+    monkeypatch.setattr(config, "DOWNLOAD_DIR", str(tmp_path))
+    deleted, patches = [], []
+
+    def analyze(video_path):
+        output_path = os.path.splitext(video_path)[0] + "_analyzed.mp4"
+        with open(output_path, "wb") as f:
+            f.write(b"analyzed")
+        return {"total_count": 1}, output_path
+    monkeypatch.setattr(script, "analyze_squat_with_overlay", analyze)
+    monkeypatch.setattr(script, "register_workout", lambda user_id, load_kg, object_key: 101)
+    monkeypatch.setattr(script, "patch_analysis", lambda *args: patches.append(args) or True)
+    monkeypatch.setattr(script, "delete_message", deleted.append)
+
+    msg = {"Body": '{"video_key": "%s"}' % key, "ReceiptHandle": "rh-1"}
+    assert script.process_message(msg) is True
+    analyzed_key = "uploads/12_kim_60_20250101120000000_analyzed.mp4"
+    assert s3.get_object(Bucket=BUCKET, Key=analyzed_key)["Body"].read() == b"analyzed"
+    assert patches == [(101, 12, {"total_count": 1}, analyzed_key)]
+    assert deleted == ["rh-1"] and os.listdir(tmp_path) == []
@@ -0,0 +1,192 @@
+import json
+
+import pytest
+
+from fitvideo import config, worker
+from fitvideo.ledger import CLAIMED, STATE_DONE, SQLiteLedger
+
+KEY = "uploads/12_kim_60_20250101120000000.mp4"
+HASH = "etag-1"
+
+
+class Response:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.text = json.dumps(self._payload)
+
+    def json(self):
+        return self._payload
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    """S3/SQS/서버 호출을 기록만 하는 워커 환경"""
+    calls = {"dead_letter": [], "deleted": [], "deferred": [], "posts": [], "patches": []}
+    ledger = SQLiteLedger(str(tmp_path / "jobs.sqlite3"), max_attempts=3, lease_sec=600, worker_id="test:1")
+    monkeypatch.setattr(config, "DEGRADE_ENABLED", False)
+    monkeypatch.setattr(config, "SEGMENT_WORKERS", 1)
+    monkeypatch.setattr(worker, "get_ledger", lambda: ledger)
+    monkeypatch.setattr(worker, "get_object_head", lambda key: (HASH, 1000))
+    monkeypatch.setattr(worker, "download_video", lambda key, path: path)
+    monkeypatch.setattr(worker, "send_to_dead_letter", lambda msg, reason: calls["dead_letter"].append(reason))
+    monkeypatch.setattr(worker, "delete_message", lambda handle, queue_url=None: calls["deleted"].append(handle))
+    monkeypatch.setattr(worker, "defer_message", lambda handle, sec, queue_url=None: calls["deferred"].append(sec))
+    monkeypatch.setattr(worker, "append_history", lambda *args, **kwargs: None)
+    monkeypatch.setattr(worker, "analyze_squat", lambda path, **kwargs: {
+        "total_count": 3, "score": 80, "grade": "A", "counts": {}, "rep_results": [], "end_frame": None, "fps": 29,
+    })
+    monkeypatch.setattr(worker, "patch_analysis",
+                        lambda workout_id, user_id, result, key=None: calls["patches"].append((workout_id, key)))
+    monkeypatch.setattr(worker.requests, "get", lambda url: Response(200, {"id": 5}))
+
+    def post(url, json):
+        calls["posts"].append(json)
+        return Response(200, {"workout_id": 100 + len(calls["posts"])})
+    monkeypatch.setattr(worker.requests, "post", post)
+    return ledger, calls
+
+
+def _message(body=None):
+    return {"Body": json.dumps(body or {"video_key": KEY}), "ReceiptHandle": "rh-1"}
+
+
+def test_transient_error_before_claim_keeps_message(env, monkeypatch):
+    ledger, calls = env
+
+    def throttled(key):
+        raise RuntimeError("SlowDown")
+    monkeypatch.setattr(worker, "get_object_head", throttled)
+
+    assert worker.process_video_message(_message()) is False
+    assert calls["dead_letter"] == [] and calls["deleted"] == []
+    assert ledger.get(KEY, HASH) is None
+
+
+def test_missing_object_is_dead_lettered(env, monkeypatch):
+    from botocore.exceptions import ClientError
+    ledger, calls = env
+
+    def missing(key):
+        raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+    monkeypatch.setattr(worker, "get_object_head", missing)
+
+    assert worker.process_video_message(_message()) is False
+    assert len(calls["dead_letter"]) == 1 and calls["deleted"] == ["rh-1"]
+
+
+def test_malformed_body_is_dead_lettered(env):
+    _, calls = env
+    msg = {"Body": "not json", "ReceiptHandle": "rh-1"}
+    assert worker.process_video_message(msg) is False
+    assert len(calls["dead_letter"]) == 1 and calls["deleted"] == ["rh-1"]
+
+
+def test_retry_reuses_registered_workout(env, monkeypatch):
+    ledger, calls = env
+    uploads = []
+
+    def flaky_upload(*args, **kwargs):
+        uploads.append(args)
+        if len(uploads) == 1:
+            raise RuntimeError("upload failed")
+        return "fitvideoresult/set1.mp4"
+    monkeypatch.setattr(worker, "render_and_upload", flaky_upload)
+
+    assert worker.process_video_message(_message()) is False
+    assert calls["deleted"] == [] and calls["dead_letter"] == []
+    assert ledger.get(KEY, HASH)["workout_id"] == 101
+
+    assert worker.process_video_message(_message()) is True
+    assert len(calls["posts"]) == 1
+    assert {workout_id for workout_id, _ in calls["patches"]} == {101}
+    assert calls["patches"][-1] == (101, "fitvideoresult/set1.mp4")
+    assert ledger.get(KEY, HASH)["state"] == STATE_DONE
+
+
+def test_busy_message_hidden_for_remaining_lease(env):
+    ledger, calls = env
+    assert ledger.claim(KEY, HASH) == CLAIMED
+
+    assert worker.process_video_message(_message()) is True
+    assert calls["deleted"] == []
+    assert len(calls["deferred"]) == 1 and 590 <= calls["deferred"][0] <= 600
+
+
+def test_lost_lease_skips_result_writes(env, monkeypatch):
+    ledger, calls = env
+
+    def slow_analysis(path, **kwargs):
+        # 분석이 lease 보다 길어져 다른 워커가 작업을 가져감
+        other = SQLiteLedger(ledger.path, max_attempts=3, lease_sec=600, worker_id="test:2")
+        ledger._conn.execute("UPDATE jobs SET updated_at = 0")
+        assert other.claim(KEY, HASH) == CLAIMED
+        return {"total_count": 3, "score": 80, "grade": "A", "counts": {}, "rep_results": [], "end_frame": None,
+                "fps": 29}
+    monkeypatch.setattr(worker, "analyze_squat", slow_analysis)
+
+    assert worker.process_video_message(_message()) is False
+    assert calls["patches"] == [] and calls["deleted"] == [] and calls["dead_letter"] == []
+    row = ledger.get(KEY, HASH)
+    assert (row["state"], row["worker"], row["attempts"]) == ("processing", "test:2", 2)
+
+
+def test_deferred_render_updates_history(env, monkeypatch, tmp_path):
+    from fitvideo import history
+    from fitvideo.loadshed import DEFERRED_RENDER
+    _, calls = env
+    root = str(tmp_path / "history")
+    monkeypatch.setattr(config, "HISTORY_DIR", root)
+    result = {"total_count": 3, "score": 80, "grade": "A", "counts": {"Full Squat": 3}, "rep_results": []}
+    history.append_result(12, "20250101120000000", "squat", 60, result, None)
+
+    monkeypatch.setattr(worker, "render_and_upload", lambda *args, **kwargs: "fitvideoresult/set1.mp4")
+    job = {"object_key": KEY, "workout_id": 101, "user_id": 12, "user_name": "kim", "timestamp": "20250101120000000",
+           "exercise_dir": "squat", "active_frames": None, "normalize": False, "result": result}
+
+    assert worker.process_video_message(_message({DEFERRED_RENDER: job, "video_key": KEY})) is True
+    assert calls["patches"] == [(101, "fitvideoresult/set1.mp4")]
+    assert [row["video_key"] for row in history.list_sets(12, "20250101", "squat")] == ["fitvideoresult/set1.mp4"]
+
+
+@pytest.mark.parametrize("normalized, render_fps", [("normalized", None), ("original", worker.NORMALIZED_FPS)])
+def test_render_matches_analysis_frames_when_normalize_falls_back(tmp_path, monkeypatch, normalized, render_fps):
+    from fitvideo.scratch import ScratchSpace
+    rendered = []
+    video_path = str(tmp_path / "12_kim_60_20250101120000000.mp4")
+    monkeypatch.setattr(config, "SEGMENT_WORKERS", 1)
+    monkeypatch.setattr(worker, "normalize_video", lambda path, max_frames=None, output_path=None:
+                        output_path if normalized == "normalized" else path)
+    monkeypatch.setattr(worker, "create_overlay_video", lambda path, result, output_path, **kwargs:
+                        rendered.append((path, kwargs)))
+    monkeypatch.setattr(worker, "get_next_set_no", lambda *args: 1)
+    monkeypatch.setattr(worker, "upload_file", lambda *args, **kwargs: "ok")
+
+    with ScratchSpace("render") as scratch:
+        worker.render_and_upload(video_path, {}, 120, scratch, 0, 12, "kim", "20250101120000000", "squat")
+    [(path, kwargs)] = rendered
+    assert (path == video_path) == (normalized == "original")
+    assert kwargs == {"max_frames": 120, "target_fps": render_fps}
+
+
+@pytest.mark.parametrize("deferred_queue", ["https://sqs.example/deferred", ""])
+def test_degraded_overlay_stays_out_of_work_queue(env, monkeypatch, deferred_queue):
+    from fitvideo.loadshed import DEFERRED_RENDER, LoadShedder
+    _, calls = env
+    sent, rendered = [], []
+    shedder = LoadShedder(depth_fn=lambda: config.DEGRADE_BACKLOG)
+    monkeypatch.setattr(config, "DEGRADE_ENABLED", True)
+    monkeypatch.setattr(config, "DEFERRED_QUEUE_URL", deferred_queue)
+    monkeypatch.setattr(worker, "get_load_shedder", lambda: shedder)
+    monkeypatch.setattr(worker, "send_message", lambda body, queue_url=None: sent.append((queue_url, body)))
+    monkeypatch.setattr(worker, "render_and_upload",
+                        lambda *args, **kwargs: rendered.append(kwargs) or "fitvideoresult/set1.mp4")
+
+    assert worker.process_video_message(_message()) is True
+    if deferred_queue:
+        # 지연 렌더링은 작업 큐가 아닌 지연 렌더링 큐로 (작업 큐 깊이에 잡히지 않음)
+        [(queue_url, body)] = sent
+        assert queue_url == deferred_queue and DEFERRED_RENDER in body and rendered == []
+    else:
+        # 지연 렌더링 큐가 없으면 원본 프레임 번호 그대로 바로 렌더링
+        assert sent == [] and rendered == [{"normalize": False}]